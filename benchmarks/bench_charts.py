@@ -0,0 +1,106 @@
+"""
+Compare chart creation latency and the bytes each chart adds to a saved deck: python-pptx's
+chart data, the bulk chart data ChartManager uses, and static charts without a workbook.
+python-pptx's own chart data is quadratic in the number of categories, so it is only timed up
+to --baseline-max points.
+
+    uv run python benchmarks/bench_charts.py --points 100 10000 100000 --repeat 3
+"""
+import argparse
+import math
+import statistics
+import time
+from io import BytesIO
+
+from pptx import Presentation
+from pptx.chart.data import CategoryChartData, XyChartData
+from pptx.enum.chart import XL_CHART_TYPE
+from pptx.util import Inches
+
+from powerpoint.chart_data import (BulkCategoryChartData, BulkXyChartData,
+                                   add_static_chart)
+
+
+def category_data(chart_data_class, points):
+    chart_data = chart_data_class()
+    chart_data.categories = [f"Item {i}" for i in range(points)]
+    chart_data.add_series("Sales", [round(100 + 50 * math.sin(i / 50), 2) for i in range(points)])
+    return chart_data
+
+
+def xy_data(chart_data_class, points):
+    chart_data = chart_data_class()
+    x_values = [i * 0.01 for i in range(points)]
+    y_values = [round(math.sin(i / 500), 4) for i in range(points)]
+    if chart_data_class is XyChartData:
+        series = chart_data.add_series("Signal")
+        for x, y in zip(x_values, y_values):
+            series.add_data_point(x, y)
+    else:
+        chart_data.add_series("Signal", x_values, y_values)
+    return chart_data
+
+
+def add_embedded(slide, chart_type, chart_data):
+    slide.shapes.add_chart(chart_type, Inches(1), Inches(2), Inches(8), Inches(5), chart_data)
+
+
+def add_static(slide, chart_type, chart_data):
+    add_static_chart(slide.shapes, chart_type, Inches(1), Inches(2), Inches(8), Inches(5), chart_data)
+
+
+def measure(make_data, add, chart_type, points, repeat):
+    """Return (median ms to build the data and add the chart, bytes the chart adds to the deck)."""
+    timings = []
+    chart_bytes = 0
+    for _ in range(repeat):
+        prs = Presentation()
+        slide = prs.slides.add_slide(prs.slide_layouts[5])
+        empty = BytesIO()
+        prs.save(empty)
+
+        start = time.perf_counter()
+        add(slide, chart_type, make_data(points))
+        timings.append((time.perf_counter() - start) * 1000)
+
+        saved = BytesIO()
+        prs.save(saved)
+        chart_bytes = saved.tell() - empty.tell()
+    return statistics.median(timings), chart_bytes
+
+
+def report(label, result):
+    median, chart_bytes = result
+    print(f"  {label:<34} median {median:9.1f} ms  {chart_bytes / 1024:10.1f} KB per chart")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chart creation benchmark")
+    parser.add_argument("--points", type=int, nargs="+", default=[100, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline-max", type=int, default=10000)
+    args = parser.parse_args()
+
+    for points in args.points:
+        print(f"{points} points, {args.repeat} runs")
+        for label, make_data, add, chart_type in (
+            ("column, python-pptx", lambda n: category_data(CategoryChartData, n), add_embedded,
+             XL_CHART_TYPE.COLUMN_CLUSTERED),
+            ("column, bulk", lambda n: category_data(BulkCategoryChartData, n), add_embedded,
+             XL_CHART_TYPE.COLUMN_CLUSTERED),
+            ("column, bulk static", lambda n: category_data(BulkCategoryChartData, n), add_static,
+             XL_CHART_TYPE.COLUMN_CLUSTERED),
+            ("scatter, python-pptx", lambda n: xy_data(XyChartData, n), add_embedded,
+             XL_CHART_TYPE.XY_SCATTER),
+            ("scatter, bulk", lambda n: xy_data(BulkXyChartData, n), add_embedded,
+             XL_CHART_TYPE.XY_SCATTER),
+            ("scatter, bulk static", lambda n: xy_data(BulkXyChartData, n), add_static,
+             XL_CHART_TYPE.XY_SCATTER),
+        ):
+            if "python-pptx" in label and points > args.baseline_max:
+                continue
+            report(label, measure(make_data, add, chart_type, points, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
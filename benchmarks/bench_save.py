@@ -0,0 +1,96 @@
+"""
+Compare save latency and output size of python-pptx's Presentation.save against the
+PptxPackageWriter settings used by SaveManager, on generated decks with text, tables and
+pictures.
+
+    uv run python benchmarks/bench_save.py --slides 50 500 --repeat 3
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from io import BytesIO
+
+from PIL import Image
+from pptx import Presentation
+
+from powerpoint.package_writer import PptxPackageWriter
+from powerpoint.presentation_manager import PresentationManager
+
+
+def build_deck(slides: int, image_dir: str):
+    """A deck mixing bullet, table and picture slides, one distinct picture every 10 slides."""
+    manager = PresentationManager()
+    manager.set_presentation("bench", Presentation())
+    headers = [f"Column {c}" for c in range(5)]
+    rows = [[r * 5 + c + 0.5 for c in range(5)] for r in range(12)]
+    for index in range(slides):
+        if index % 10 == 9:
+            path = os.path.join(image_dir, f"picture{index}.{'jpg' if index % 20 == 9 else 'png'}")
+            Image.effect_noise((960, 720), 40 + index % 50).convert("RGB").save(path)
+            manager.add_picture_with_caption_slide("bench", f"Picture {index}", path, "Caption")
+        elif index % 5 == 4:
+            manager.add_table_slide("bench", f"Table {index}", headers, rows, paginate=False)
+        else:
+            manager.add_title_with_content_slide(
+                "bench", f"Slide {index}", "Point one\n- Detail\nPoint two\nPoint three", paginate=False)
+    return manager.get_presentation("bench")
+
+
+def measure(save, repeat):
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        buffer = BytesIO()
+        start = time.perf_counter()
+        save(buffer)
+        timings.append((time.perf_counter() - start) * 1000)
+        size = buffer.tell()
+    return statistics.median(timings), size
+
+
+def report(label, result):
+    median, size = result
+    print(f"  {label:<34} median {median:9.1f} ms  {size / 1024 / 1024:8.2f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deck save benchmark")
+    parser.add_argument("--slides", type=int, nargs="+", default=[50, 500])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    for slides in args.slides:
+        with tempfile.TemporaryDirectory() as image_dir:
+            prs = build_deck(slides, image_dir)
+        print(f"{slides} slides, {args.repeat} runs, {args.workers} compression workers")
+
+        report("python-pptx save", measure(prs.save, args.repeat))
+        configurations = [
+            ("deflate everything, level 6", dict(store_media=False, workers=1)),
+            ("store media, level 6", dict(workers=1)),
+            ("store media, level 1", dict(compress_level=1, workers=1)),
+            ("store media, level 6, parallel", dict(workers=args.workers)),
+        ]
+        for label, options in configurations:
+            writer = PptxPackageWriter(incremental=False, **options)
+            report(label, measure(lambda file: writer.write(prs, file), args.repeat))
+            writer.close()
+
+        # Incremental: prime the cache, then re-save after editing one slide each run
+        writer = PptxPackageWriter(workers=args.workers)
+        writer.write(prs, BytesIO())
+        title = prs.slides[0].shapes.title
+
+        def edit_and_save(file):
+            title.text = title.text + "."
+            writer.write(prs, file)
+
+        report("incremental re-save, one edit", measure(edit_and_save, args.repeat))
+        writer.close()
+
+
+if __name__ == "__main__":
+    main()
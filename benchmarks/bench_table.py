@@ -0,0 +1,75 @@
+"""
+Compare the bulk table writer used by PresentationManager.add_table_slide against the
+previous cell-by-cell python-pptx path.
+
+    uv run python benchmarks/bench_table.py --rows 200 --cols 10 --repeat 5
+"""
+import argparse
+import statistics
+import time
+
+from pptx import Presentation
+from pptx.util import Inches, Pt
+
+from powerpoint.presentation_manager import PresentationManager
+
+
+def cell_by_cell(prs, headers, rows):
+    """The original add_table_slide body: every cell set through python-pptx proxies."""
+    slide = prs.slides.add_slide(prs.slide_layouts[PresentationManager.SLIDE_LAYOUT_TITLE_ONLY])
+    slide.shapes.title.text = "Table"
+    num_rows, num_cols = len(rows) + 1, len(headers)
+    width_per_col, height_per_row = Inches(8 / num_cols), Inches(0.4)
+    table = slide.shapes.add_table(num_rows, num_cols, Inches(1), Inches(2),
+                                   width_per_col * num_cols, height_per_row * num_rows).table
+    for col_idx, header in enumerate(headers):
+        cell = table.cell(0, col_idx)
+        cell.text = str(header)
+        paragraph = cell.text_frame.paragraphs[0]
+        paragraph.font.bold = True
+        paragraph.font.size = Pt(11)
+    for row_idx, row_data in enumerate(rows, start=1):
+        for col_idx, cell_value in enumerate(row_data):
+            cell = table.cell(row_idx, col_idx)
+            cell.text = str(cell_value)
+            cell.text_frame.paragraphs[0].font.size = Pt(10)
+
+
+def bulk(manager, headers, rows):
+    manager.add_table_slide("bench", "Table", headers, rows, paginate=False)
+
+
+def measure(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Table writer benchmark")
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--cols", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    headers = [f"Column {c}" for c in range(args.cols)]
+    rows = [[r * args.cols + c + 0.5 for c in range(args.cols)] for r in range(args.rows)]
+
+    prs = Presentation()
+    legacy = measure(lambda: cell_by_cell(prs, headers, rows), args.repeat)
+
+    manager = PresentationManager()
+    manager.presentations["bench"] = Presentation()
+    current = measure(lambda: bulk(manager, headers, rows), args.repeat)
+
+    print(f"table {args.rows}x{args.cols}, {args.repeat} runs")
+    print(f"  cell-by-cell: median {legacy[0]:8.2f} ms  min {legacy[1]:8.2f} ms")
+    print(f"  bulk writer:  median {current[0]:8.2f} ms  min {current[1]:8.2f} ms")
+    print(f"  speedup:      {legacy[0] / current[0]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
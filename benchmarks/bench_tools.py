@@ -0,0 +1,355 @@
+"""
+Benchmark every MCP tool through the server's own call_tool handler, in-process and without
+the stdio transport. Images come from the fake generator and decks are uploaded to a local
+stub of Open-WebUI, so no network access or API keys are needed.
+
+For each scenario it reports latency percentiles, the process's peak RSS and the bytes the
+tool produced (uploaded deck, rendered images or response text). --json writes the results
+so two runs, e.g. before and after a python-pptx or mcp upgrade, can be compared with
+--compare.
+
+    uv run python benchmarks/bench_tools.py --repeat 10 --json after.json --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from importlib import metadata
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import mcp.types as types
+from PIL import Image
+from pptx import Presentation
+
+from owui_stub import start_stub
+from powerpoint.render_manager import find_soffice
+from powerpoint.server import create_server
+
+
+class Scenario:
+    """
+    One benchmarked tool call. prepare(bench, run) returns the arguments of a run and may set
+    up state it needs without being timed.
+    """
+
+    def __init__(self, name: str, tool: str, prepare: Callable[["Bench", int], Awaitable[Dict[str, Any]]],
+                 params: Optional[Dict[str, Any]] = None, uploads: bool = False):
+        self.name = name
+        self.tool = tool
+        self.prepare = prepare
+        self.params = params or {}
+        self.uploads = uploads
+
+
+class Bench:
+    """Drives a server built by create_server through its call_tool request handler."""
+
+    def __init__(self, folder: str, owui_url: str, stub, work_dir: str):
+        self.folder = folder
+        self.stub = stub
+        self.server, self.shutdown = create_server(
+            folder, owui_url, "benchmark-token",
+            image_generator="fake",
+            image_cache_dir=os.path.join(work_dir, "image-cache"),
+            render_cache_dir=os.path.join(work_dir, "render-cache"))
+        self._call_tool = self.server.request_handlers[types.CallToolRequest]
+        self._decks = set()
+
+    async def call(self, name: str, arguments: Dict[str, Any]) -> types.CallToolResult:
+        request = types.CallToolRequest(method="tools/call",
+                                        params=types.CallToolRequestParams(name=name, arguments=arguments))
+        result = (await self._call_tool(request)).root
+        if result.isError:
+            raise RuntimeError(f"{name} failed: {result.content[0].text if result.content else ''}")
+        return result
+
+    async def new_deck(self, name: str):
+        await self.call("create-presentation", {"name": name})
+        self._decks.add(name)
+
+    async def ensure_deck(self, name: str):
+        if name not in self._decks:
+            await self.new_deck(name)
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def content_bytes(result: types.CallToolResult) -> int:
+    total = 0
+    for content in result.content:
+        if content.type == "text":
+            total += len(content.text.encode("utf-8"))
+        elif content.type == "image":
+            total += len(content.data) * 3 // 4
+    return total
+
+
+def slide_specs(count: int) -> List[Dict[str, Any]]:
+    """A mix of text, table and chart slides for build-presentation."""
+    specs = []
+    for index in range(count):
+        if index % 5 == 3:
+            specs.append({"type": "table", "title": f"Table {index}",
+                          "data": {"headers": ["Region", "Q1", "Q2", "Q3"],
+                                   "rows": [[f"Region {r}", r * 10, r * 11, r * 12] for r in range(8)]}})
+        elif index % 5 == 4:
+            specs.append({"type": "chart", "title": f"Chart {index}",
+                          "data": {"categories": ["North", "South", "East", "West"],
+                                   "series": [{"name": "Sales", "values": [12, 19, 7, 15]},
+                                              {"name": "Costs", "values": [8, 11, 5, 9]}]}})
+        else:
+            specs.append({"type": "title-content", "title": f"Slide {index}",
+                          "content": "First point\n- Detail\nSecond point\nThird point"})
+    return specs
+
+
+def build_scenarios(args) -> List[Scenario]:
+    scenarios = []
+
+    async def create(bench, run):
+        return {"name": f"create-{run}"}
+    scenarios.append(Scenario("create-presentation", "create-presentation", create))
+
+    async def title_only(bench, run):
+        await bench.ensure_deck("text")
+        return {"presentation_name": "text", "title": f"Title {run}"}
+    scenarios.append(Scenario("add-slide-title-only", "add-slide-title-only", title_only))
+
+    async def section(bench, run):
+        await bench.ensure_deck("text")
+        return {"presentation_name": "text", "header": f"Section {run}", "subtitle": "Subtitle"}
+    scenarios.append(Scenario("add-slide-section-header", "add-slide-section-header", section))
+
+    async def title_content(bench, run):
+        await bench.ensure_deck("text")
+        return {"presentation_name": "text", "title": f"Content {run}",
+                "content": "\n".join(f"Point {i}\n- Detail {i}" for i in range(6))}
+    scenarios.append(Scenario("add-slide-title-content", "add-slide-title-content", title_content))
+
+    async def comparison(bench, run):
+        await bench.ensure_deck("text")
+        return {"presentation_name": "text", "title": f"Compare {run}",
+                "left_side_title": "Before", "left_side_content": "One\nTwo\nThree",
+                "right_side_title": "After", "right_side_content": "Four\nFive\nSix"}
+    scenarios.append(Scenario("add-slide-comparison", "add-slide-comparison", comparison))
+
+    for rows in args.table_rows:
+        async def table(bench, run, rows=rows):
+            await bench.ensure_deck(f"table-{rows}")
+            return {"presentation_name": f"table-{rows}", "title": f"Table {run}",
+                    "data": {"headers": [f"Column {c}" for c in range(10)],
+                             "rows": [[f"Row {r}"] + [r * c + 0.5 for c in range(1, 10)] for r in range(rows)]}}
+        scenarios.append(Scenario(f"add-slide-title-with-table rows={rows}", "add-slide-title-with-table",
+                                  table, {"rows": rows, "columns": 10}))
+
+    for points in args.chart_points:
+        async def chart(bench, run, points=points):
+            await bench.new_deck(f"chart-{points}-{run}")
+            return {"presentation_name": f"chart-{points}-{run}", "title": "Signal",
+                    "data": {"series": [{"name": "Signal", "x": [i * 0.01 for i in range(points)],
+                                         "y": [(i * 7919) % 1000 / 10 for i in range(points)]}]}}
+        scenarios.append(Scenario(f"add-slide-title-with-chart points={points}", "add-slide-title-with-chart",
+                                  chart, {"points": points}))
+
+    for size in args.image_sizes:
+        width, height = (int(value) for value in size.split("x"))
+
+        async def picture(bench, run, width=width, height=height):
+            await bench.ensure_deck(f"picture-{width}x{height}")
+            # The tool deletes the image once it is inserted, and noise keeps every run unique
+            file_name = f"picture-{width}x{height}-{run}.jpg"
+            Image.effect_noise((width, height), 60).convert("RGB").save(os.path.join(bench.folder, file_name))
+            return {"presentation_name": f"picture-{width}x{height}", "title": "Picture",
+                    "caption": "Caption", "image_path": file_name}
+        scenarios.append(Scenario(f"add-slide-picture-with-caption {size}", "add-slide-picture-with-caption",
+                                  picture, {"width": width, "height": height}))
+
+    async def generate(bench, run):
+        return {"prompt": f"A lighthouse at dusk, variation {run} {time.time_ns()}", "file_name": f"generated-{run}.png"}
+    scenarios.append(Scenario("generate-and-save-image", "generate-and-save-image", generate))
+
+    async def generate_cached(bench, run):
+        return {"prompt": "A lighthouse at dusk", "file_name": f"cached-{run}.png"}
+    scenarios.append(Scenario("generate-and-save-image cached", "generate-and-save-image", generate_cached))
+
+    for slides in args.deck_slides:
+        async def build(bench, run, slides=slides):
+            return {"name": f"build-{slides}-{run}", "slides": slide_specs(slides)}
+        scenarios.append(Scenario(f"build-presentation slides={slides}", "build-presentation", build,
+                                  {"slides": slides}))
+
+        async def save(bench, run, slides=slides):
+            if run == 0:
+                await bench.call("build-presentation", {"name": f"save-{slides}", "slides": slide_specs(slides)})
+            # Edit one slide so every save has a change to write
+            await bench.call("add-slide-title-only", {"presentation_name": f"save-{slides}", "title": f"Edit {run}"})
+            return {"presentation_name": f"save-{slides}"}
+        scenarios.append(Scenario(f"save-presentation slides={slides}", "save-presentation", save,
+                                  {"slides": slides}, uploads=True))
+
+        async def open_deck(bench, run, slides=slides):
+            path = os.path.join(bench.folder, f"open-{slides}.pptx")
+            if not os.path.exists(path):
+                prs = Presentation()
+                for index in range(slides):
+                    slide = prs.slides.add_slide(prs.slide_layouts[1])
+                    slide.shapes.title.text = f"Slide {index}"
+                    slide.placeholders[1].text = "First point\nSecond point"
+                prs.save(path)
+            return {"presentation_name": f"open-{slides}"}
+        scenarios.append(Scenario(f"open-presentation slides={slides}", "open-presentation", open_deck,
+                                  {"slides": slides}))
+
+        async def undo(bench, run, slides=slides):
+            if run == 0:
+                await bench.call("build-presentation", {"name": f"undo-{slides}", "slides": slide_specs(slides)})
+            # Undo touches only the slides an operation added, whatever the size of the deck
+            await bench.call("add-slide-title-content", {"presentation_name": f"undo-{slides}",
+                                                         "title": f"Edit {run}", "content": "One\nTwo"})
+            return {"presentation_name": f"undo-{slides}"}
+        scenarios.append(Scenario(f"undo-operation slides={slides}", "undo-operation", undo,
+                                  {"slides": slides}))
+
+    if find_soffice():
+        async def render(bench, run):
+            if run == 0:
+                await bench.call("build-presentation", {"name": "render", "slides": slide_specs(10)})
+            # One new slide per run: the rest of the deck comes from the render cache
+            await bench.call("add-slide-title-only", {"presentation_name": "render", "title": f"Edit {run}"})
+            return {"presentation_name": "render", "width": 640}
+        scenarios.append(Scenario("render-presentation one edited slide", "render-presentation", render))
+
+    async def stats(bench, run):
+        return {}
+    scenarios.append(Scenario("get-server-stats", "get-server-stats", stats))
+    return scenarios
+
+
+async def run_scenario(bench: Bench, scenario: Scenario, repeat: int, warmup: int) -> Dict[str, Any]:
+    timings = []
+    outputs = []
+    for run in range(warmup + repeat):
+        arguments = await scenario.prepare(bench, run)
+        uploaded = bench.stub.bytes_received
+        start = time.perf_counter()
+        result = await bench.call(scenario.tool, arguments)
+        elapsed = (time.perf_counter() - start) * 1000
+        if run < warmup:
+            continue
+        timings.append(elapsed)
+        outputs.append(bench.stub.bytes_received - uploaded if scenario.uploads else content_bytes(result))
+    return {
+        "scenario": scenario.name,
+        "tool": scenario.tool,
+        "params": scenario.params,
+        "runs": repeat,
+        "latency_ms": {
+            "p50": round(percentile(timings, 0.5), 3),
+            "p90": round(percentile(timings, 0.9), 3),
+            "p99": round(percentile(timings, 0.99), 3),
+            "max": round(max(timings), 3),
+            "mean": round(statistics.fmean(timings), 3),
+        },
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "output_bytes": int(statistics.median(outputs)),
+    }
+
+
+def environment() -> Dict[str, Any]:
+    versions = {}
+    for package in ("mcp", "python-pptx", "pillow", "XlsxWriter"):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "packages": versions,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def report(results: List[Dict[str, Any]], baseline: Optional[Dict[str, Any]]):
+    previous = {result["scenario"]: result for result in (baseline or {}).get("results", [])}
+    header = f"{'scenario':<48} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'rss MB':>8} {'output KB':>10}"
+    if previous:
+        header += f" {'p50 vs base':>12}"
+    print(header)
+    for result in results:
+        latency = result["latency_ms"]
+        line = (f"{result['scenario']:<48} {latency['p50']:9.1f} {latency['p90']:9.1f} {latency['p99']:9.1f} "
+                f"{result['peak_rss_mb']:8.1f} {result['output_bytes'] / 1024:10.1f}")
+        before = previous.get(result["scenario"])
+        if before:
+            line += f" {latency['p50'] / max(before['latency_ms']['p50'], 1e-9):11.2f}x"
+        print(line)
+
+
+async def run_all(args) -> List[Dict[str, Any]]:
+    owui_url, stub = start_stub()
+    with tempfile.TemporaryDirectory(prefix="pptx-bench-") as work_dir:
+        folder = os.path.join(work_dir, "decks")
+        os.makedirs(folder)
+        bench = Bench(folder, owui_url, stub, work_dir)
+        try:
+            results = []
+            for scenario in build_scenarios(args):
+                if args.only and not any(pattern in scenario.name for pattern in args.only):
+                    continue
+                results.append(await run_scenario(bench, scenario, args.repeat, args.warmup))
+                print(f"  {scenario.name}: done", file=sys.stderr)
+            return results
+        finally:
+            bench.shutdown()
+            stub.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every MCP tool in-process")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--table-rows", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--chart-points", type=int, nargs="+", default=[100, 10000, 100000])
+    parser.add_argument("--image-sizes", nargs="+", default=["640x480", "1920x1080", "3840x2160"])
+    parser.add_argument("--deck-slides", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--only", nargs="+", help="Run only scenarios whose name contains one of these")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--compare", help="Compare p50 latencies against a previous --json file")
+    args = parser.parse_args()
+
+    logging.getLogger("mcp_powerpoint_server").setLevel(logging.WARNING)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results = asyncio.run(run_all(args))
+    report(results, baseline)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
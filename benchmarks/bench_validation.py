@@ -0,0 +1,102 @@
+"""
+Measure what validating tool arguments against their input schemas costs per call, for small
+slide edits up to tables and charts with 100k values. The schemas are the server's own. When
+the jsonschema package is installed it is timed on the same payloads for reference.
+
+    uv run python benchmarks/bench_validation.py --repeat 20
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+
+import mcp.types as types
+
+from powerpoint.schema_validator import SchemaError, compile_validator
+from powerpoint.server import create_server
+
+try:
+    import jsonschema
+except ImportError:
+    jsonschema = None
+
+
+def tool_schemas():
+    server, shutdown = create_server(tempfile.mkdtemp(), "http://127.0.0.1:1", "benchmark-token",
+                                     image_generator="fake")
+    try:
+        listing = asyncio.run(server.request_handlers[types.ListToolsRequest](
+            types.ListToolsRequest(method="tools/list")))
+        return {tool.name: tool.inputSchema for tool in listing.root.tools}
+    finally:
+        shutdown()
+
+
+def payloads():
+    text = {"presentation_name": "deck", "title": "Title",
+            "content": "First point\n\tDetail\nSecond point\nThird point"}
+    yield "add-slide-title-only", "title only", {"presentation_name": "deck", "title": "Title"}
+    yield "add-slide-title-content", "title and content", text
+    for rows in (10, 1000):
+        yield "add-slide-title-with-table", f"table {rows}x10", {
+            "presentation_name": "deck", "title": "Table",
+            "data": {"headers": [f"Column {c}" for c in range(10)],
+                     "rows": [[f"Row {r}"] + [r * c + 0.5 for c in range(1, 10)] for r in range(rows)]}}
+    for points in (100, 10000, 100000):
+        yield "add-slide-title-with-chart", f"chart {points} values", {
+            "presentation_name": "deck", "title": "Chart",
+            "data": {"categories": [f"Item {i}" for i in range(points)],
+                     "series": [{"name": "Sales", "values": [i * 0.5 for i in range(points)]}]}}
+    yield "add-slide-title-with-chart", "chart 100000 x/y columns", {
+        "presentation_name": "deck", "title": "Chart",
+        "data": {"series": [{"name": "Signal", "x": [i * 0.01 for i in range(100000)],
+                             "y": [i % 100 for i in range(100000)]}]}}
+    yield "add-slide-title-with-chart", "chart 10000 [x, y] pairs", {
+        "presentation_name": "deck", "title": "Chart",
+        "data": {"series": [{"name": "Signal", "values": [[i * 0.01, i % 100] for i in range(10000)]}]}}
+    yield "build-presentation", "build 50 slides", {
+        "name": "deck",
+        "slides": [{"type": "title-content", "title": f"Slide {i}", "content": "One\nTwo"} for i in range(50)]}
+
+
+def measure(validate, arguments, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        validate(arguments)
+        timings.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tool argument validation benchmark")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    schemas = tool_schemas()
+    start = time.perf_counter()
+    validators = {name: compile_validator(schema) for name, schema in schemas.items()}
+    print(f"Compiled {len(validators)} tool schemas in {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    reference = {}
+    if jsonschema is not None:
+        reference = {name: jsonschema.Draft7Validator(schema).validate for name, schema in schemas.items()}
+
+    print(f"  {'payload':<28} {'compiled us':>12}" + (f" {'jsonschema us':>14}" if reference else ""))
+    for tool, label, arguments in payloads():
+        line = f"  {label:<28} {measure(validators[tool], arguments, args.repeat):12.1f}"
+        if reference:
+            line += f" {measure(reference[tool], arguments, max(1, args.repeat // 5)):14.1f}"
+        print(line)
+
+    bad = {"presentation_name": "deck", "title": "Chart",
+           "data": {"series": [{"name": "Sales", "values": [1, 2, "three"]}]}}
+    try:
+        validators["add-slide-title-with-chart"](bad)
+    except SchemaError as e:
+        print(f"Rejected payload: {e.errors}")
+
+
+if __name__ == "__main__":
+    main()
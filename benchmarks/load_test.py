@@ -0,0 +1,246 @@
+"""
+Load test the SSE transport. The server runs in its own process with --transport sse and
+N clients connect to it at once, each calling a tool in a loop for a fixed time. Reports
+requests/sec, latency percentiles, errors and calls rejected as busy for every client count.
+Images come from the fake generator and decks are uploaded to a local stub of Open-WebUI.
+
+--stdio runs the same workload with every client spawning its own stdio server process, the
+way clients are served without the SSE transport, for comparison. Connect time includes
+starting that process.
+
+    uv run python benchmarks/load_test.py --clients 1 4 16 --duration 10
+    uv run python benchmarks/load_test.py --clients 4 --workload stats --stdio
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from typing import Any, Callable, Dict, List
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.sse import sse_client
+from mcp.client.stdio import stdio_client
+
+from owui_stub import start_stub
+
+SERVER_COMMAND = [sys.executable, "-c", "import powerpoint; powerpoint.main()"]
+
+# Seconds to wait for the SSE server to answer its health check
+STARTUP_TIMEOUT = 60
+
+
+def free_port(host: str) -> int:
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+def server_arguments(folder: str, owui_url: str, args) -> List[str]:
+    return ["--folder-path", folder, "--owui-url", owui_url, "--owui-token", "load-test",
+            "--image-generator", "fake",
+            "--max-concurrent-calls", str(args.max_concurrent_calls),
+            "--max-queued-calls", str(args.max_queued_calls)]
+
+
+def health(url: str) -> Dict[str, Any]:
+    with urllib.request.urlopen(f"{url}/health", timeout=5) as response:
+        return json.load(response)
+
+
+def start_sse_server(folder: str, owui_url: str, args):
+    """Start the server with the SSE transport and return (process, base URL) once it answers."""
+    port = free_port(args.host)
+    command = SERVER_COMMAND + server_arguments(folder, owui_url, args) + [
+        "--transport", "sse", "--host", args.host, "--port", str(port),
+        "--max-connections", str(args.max_connections)]
+    process = subprocess.Popen(command)
+    url = f"http://{args.host}:{port}"
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while True:
+        try:
+            health(url)
+            break
+        except OSError:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                raise RuntimeError("The SSE server did not start")
+            time.sleep(0.2)
+    return process, url
+
+
+def stop_server(process: subprocess.Popen):
+    process.send_signal(signal.SIGINT)
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def workload_call(workload: str, deck: str):
+    """Return the tool and arguments a client calls in its loop."""
+    if workload == "stats":
+        return "get-server-stats", {}
+    return "add-slide-title-content", {"presentation_name": deck, "title": "Load test",
+                                       "content": "First point\n\tDetail\nSecond point"}
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def is_busy(response) -> bool:
+    return bool(response.content) and response.content[0].text.startswith("Server busy")
+
+
+class StartGate:
+    """Opens once every client connected or failed to, so the connected ones start together."""
+
+    def __init__(self, clients: int):
+        self.remaining = clients
+        self.opened = asyncio.Event()
+
+    def settle(self):
+        self.remaining -= 1
+        if self.remaining <= 0:
+            self.opened.set()
+
+
+async def run_client(connect: Callable, deck: str, workload: str, duration: float,
+                     gate: StartGate, result: Dict[str, Any]):
+    start = time.perf_counter()
+    settled = False
+    try:
+        async with connect() as (read_stream, write_stream):
+            async with ClientSession(read_stream, write_stream) as session:
+                await session.initialize()
+                if workload == "slides":
+                    # Setup retries calls turned away as busy, only the timed calls count them
+                    while True:
+                        response = await session.call_tool("create-presentation", {"name": deck})
+                        if not (response.isError and is_busy(response)):
+                            break
+                        await asyncio.sleep(0.05)
+                result["connect"].append(time.perf_counter() - start)
+                settled = True
+                gate.settle()
+                await gate.opened.wait()
+                await call_loop(session, *workload_call(workload, deck), duration, result)
+    finally:
+        if not settled:
+            gate.settle()
+
+
+async def call_loop(session: ClientSession, tool: str, arguments: Dict[str, Any], duration: float,
+                    result: Dict[str, Any]):
+    result.setdefault("started", time.perf_counter())
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        call_start = time.perf_counter()
+        response = await session.call_tool(tool, arguments)
+        if not response.isError:
+            result["latencies"].append(time.perf_counter() - call_start)
+        elif is_busy(response):
+            result["busy"] += 1
+        else:
+            result["errors"] += 1
+
+
+async def run_phase(connect_for: Callable[[int], Callable], clients: int, workload: str,
+                    duration: float, label: str) -> Dict[str, Any]:
+    result = {"connect": [], "latencies": [], "errors": 0, "busy": 0}
+    gate = StartGate(clients)
+    outcomes = await asyncio.gather(
+        *(run_client(connect_for(index), f"load-{label}-{clients}-{index}", workload, duration,
+                     gate, result)
+          for index in range(clients)),
+        return_exceptions=True)
+    elapsed = time.perf_counter() - result.get("started", time.perf_counter())
+    failed = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+    for outcome in failed:
+        logging.warning(f"Client failed: {outcome!r}")
+    latencies = result["latencies"]
+    return {
+        "transport": label,
+        "clients": clients,
+        "requests": len(latencies),
+        "requests_per_second": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "connect_p50_ms": percentile(result["connect"], 0.5) * 1000,
+        "errors": result["errors"] + len(failed),
+        "busy": result["busy"],
+    }
+
+
+def report(results: List[Dict[str, Any]]):
+    print(f"{'transport':<10} {'clients':>7} {'requests':>9} {'req/s':>9} {'p50 ms':>9} "
+          f"{'p99 ms':>9} {'connect ms':>11} {'errors':>7} {'busy':>6}")
+    for row in results:
+        print(f"{row['transport']:<10} {row['clients']:>7} {row['requests']:>9} "
+              f"{row['requests_per_second']:>9.1f} {row['p50_ms']:>9.1f} {row['p99_ms']:>9.1f} "
+              f"{row['connect_p50_ms']:>11.1f} {row['errors']:>7} {row['busy']:>6}")
+
+
+async def run_all(args) -> List[Dict[str, Any]]:
+    owui_url, stub = start_stub()
+    folder = tempfile.mkdtemp(prefix="powerpoint-load-")
+    results = []
+
+    process, url = start_sse_server(folder, owui_url, args)
+    try:
+        for clients in args.clients:
+            results.append(await run_phase(lambda index: lambda: sse_client(f"{url}/sse"),
+                                           clients, args.workload, args.duration, "sse"))
+        print(f"SSE server: {json.dumps(health(url))}")
+    finally:
+        stop_server(process)
+
+    if args.stdio:
+        parameters = StdioServerParameters(command=SERVER_COMMAND[0],
+                                           args=SERVER_COMMAND[1:] + server_arguments(folder, owui_url, args),
+                                           env=dict(os.environ))
+        for clients in args.clients:
+            results.append(await run_phase(lambda index: lambda: stdio_client(parameters),
+                                           clients, args.workload, args.duration, "stdio"))
+
+    stub.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the SSE transport with concurrent clients")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--duration", type=float, default=10, help="Seconds each client count runs")
+    parser.add_argument("--workload", choices=["slides", "stats"], default="slides",
+                        help="Add a slide to a deck per client, or only read the server's stats")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--max-connections", type=int, default=64)
+    parser.add_argument("--max-concurrent-calls", type=int, default=0)
+    parser.add_argument("--max-queued-calls", type=int, default=64)
+    parser.add_argument("--stdio", action="store_true", help="Also run every client against its own stdio server")
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_all(args))
+    report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+A stand-in for Open-WebUI's file upload endpoint, so benchmarks can save presentations
+without a real server. Every upload is read in full, its multipart form parsed and its file
+answered with a new id, or with an error status after fail_next() was called, to exercise
+retries. Requests framed with both Content-Length and Transfer-Encoding are rejected with 400,
+as Open-WebUI's server does.
+"""
+import json
+import re
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+
+def parse_multipart(content_type: str, body: bytes) -> Dict[str, Tuple[Optional[str], bytes]]:
+    """Return the fields of a multipart/form-data body as {name: (file name, content)}."""
+    match = re.search(r'boundary="?([^";]+)"?', content_type)
+    if not content_type.startswith("multipart/form-data") or match is None:
+        raise ValueError("Not a multipart form")
+    delimiter = b"--" + match.group(1).encode("latin-1")
+    parts = body.split(delimiter)
+    if len(parts) < 3 or not parts[-1].startswith(b"--"):
+        raise ValueError("The form has no closing boundary")
+    fields = {}
+    for part in parts[1:-1]:
+        head, separator, content = part.partition(b"\r\n\r\n")
+        if not separator or not head.startswith(b"\r\n") or not content.endswith(b"\r\n"):
+            raise ValueError("Malformed form part")
+        disposition = re.search(rb'Content-Disposition: form-data; name="([^"]*)"(?:; filename="([^"]*)")?',
+                                head, re.IGNORECASE)
+        if disposition is None:
+            raise ValueError("Form part without a name")
+        file_name = disposition.group(2)
+        fields[disposition.group(1).decode("utf-8")] = (
+            file_name.decode("utf-8") if file_name is not None else None, content[:-2])
+    return fields
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def read_body(self) -> bytes:
+        length = self.headers.get("Content-Length")
+        if self.headers.get("Transfer-Encoding") is None:
+            return self.rfile.read(int(length or 0))
+        # Chunked upload
+        chunks = []
+        while True:
+            size = int(self.rfile.readline().strip(), 16)
+            if size == 0:
+                self.rfile.readline()
+                break
+            chunks.append(self.rfile.read(size))
+            self.rfile.readline()
+        return b"".join(chunks)
+
+    def do_POST(self):
+        if self.headers.get("Content-Length") is not None and self.headers.get("Transfer-Encoding") is not None:
+            # The body's framing is ambiguous, it cannot be read safely
+            self.server.record_malformed()
+            self.close_connection = True
+            self.answer(400, {"detail": "Invalid HTTP request received."})
+            return
+
+        body = self.read_body()
+        try:
+            file_name, content = parse_multipart(self.headers.get("Content-Type", ""), body)["file"]
+        except (KeyError, ValueError):
+            self.server.record_malformed()
+            self.answer(422, {"detail": "A file field is required"})
+            return
+
+        status = self.server.record(file_name, content, len(body))
+        if status == 200:
+            self.answer(status, {"id": str(uuid.uuid4()), "filename": file_name})
+        else:
+            self.answer(status, {"detail": "Stub failure"})
+
+    def answer(self, status: int, payload: Dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address):
+        super().__init__(address, StubHandler)
+        self._lock = threading.Lock()
+        self.uploads = 0
+        self.bytes_received = 0
+        self.requests = 0
+        self.malformed = 0
+        self.last_upload: Optional[Tuple[Optional[str], bytes]] = None
+        self._failures = 0
+        self._failure_status = 503
+
+    def fail_next(self, count: int, status: int = 503):
+        """Answer the next count uploads with status instead of accepting them."""
+        with self._lock:
+            self._failures = count
+            self._failure_status = status
+
+    def record(self, file_name: Optional[str], content: bytes, received: int) -> int:
+        """Count a received upload, keep the last one and return the status to answer it with."""
+        with self._lock:
+            self.requests += 1
+            if self._failures:
+                self._failures -= 1
+                return self._failure_status
+            self.uploads += 1
+            self.bytes_received += received
+            self.last_upload = (file_name, content)
+            return 200
+
+    def record_malformed(self):
+        """Count a request that was rejected before it reached the upload."""
+        with self._lock:
+            self.requests += 1
+            self.malformed += 1
+
+
+def start_stub(host: str = "127.0.0.1") -> Tuple[str, StubServer]:
+    """Serve the stub on a free port in a background thread and return (base URL, server)."""
+    server = StubServer((host, 0))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://{host}:{server.server_address[1]}", server
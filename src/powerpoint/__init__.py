@@ -13,8 +13,189 @@ def main():
                        help="URL of the Open-WebUI server to upload completed decks to.")
     parser.add_argument('--owui-token',
                        help="Token for the Open-WebUI server to upload completed decks to.")
+    parser.add_argument('--io-workers',
+                       type=int,
+                       default=8,
+                       help="Number of threads for blocking save, upload and image generation work.")
+    parser.add_argument('--cpu-workers',
+                       type=int,
+                       default=0,
+                       help="Number of processes for CPU-heavy work. 0 runs it on the I/O threads.")
+    parser.add_argument('--max-pending',
+                       type=int,
+                       default=64,
+                       help="Maximum number of in-flight jobs per worker pool before callers wait.")
+    parser.add_argument('--template-dir',
+                       help="Folder of .pptx templates that presentations can be created from.")
+    parser.add_argument('--max-presentations',
+                       type=int,
+                       default=32,
+                       help="Open presentations kept in memory before the least recently used are spilled to disk.")
+    parser.add_argument('--memory-budget-mb',
+                       type=int,
+                       default=512,
+                       help="Estimated memory for open presentations before the least recently used are spilled to disk.")
+    parser.add_argument('--idle-ttl',
+                       type=float,
+                       default=1800,
+                       help="Seconds a presentation can stay unused before it is spilled to disk. 0 disables.")
+    parser.add_argument('--spill-dir',
+                       help="Folder for spilled presentations. Defaults to a temporary folder.")
+    parser.add_argument('--upload-timeout',
+                       type=float,
+                       default=60,
+                       help="Seconds to wait for Open-WebUI to respond to an upload.")
+    parser.add_argument('--upload-retries',
+                       type=int,
+                       default=3,
+                       help="Times a failed upload is retried, with exponential backoff.")
+    parser.add_argument('--upload-concurrency',
+                       type=int,
+                       default=4,
+                       help="Maximum number of uploads to Open-WebUI in flight at once.")
+    parser.add_argument('--save-mode',
+                       choices=['memory', 'mmap', 'disk'],
+                       default='memory',
+                       help="How decks are serialized for upload: in memory, in a memory-mapped temporary "
+                            "file, or persisted to the folder path.")
+    parser.add_argument('--image-generator',
+                       choices=['gemini', 'fake'],
+                       default='gemini',
+                       help="Image generator. 'fake' draws placeholder images locally, for tests and benchmarks.")
+    parser.add_argument('--image-cache-dir',
+                       help="Folder for the generated image cache. Defaults to a folder in the system temp directory.")
+    parser.add_argument('--image-cache-mb',
+                       type=int,
+                       default=256,
+                       help="Size of the generated image cache before the least recently used images are evicted.")
+    parser.add_argument('--image-concurrency',
+                       type=int,
+                       default=4,
+                       help="Maximum number of image generations in flight at once.")
+    parser.add_argument('--image-dpi',
+                       type=int,
+                       default=150,
+                       help="Resolution images are downscaled to at their size on the slide. 0 embeds images as they are.")
+    parser.add_argument('--image-quality',
+                       type=int,
+                       default=85,
+                       help="JPEG quality for photos embedded in slides (1-95).")
+    parser.add_argument('--media-cache-mb',
+                       type=int,
+                       default=256,
+                       help="Size of the image store shared by all open presentations.")
+    parser.add_argument('--incremental-save',
+                       action=argparse.BooleanOptionalAction,
+                       default=True,
+                       help="Reuse the compressed bytes of parts unchanged since a presentation's last save.")
+    parser.add_argument('--compress-level',
+                       type=int,
+                       default=6,
+                       choices=range(0, 10),
+                       metavar='{0-9}',
+                       help="Deflate level for XML parts of saved decks. Lower levels save faster, higher ones smaller.")
+    parser.add_argument('--store-media',
+                       action=argparse.BooleanOptionalAction,
+                       default=True,
+                       help="Store already compressed media (JPEG, PNG, video, embedded workbooks) without deflating it again.")
+    parser.add_argument('--compress-workers',
+                       type=int,
+                       help="Threads that deflate large parts in parallel when saving. Defaults to the number of cores, up to 4.")
+    parser.add_argument('--chart-max-points',
+                       type=int,
+                       default=0,
+                       help="Downsample charts with more points than this. 0 keeps every point unless a chart sets max_points.")
+    parser.add_argument('--static-charts',
+                       action=argparse.BooleanOptionalAction,
+                       default=False,
+                       help="Add charts without an embedded workbook unless a chart sets static. Their data can't be edited in PowerPoint.")
+    parser.add_argument('--soffice-path',
+                       help="LibreOffice executable used to render slides. Defaults to soffice or libreoffice on PATH.")
+    parser.add_argument('--render-workers',
+                       type=int,
+                       help="Worker processes that render slides in parallel. Defaults to the number of cores, up to 4.")
+    parser.add_argument('--render-cache-dir',
+                       help="Folder for cached slide renders. Defaults to a folder in the system temp directory.")
+    parser.add_argument('--render-cache-mb',
+                       type=int,
+                       default=256,
+                       help="Size of the render cache before the least recently used renders are evicted.")
+    parser.add_argument('--metrics-port',
+                       type=int,
+                       default=0,
+                       help="Serve per-tool latency histograms, call counters and in-flight gauges as Prometheus text at /metrics on this port. 0 disables the endpoint.")
+    parser.add_argument('--metrics-host',
+                       default="127.0.0.1",
+                       help="Address the metrics endpoint listens on.")
+    parser.add_argument('--trace-file',
+                       help="Append a JSON line with the timed stages of every tool call to this file.")
+    parser.add_argument('--transport',
+                       choices=['stdio', 'sse'],
+                       default='stdio',
+                       help="Serve one client over stdio, or many clients from one process over HTTP with server-sent events.")
+    parser.add_argument('--host',
+                       default="127.0.0.1",
+                       help="Address the SSE transport listens on.")
+    parser.add_argument('--port',
+                       type=int,
+                       default=8000,
+                       help="Port the SSE transport listens on.")
+    parser.add_argument('--max-connections',
+                       type=int,
+                       default=32,
+                       help="Clients connected over SSE at once. More are answered with 503 and asked to retry.")
+    parser.add_argument('--max-concurrent-calls',
+                       type=int,
+                       default=0,
+                       help="Tool calls running at once across all clients, more wait for a slot. 0 runs every call right away.")
+    parser.add_argument('--max-queued-calls',
+                       type=int,
+                       default=64,
+                       help="Tool calls waiting for a slot before further calls are rejected as busy.")
     args = parser.parse_args()
-    asyncio.run(server.main(args.folder_path, args.owui_url, args.owui_token))
+    try:
+        asyncio.run(server.main(args.folder_path, args.owui_url, args.owui_token,
+                                io_workers=args.io_workers,
+                                cpu_workers=args.cpu_workers,
+                                max_pending=args.max_pending,
+                                template_dir=args.template_dir,
+                                max_presentations=args.max_presentations,
+                                memory_budget_mb=args.memory_budget_mb,
+                                idle_ttl=args.idle_ttl,
+                                spill_dir=args.spill_dir,
+                                upload_timeout=args.upload_timeout,
+                                upload_retries=args.upload_retries,
+                                upload_concurrency=args.upload_concurrency,
+                                save_mode=args.save_mode,
+                                image_generator=args.image_generator,
+                                image_cache_dir=args.image_cache_dir,
+                                image_cache_mb=args.image_cache_mb,
+                                image_concurrency=args.image_concurrency,
+                                image_dpi=args.image_dpi,
+                                image_quality=args.image_quality,
+                                media_cache_mb=args.media_cache_mb,
+                                incremental_save=args.incremental_save,
+                                compress_level=args.compress_level,
+                                store_media=args.store_media,
+                                compress_workers=args.compress_workers,
+                                chart_max_points=args.chart_max_points,
+                                static_charts=args.static_charts,
+                                soffice_path=args.soffice_path,
+                                render_workers=args.render_workers,
+                                render_cache_dir=args.render_cache_dir,
+                                render_cache_mb=args.render_cache_mb,
+                                metrics_port=args.metrics_port,
+                                metrics_host=args.metrics_host,
+                                trace_file=args.trace_file,
+                                max_concurrent_calls=args.max_concurrent_calls,
+                                max_queued_calls=args.max_queued_calls,
+                                transport=args.transport,
+                                host=args.host,
+                                port=args.port,
+                                max_connections=args.max_connections))
+    except KeyboardInterrupt:
+        # Ctrl-C is how the SSE server is stopped
+        pass
 
 # Optionally expose other important items at package level
-__all__ = ['main', 'server']
\ No newline at end of file
+__all__ = ['main', 'server']
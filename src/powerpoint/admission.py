@@ -0,0 +1,87 @@
+import asyncio
+import contextlib
+import logging
+import time
+from typing import Any, Dict
+
+from .metrics import record_stage
+
+logger = logging.getLogger('mcp_powerpoint_server')
+
+
+class ServerBusyError(ValueError):
+    """A tool call turned away because too many calls are already waiting."""
+
+
+class CallAdmission:
+    """
+    Bounds the tool calls running at once across every client of the server. Calls over
+    max_concurrent wait for a free slot in arrival order. Once max_queued calls are waiting,
+    further calls are rejected straight away with ServerBusyError, so under overload clients
+    are told to retry instead of piling up behind an ever longer queue.
+    A max_concurrent of 0 admits every call.
+    """
+
+    def __init__(self, max_concurrent: int = 0, max_queued: int = 64):
+        if max_concurrent < 0:
+            raise ValueError("max_concurrent must not be negative")
+        if max_queued < 0:
+            raise ValueError("max_queued must not be negative")
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self._slots = asyncio.Semaphore(max_concurrent) if max_concurrent else None
+        self.running = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.max_waiting = 0
+        self.total_wait = 0.0
+
+    @contextlib.asynccontextmanager
+    async def admit(self):
+        """Hold a call slot for the duration of the block, waiting for one if needed."""
+        if self._slots is None:
+            self.admitted += 1
+            self.running += 1
+            try:
+                yield
+            finally:
+                self.running -= 1
+            return
+
+        if self._slots.locked() and self.waiting >= self.max_queued:
+            self.rejected += 1
+            raise ServerBusyError(
+                f"Server busy: {self.running} calls running and {self.waiting} waiting, retry later")
+
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        start = time.perf_counter()
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        wait = time.perf_counter() - start
+        self.total_wait += wait
+        record_stage("queue_wait", wait)
+
+        self.admitted += 1
+        self.running += 1
+        try:
+            yield
+        finally:
+            self.running -= 1
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the limits and how many calls are running, waiting, admitted and rejected."""
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queued": self.max_queued,
+            "running": self.running,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "total_wait_ms": round(self.total_wait * 1000, 3),
+        }
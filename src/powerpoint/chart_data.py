@@ -0,0 +1,538 @@
+import re
+import ast
+import csv
+import array
+import base64
+import sys
+import zipfile
+from io import BytesIO
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+from pptx.chart.data import (CategoryChartData, CategorySeriesData, XyChartData,
+                             XySeriesData)
+from pptx.chart.xlsx import CategoryWorkbookWriter, XyWorkbookWriter
+from pptx.opc.constants import CONTENT_TYPE as CT
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.parts.chart import ChartPart
+from pptx.util import lazyproperty
+
+try:
+    import numpy
+except ImportError:  # a dependency, but the stdlib readers below keep sources working without it
+    numpy = None
+
+# NumPy dtype -> array module typecode, for reading .npy files and buffers without NumPy
+_TYPECODES = {
+    "f8": "d", "f4": "f",
+    "i8": "q", "i4": "i", "i2": "h", "i1": "b",
+    "u8": "Q", "u4": "I", "u2": "H", "u1": "B",
+}
+_DTYPE_ALIASES = {
+    "float64": "f8", "float32": "f4",
+    "int64": "i8", "int32": "i4", "int16": "i2", "int8": "i1",
+    "uint64": "u8", "uint32": "u4", "uint16": "u2", "uint8": "u1",
+}
+
+
+def _typecode(dtype: str) -> Tuple[str, bool]:
+    """Return (array typecode, byteswap needed) for a NumPy dtype string like '<f8' or 'float32'."""
+    dtype = _DTYPE_ALIASES.get(dtype, dtype)
+    order = dtype[0] if dtype[:1] in "<>|=" else "="
+    code = _TYPECODES.get(dtype.lstrip("<>|="))
+    if code is None:
+        raise ValueError(f"Unsupported dtype {dtype}, use one of {', '.join(_DTYPE_ALIASES)}")
+    native = "<" if sys.byteorder == "little" else ">"
+    return code, order not in ("|", "=", native)
+
+
+def _columns_from_bytes(raw: bytes, dtype: str, shape: Sequence[int],
+                        fortran_order: bool = False) -> List[List[Any]]:
+    """Split a packed 1D or 2D numeric array into per-column lists."""
+    code, swap = _typecode(dtype)
+    values = array.array(code)
+    values.frombytes(raw)
+    if swap:
+        values.byteswap()
+    if len(shape) == 1:
+        return [values.tolist()]
+    if len(shape) != 2:
+        raise ValueError(f"Arrays must be 1D or 2D, got shape {tuple(shape)}")
+    rows, cols = shape
+    if len(values) != rows * cols:
+        raise ValueError(f"Array has {len(values)} values, expected {rows * cols} for shape {tuple(shape)}")
+    if fortran_order:
+        return [values[col * rows:(col + 1) * rows].tolist() for col in range(cols)]
+    return [values[col::cols].tolist() for col in range(cols)]
+
+
+def read_npy(path: str) -> List[List[Any]]:
+    """
+    Read a 1D or 2D numeric .npy file into per-column lists. Uses NumPy when it is installed,
+    otherwise parses the .npy header and loads the data with the array module.
+
+    Args:
+        path: The .npy file
+    """
+    if numpy is not None:
+        data = numpy.load(path, allow_pickle=False)
+        if data.ndim == 1:
+            return [data.tolist()]
+        if data.ndim != 2:
+            raise ValueError(f"Arrays must be 1D or 2D, got shape {data.shape}")
+        return [column.tolist() for column in data.T]
+
+    with open(path, "rb") as f:
+        if f.read(6) != b"\x93NUMPY":
+            raise ValueError(f"{path} is not a .npy file")
+        major = f.read(2)[0]
+        header_length = int.from_bytes(f.read(2 if major == 1 else 4), "little")
+        header = ast.literal_eval(f.read(header_length).decode("latin1"))
+        return _columns_from_bytes(f.read(), header["descr"], header["shape"],
+                                   header.get("fortran_order", False))
+
+
+def read_buffer(source: Dict[str, Any]) -> List[List[Any]]:
+    """
+    Decode an inline array buffer: base64 of packed C-order numbers with a dtype and shape.
+
+    Args:
+        source: {"buffer": base64 string, "dtype": e.g. "float64", "shape": [rows] or [rows, cols]}
+    """
+    try:
+        raw = base64.b64decode(source["buffer"], validate=True)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid base64 buffer: {str(e)}")
+    dtype = source.get("dtype", "float64")
+    shape = source.get("shape")
+    if not shape:
+        shape = [len(raw) // array.array(_typecode(dtype)[0]).itemsize]
+    return _columns_from_bytes(raw, dtype, shape)
+
+
+def read_csv(path: str, numeric: Sequence[int], text: Sequence[int],
+             delimiter: str = ",") -> Tuple[List[str], Dict[int, List[Any]]]:
+    """
+    Read the header and the requested columns of a CSV file. Numeric columns are parsed with
+    NumPy's C parser when it is installed, otherwise with the csv module and float().
+
+    Args:
+        path: The CSV file, with a header row
+        numeric: Indexes of columns parsed as numbers
+        text: Indexes of columns kept as strings
+        delimiter: The field separator
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader, None)
+        if header is None:
+            raise ValueError(f"{path} is empty")
+        if numpy is None or not numeric:
+            rows = list(reader)
+
+    columns: Dict[int, List[Any]] = {}
+    if numpy is not None and numeric:
+        data = numpy.loadtxt(path, delimiter=delimiter, skiprows=1, usecols=list(numeric),
+                             ndmin=2, dtype=float, encoding="utf-8-sig")
+        for position, index in enumerate(numeric):
+            columns[index] = data[:, position].tolist()
+        if text:
+            with open(path, newline="", encoding="utf-8-sig") as f:
+                rows = list(csv.reader(f, delimiter=delimiter))[1:]
+
+    if text or numpy is None:
+        transposed = list(zip(*rows)) if rows else [() for _ in header]
+        for index in text:
+            columns[index] = list(transposed[index])
+        if numpy is None:
+            for index in numeric:
+                try:
+                    columns[index] = list(map(float, transposed[index]))
+                except ValueError as e:
+                    raise ValueError(f"Column {header[index]} is not numeric: {str(e)}")
+    return header, columns
+
+
+def _without_nan(values: List[Any]) -> List[Any]:
+    # NaN can't be written to chart XML or the workbook, treat it as a missing point
+    if any(value != value for value in values):
+        return [None if value != value else value for value in values]
+    return values
+
+
+def _column_index(column: Any, names: Sequence[str]) -> int:
+    if isinstance(column, int) and not isinstance(column, bool):
+        if not 0 <= column < len(names):
+            raise ValueError(f"Column index {column} is out of range for {len(names)} columns")
+        return column
+    if column in names:
+        return list(names).index(column)
+    raise ValueError(f"Unknown column {column!r}, available columns: {', '.join(map(str, names))}")
+
+
+def _select_columns(source: Dict[str, Any], names: Sequence[str]) -> Tuple[Optional[int], Optional[int], List[int]]:
+    """Return the (category column, x column, y columns) indexes a source asks for."""
+    label_index = x_index = None
+    if source.get("categories") is not None:
+        label_index = _column_index(source["categories"], names)
+    if source.get("x") is not None:
+        x_index = _column_index(source["x"], names)
+    if source.get("y"):
+        y_indexes = [_column_index(column, names) for column in source["y"]]
+    else:
+        y_indexes = [i for i in range(len(names)) if i not in (label_index, x_index)]
+    if not y_indexes:
+        raise ValueError("source has no columns to plot")
+    return label_index, x_index, y_indexes
+
+
+def load_chart_source(data: Dict[str, Any], resolve_path: Callable[[str], str]) -> Dict[str, Any]:
+    """
+    Expand a chart's "source" into inline categories and series. Chart data without a source
+    is returned unchanged.
+
+    The source is either a file ({"path": "data.csv"} or {"path": "data.npy"}) or an inline
+    array buffer ({"buffer": base64, "dtype": "float64", "shape": [rows, cols]}), plus:
+        x: column holding X values, which makes an XY chart
+        categories: column holding category labels, which makes a category chart
+        y: columns to plot as series (default: every other column)
+        names: column names for .npy files and buffers (default: "Series 1", ...)
+
+    Columns are given by name or index. Without x or categories, the row number is used as X.
+
+    Args:
+        data: The "data" argument of a chart tool
+        resolve_path: Maps a file name to a safe absolute path, raising ValueError when the
+            name is not allowed
+    """
+    source = data.get("source")
+    if not source:
+        return data
+    if not isinstance(source, dict):
+        raise ValueError("source must be an object")
+    if source.get("x") is not None and source.get("categories") is not None:
+        raise ValueError("source can have x or categories, not both")
+
+    path = source.get("path")
+    if path and path.lower().endswith(".csv"):
+        path = resolve_path(path)
+        delimiter = source.get("delimiter", ",")
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            names = next(csv.reader(f, delimiter=delimiter), [])
+        label_index, x_index, y_indexes = _select_columns(source, names)
+        numeric = y_indexes + ([x_index] if x_index is not None else [])
+        text = [label_index] if label_index is not None else []
+        _, columns = read_csv(path, numeric, text, delimiter)
+        column_list = [columns.get(i) for i in range(len(names))]
+    else:
+        if path and path.lower().endswith(".npy"):
+            column_list = read_npy(resolve_path(path))
+        elif path:
+            raise ValueError("source path must be a .csv or .npy file")
+        elif source.get("buffer"):
+            column_list = read_buffer(source)
+        else:
+            raise ValueError("source needs a path or a buffer")
+        names = list(source.get("names") or [f"Series {i + 1}" for i in range(len(column_list))])
+        if len(names) != len(column_list):
+            raise ValueError(f"names has {len(names)} entries for {len(column_list)} columns")
+        label_index, x_index, y_indexes = _select_columns(source, names)
+
+    expanded = {key: value for key, value in data.items() if key != "source"}
+    if label_index is not None:
+        expanded["categories"] = [str(label) for label in column_list[label_index]]
+        expanded["series"] = [{"name": str(names[i]), "values": _without_nan(column_list[i])}
+                              for i in y_indexes]
+    else:
+        rows = len(column_list[y_indexes[0]])
+        xs = _without_nan(column_list[x_index]) if x_index is not None else list(range(rows))
+        expanded["series"] = [{"name": str(names[i]), "x": xs, "y": _without_nan(column_list[i])}
+                              for i in y_indexes]
+        if x_index is not None and "x_axis" not in expanded:
+            expanded["x_axis"] = str(names[x_index])
+    return expanded
+
+
+def xy_columns(series: Dict[str, Any]) -> Tuple[List[Any], List[Any]]:
+    """Return (x values, y values) of an XY series given as "x" and "y" columns or [x, y] pairs."""
+    if "x" in series:
+        xs, ys = list(series["x"]), list(series["y"])
+        if len(xs) != len(ys):
+            raise ValueError(f"Series {series.get('name')} has {len(xs)} x values and {len(ys)} y values")
+        return xs, ys
+    values = series.get("values") or []
+    if not values:
+        return [], []
+    xs, ys = zip(*values)
+    return list(xs), list(ys)
+
+
+
+def bubble_columns(series: Dict[str, Any]) -> Tuple[List[Any], List[Any], List[Any]]:
+    """Return (x, y, size) values of a bubble series given as columns or [x, y, size] triples."""
+    if "x" in series:
+        xs, ys, sizes = list(series["x"]), list(series["y"]), list(series["size"])
+        if not len(xs) == len(ys) == len(sizes):
+            raise ValueError(f"Series {series.get('name')} needs as many x, y and size values")
+        return xs, ys, sizes
+    values = series.get("values") or []
+    if not values:
+        return [], [], []
+    xs, ys, sizes = zip(*values)
+    return list(xs), list(ys), list(sizes)
+
+# Minimal SpreadsheetML package for chart workbooks
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+_XLSX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/></Relationships>'
+)
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets></workbook>'
+)
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/></Relationships>'
+)
+_XLSX_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+
+def _cells(values: Iterable[Any]) -> List[str]:
+    """Return the <c> element of each value. Cells carry no reference, their position is implied."""
+    return ["<c/>" if value is None else
+            f'<c t="inlineStr"><is><t>{escape(value)}</t></is></c>' if isinstance(value, str) else
+            f"<c><v>{value}</v></c>"
+            for value in values]
+
+
+def _rows_xml(first_row: int, columns: Sequence[Sequence[Any]]) -> str:
+    """Return consecutive <row> elements, starting at first_row, for equal-length columns."""
+    cells = [_cells(column) for column in columns]
+    return "".join(f'<row r="{row}">{"".join(row_cells)}</row>'
+                   for row, row_cells in enumerate(zip(*cells), start=first_row))
+
+
+def build_xlsx(sheet_data: str) -> bytes:
+    """
+    Package generated <row> elements as a single-sheet workbook.
+
+    Args:
+        sheet_data: The content of the sheet's <sheetData> element
+    """
+    sheet = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+             '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+             f'<sheetData>{sheet_data}</sheetData></worksheet>')
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as xlsx:
+        xlsx.writestr("[Content_Types].xml", _XLSX_CONTENT_TYPES)
+        xlsx.writestr("_rels/.rels", _XLSX_RELS)
+        xlsx.writestr("xl/workbook.xml", _XLSX_WORKBOOK)
+        xlsx.writestr("xl/_rels/workbook.xml.rels", _XLSX_WORKBOOK_RELS)
+        xlsx.writestr("xl/styles.xml", _XLSX_STYLES)
+        xlsx.writestr("xl/worksheets/sheet1.xml", sheet)
+    return buffer.getvalue()
+
+
+# The numCache python-pptx writes for a series whose values were withheld as a token
+_WITHHELD_CACHE = re.compile(
+    r'<c:numCache>\s*<c:formatCode>(?P<format>[^<]*)</c:formatCode>\s*<c:ptCount val="\d+"/>\s*'
+    r'<c:pt idx="0">\s*<c:v>(?P<token>@@withheld-\d+@@)</c:v>\s*</c:pt>\s*</c:numCache>')
+
+
+def _num_cache_xml(format_code: str, values: Sequence[Any]) -> str:
+    points = "".join(f'<c:pt idx="{idx}"><c:v>{value}</c:v></c:pt>'
+                     for idx, value in enumerate(values) if value is not None)
+    return (f'<c:numCache><c:formatCode>{format_code}</c:formatCode>'
+            f'<c:ptCount val="{len(values)}"/>{points}</c:numCache>')
+
+
+class _BulkChartData:
+    """
+    Mixin for chart data that writes large value caches itself. python-pptx generates the
+    chart XML with each series' values withheld behind a one-point token, and every token's
+    cache is then replaced with the full values in a single pass, without building or
+    parsing the points element by element.
+    """
+
+    _withheld: Optional[Dict[str, Sequence[Any]]] = None
+
+    def withhold(self, values: Sequence[Any]) -> Sequence[Any]:
+        """Return values, or a token standing in for them while the chart XML is generated."""
+        if self._withheld is None:
+            return values
+        token = f"@@withheld-{len(self._withheld)}@@"
+        self._withheld[token] = values
+        return [token]
+
+    def xml_bytes(self, chart_type):
+        self._withheld = {}
+        try:
+            chart_xml = self._xml(chart_type)
+            withheld = self._withheld
+        finally:
+            self._withheld = None
+        chart_xml = _WITHHELD_CACHE.sub(
+            lambda match: _num_cache_xml(match.group("format"), withheld[match.group("token")]),
+            chart_xml)
+        return chart_xml.encode("utf-8")
+
+
+class BulkCategoryWorkbookWriter(CategoryWorkbookWriter):
+    """
+    Writes the workbook of a category chart in python-pptx's layout (categories in column A,
+    one column per series) as one generated sheet, instead of cell by cell through XlsxWriter.
+    Only single-level categories are supported; number formats stay in the chart XML.
+    """
+
+    @property
+    def xlsx_blob(self) -> bytes:
+        chart_data = self._chart_data
+        labels = [category.label for category in chart_data.categories]
+        columns = [series.values for series in chart_data]
+        length = max([len(labels)] + [len(values) for values in columns])
+        padded = [list(column) + [None] * (length - len(column)) for column in [labels] + columns]
+        header = _rows_xml(1, [[None]] + [[series.name] for series in chart_data])
+        return build_xlsx(header + _rows_xml(2, padded))
+
+
+class BulkXyWorkbookWriter(XyWorkbookWriter):
+    """
+    Writes the workbook of an XY chart in python-pptx's layout (one two-column table per
+    series, X in column A and Y in column B) as one generated sheet.
+    """
+
+    @property
+    def xlsx_blob(self) -> bytes:
+        parts = []
+        for series in self._chart_data:
+            offset = self.series_table_row_offset(series)
+            parts.append(_rows_xml(offset + 1, [[None], [series.name]]))
+            parts.append(_rows_xml(offset + 2, [series.x_values, series.y_values]))
+        return build_xlsx("".join(parts))
+
+
+class BulkCategorySeriesData(CategorySeriesData):
+    """A category series holding its values as one list instead of a data point per value."""
+
+    def __init__(self, chart_data, name, values, number_format):
+        super().__init__(chart_data, name, number_format)
+        self._values = list(values)
+
+    def __getitem__(self, index):
+        return self._values[index]
+
+    def __len__(self):
+        return len(self._values)
+
+    @property
+    def values(self):
+        return self._chart_data.withhold(self._values)
+
+
+class BulkXySeriesData(XySeriesData):
+    """An XY series holding its X and Y values as two lists instead of a data point per pair."""
+
+    def __init__(self, chart_data, name, x_values, y_values, number_format):
+        super().__init__(chart_data, name, number_format)
+        self._x_values = list(x_values)
+        self._y_values = list(y_values)
+
+    def __getitem__(self, index):
+        return self._x_values[index], self._y_values[index]
+
+    def __len__(self):
+        return len(self._x_values)
+
+    @property
+    def x_values(self):
+        return self._chart_data.withhold(self._x_values)
+
+    @property
+    def y_values(self):
+        return self._chart_data.withhold(self._y_values)
+
+
+class BulkCategoryChartData(_BulkChartData, CategoryChartData):
+    """CategoryChartData that takes whole value lists and writes its XML and workbook in bulk."""
+
+    def add_series(self, name, values=(), number_format=None):
+        series_data = BulkCategorySeriesData(self, name, values, number_format)
+        self.append(series_data)
+        return series_data
+
+    @lazyproperty
+    def _workbook_writer(self):
+        return BulkCategoryWorkbookWriter(self)
+
+
+class BulkXyChartData(_BulkChartData, XyChartData):
+    """XyChartData that takes whole X and Y columns and writes its XML and workbook in bulk."""
+
+    def add_series(self, name, x_values=(), y_values=(), number_format=None):
+        series_data = BulkXySeriesData(self, name, x_values, y_values, number_format)
+        self.append(series_data)
+        return series_data
+
+    @lazyproperty
+    def _workbook_writer(self):
+        return BulkXyWorkbookWriter(self)
+
+
+def add_static_chart(shapes, chart_type, x, y, cx, cy, chart_data):
+    """
+    Add a chart like SlideShapes.add_chart, without the workbook python-pptx embeds for its
+    data. The chart is drawn from the values cached in its XML; PowerPoint shows it as usual
+    but can't open its data for editing. Returns the chart's graphic frame.
+
+    Args:
+        shapes: The slide's shapes
+        chart_type: The chart type
+        x: Left position in EMU
+        y: Top position in EMU
+        cx: Width in EMU
+        cy: Height in EMU
+        chart_data: The chart data
+    """
+    slide_part = shapes.part
+    package = slide_part.package
+    chart_part = ChartPart.load(package.next_partname(ChartPart.partname_template), CT.DML_CHART,
+                                package, chart_data.xml_bytes(chart_type))
+    rId = slide_part.relate_to(chart_part, RT.CHART)
+    graphic_frame = shapes._add_chart_graphicFrame(rId, x, y, cx, cy)
+    shapes._recalculate_extents()
+    return shapes._shape_factory(graphic_frame)
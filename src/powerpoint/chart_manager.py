@@ -1,66 +1,222 @@
+import threading
+from collections import OrderedDict
+
 from pptx.chart import chart
-from pptx.chart.data import CategoryChartData, XyChartData
+from pptx.chart.data import BubbleChartData
 from pptx.enum.chart import XL_CHART_TYPE
 from pptx.util import Inches
 from pptx.enum.chart import XL_LEGEND_POSITION
-from typing import Literal, Union, List, Dict, Any
+from typing import Literal, Union, List, Dict, Any, Optional, Tuple
+
+from .chart_data import (BulkCategoryChartData, BulkXyChartData, add_static_chart, bubble_columns,
+                         xy_columns)
+from .chart_profile import ChartProfile, data_digest, histogram_bins, profile_chart_data
+from .downsample import lttb_indices, min_max_fill, take
+
+# Charts that show every value on its own, reducing their points would change what they say
+NO_DOWNSAMPLING = ("PIE", "DOUGHNUT", "RADAR", "BUBBLE")
+
+# Profiles of recently charted data kept for retried payloads
+PROFILE_CACHE_SIZE = 256
+
+# Ascending XY data with at least this many points is drawn as a line
+LINE_MIN_POINTS = 20
 
 class ChartManager:
-    def __init__(self):
+    def __init__(self, max_points: int = 0, static: bool = False):
+        """
+        Args:
+            max_points: Default point budget per chart, larger charts are downsampled.
+                0 keeps every point unless a chart sets its own "max_points"
+            static: Add charts without an embedded workbook unless a chart sets "static"
+        """
         self.name = "Chart Manager"
+        self.max_points = max_points
+        self.static = static
+        self._lock = threading.Lock()
+        self._profiles: OrderedDict[str, ChartProfile] = OrderedDict()
+        self.profile_hits = 0
+        self.profile_misses = 0
+
+    def profile(self, data: Dict[str, Any]) -> ChartProfile:
+        """
+        Return the profile of chart data, memoized by a hash of its categories and series
+        so a retried payload is not profiled again.
+
+        Args:
+            data: The chart data
+        """
+        digest = data_digest(data)
+        with self._lock:
+            profile = self._profiles.get(digest)
+            if profile is not None:
+                self._profiles.move_to_end(digest)
+                self.profile_hits += 1
+                return profile
+            self.profile_misses += 1
+
+        profile = profile_chart_data(data)
+        with self._lock:
+            self._profiles[digest] = profile
+            if len(self._profiles) > PROFILE_CACHE_SIZE:
+                self._profiles.popitem(last=False)
+        return profile
 
     def determine_chart_type(self, data: Dict[str, Any]) -> tuple[XL_CHART_TYPE, str]:
         """
         Analyze the data structure and determine the most appropriate chart type.
-        Returns tuple of (PowerPoint chart type enum, chart_format)
+        Returns tuple of (PowerPoint chart type enum, chart_format), where chart_format is
+        "category", "xy", "bubble" or "histogram". Values are only binned into a histogram
+        when the data sets "histogram".
         """
-        # evaluate the data
-        series_count = len(data["series"])
-        categories = data.get("categories", [])
-
-        # Check for XY data more safely by checking the first value of each series
-        is_xy_data = False
-        for series in data["series"]:
-            values = series.get("values", [])
-            if values:
-                first_value = values[0]
-                is_xy_data = isinstance(first_value, (list, tuple)) and len(first_value) == 2
-                break
-
-        if is_xy_data:
+        profile = self.profile(data)
+
+        if data.get("histogram"):
+            if profile.format != "category" or profile.series_count != 1 or not profile.numeric:
+                raise ValueError("A histogram needs exactly one series of numbers")
+            return XL_CHART_TYPE.COLUMN_CLUSTERED, "histogram"
+
+        if profile.format == "bubble":
+            return XL_CHART_TYPE.BUBBLE, "bubble"
+
+        # XY data sorted by x is a measured curve, draw it as a line
+        if profile.format == "xy":
+            if profile.x_increasing and profile.points >= LINE_MIN_POINTS:
+                return XL_CHART_TYPE.XY_SCATTER_LINES_NO_MARKERS, "xy"
             return XL_CHART_TYPE.XY_SCATTER, "xy"
 
-        # If we have percentage data that adds up to ~100, suggest pie chart
-        if series_count == 1 and categories:
-            values = data["series"][0].get("values", [])
-            if len(values) <= 8:
-                try:
-                    total = sum(float(v) for v in values)
-                    if 95 <= total <= 105:
-                        return XL_CHART_TYPE.PIE, "category"
-                except (TypeError, ValueError):
-                    pass
+        # If we have percentage data that adds up to ~100, suggest pie chart, or a doughnut
+        # with a ring per series
+        if profile.categories and profile.points <= 8 and profile.non_negative and \
+                all(95 <= total <= 105 for total in profile.series_sums):
+            if profile.series_count == 1:
+                return XL_CHART_TYPE.PIE, "category"
+            return XL_CHART_TYPE.DOUGHNUT, "category"
+
+        # Series that split every category's ~100% between them are parts of a whole
+        parts_of_whole = profile.series_count > 1 and bool(profile.category_sums) and \
+            profile.non_negative and all(95 <= total <= 105 for total in profile.category_sums)
 
         # For time series or trending data, suggest line chart
-        if categories and any(
-                isinstance(cat, (str, int)) and
-                any(term in str(cat).lower() for term in
-                    ["date", "time", "year", "month", "quarter", "q1", "q2", "q3", "q4"])
-                for cat in categories
-        ):
+        if profile.categories and profile.date_like:
+            if parts_of_whole:
+                return XL_CHART_TYPE.AREA_STACKED_100, "category"
             return XL_CHART_TYPE.LINE, "category"
 
         # For multiple series comparing values, suggest bar chart
-        if series_count > 1 and categories:
+        if profile.series_count > 1 and profile.categories:
+            if parts_of_whole:
+                return XL_CHART_TYPE.BAR_STACKED_100, "category"
             return XL_CHART_TYPE.BAR_CLUSTERED, "category"
 
         # Default to column chart for single series
         return XL_CHART_TYPE.COLUMN_CLUSTERED, "category"
 
+    @staticmethod
+    def data_errors(data: Dict[str, Any], chart_format: str) -> List[str]:
+        """
+        Return the problems that would stop the data from being charted in chart_format,
+        each prefixed with the field it is about, or an empty list when there are none.
+        A category chart needs categories and exactly one value per category in every series.
+
+        Args:
+            data: The chart data
+            chart_format: The format returned by determine_chart_type()
+        """
+        if chart_format != "category":
+            return []
+        categories = data.get("categories") or []
+        if not categories:
+            return ["categories: is required"]
+        errors = []
+        for index, series in enumerate(data.get("series", [])):
+            values = series.get("values") or []
+            if len(values) != len(categories):
+                errors.append(f"series[{index}].values: has {len(values)} values "
+                              f"for {len(categories)} categories")
+        return errors
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the profile memo's size and hit/miss counters."""
+        with self._lock:
+            return {
+                "max_points": self.max_points,
+                "static": self.static,
+                "profiles": len(self._profiles),
+                "profile_hits": self.profile_hits,
+                "profile_misses": self.profile_misses,
+            }
+
+    def downsample(self, data: Dict[str, Any], chart_type: XL_CHART_TYPE,
+                   chart_format: str = "category") -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """
+        Reduce a chart's data to its point budget: data["max_points"] when given, otherwise
+        the manager's max_points. Line and XY charts keep the points that preserve the
+        line's shape (LTTB), other charts keep the minimum and maximum of evenly sized
+        buckets of categories. Returns (data to chart, summary), where the summary holds the
+        method and the original and kept point counts, or None when nothing was reduced.
+
+        Args:
+            data: The chart data, in the same shape as add_chart_to_slide takes
+            chart_type: The chart type the data will be drawn as
+            chart_format: "category" or "xy"
+        """
+        budget = data.get("max_points", self.max_points)
+        if not budget or chart_format not in ("category", "xy") or \
+                chart_type.name.startswith(NO_DOWNSAMPLING):
+            return data, None
+        budget = int(budget)
+        if budget < 0:
+            raise ValueError("max_points must not be negative")
+
+        series_list = data["series"]
+        if chart_format == "xy":
+            columns = [xy_columns(series) for series in series_list]
+            original = sum(len(x_values) for x_values, _ in columns)
+            if original <= budget:
+                return data, None
+            # Every series gets an equal share of the budget
+            threshold = max(3, budget // len(series_list))
+            reduced = []
+            for series, (x_values, y_values) in zip(series_list, columns):
+                indices = lttb_indices(x_values, y_values, threshold)
+                reduced.append({"name": series["name"], "x": take(x_values, indices),
+                                "y": take(y_values, indices)})
+            method = "lttb"
+        else:
+            columns = [series["values"] for series in series_list]
+            categories = data.get("categories", [])
+            count = max([len(categories)] + [len(values) for values in columns])
+            original = count * len(series_list)
+            if original <= budget:
+                return data, None
+            per_series = max(3, budget // len(series_list))
+            if chart_type.name.startswith("LINE") and len(series_list) == 1:
+                indices = lttb_indices(range(count), columns[0], per_series)
+                method = "lttb"
+            else:
+                # The series share their categories, so they share the kept indices
+                indices = min_max_fill(columns, per_series)
+                method = "min-max"
+            reduced = [{"name": series["name"], "values": take(values, indices)}
+                       for series, values in zip(series_list, columns)]
+
+        reduced_data = {key: value for key, value in data.items() if key not in ("series", "categories")}
+        reduced_data["series"] = reduced
+        if chart_format != "xy" and categories:
+            reduced_data["categories"] = take(categories, indices)
+        points = sum(len(series.get("y", series.get("values", []))) for series in reduced)
+        return reduced_data, {"method": method, "original_points": original, "points": points}
 
     def add_chart_to_slide(self, slide, chart_type: XL_CHART_TYPE, data: Dict[str, Any],
                            chart_format: str = "category") -> chart:
-        """Add a chart to the slide with the specified data."""
+        """
+        Add a chart to the slide with the specified data. Category and XY series values are
+        handed to the chart XML and workbook writers as whole columns, without a python-pptx
+        data point object per value. Histogram values are binned into counts first.
+        Static charts (data["static"], defaulting to the manager's static setting) are added
+        without an embedded workbook.
+        """
         # Position chart in the middle of the slide with margins
         left = Inches(1)
         top = Inches(2)
@@ -68,7 +224,7 @@ class ChartManager:
         height = Inches(5)
 
         if chart_format == "category":
-            chart_data = CategoryChartData()
+            chart_data = BulkCategoryChartData()
             chart_data.categories = data.get("categories", [])
 
             # Add each series
@@ -76,19 +232,42 @@ class ChartManager:
                 chart_data.add_series(series["name"], series["values"])
 
         elif chart_format == "xy":
-            chart_data = XyChartData()
+            chart_data = BulkXyChartData()
 
-            # Add each series
+            # Add each series, given as [x, y] pairs or as "x" and "y" columns
             for series in data["series"]:
-                series_data = chart_data.add_series(series["name"])
-                for x, y in series["values"]:
-                    series_data.add_data_point(x, y)
+                x_values, y_values = xy_columns(series)
+                chart_data.add_series(series["name"], x_values, y_values)
+
+        elif chart_format == "bubble":
+            chart_data = BubbleChartData()
+
+            # Add each series, given as [x, y, size] triples or as "x", "y" and "size" columns
+            for series in data["series"]:
+                bubble_series = chart_data.add_series(series["name"])
+                for x, y, size in zip(*bubble_columns(series)):
+                    bubble_series.add_data_point(x, y, size)
+
+        elif chart_format == "histogram":
+            # Chart how many values fall in each bin
+            series = data["series"][0]
+            bins = histogram_bins(series["values"])
+            chart_data = BulkCategoryChartData()
+            chart_data.categories = bins["categories"]
+            chart_data.add_series(series["name"], bins["counts"])
 
         # Add and configure the chart
-        graphic_frame = slide.shapes.add_chart(
-            chart_type, left, top, width, height, chart_data
-        )
+        if data.get("static", self.static):
+            graphic_frame = add_static_chart(slide.shapes, chart_type, left, top, width, height,
+                                             chart_data)
+        else:
+            graphic_frame = slide.shapes.add_chart(
+                chart_type, left, top, width, height, chart_data
+            )
         chart = graphic_frame.chart
+        if chart_format == "histogram":
+            # Bins of a histogram touch
+            chart.plots[0].gap_width = 0
 
         # Basic formatting
         chart.has_legend = True
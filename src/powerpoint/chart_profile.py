@@ -0,0 +1,217 @@
+import re
+import math
+import array
+import hashlib
+import operator
+import itertools
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Category labels that suggest a time axis, matched against all labels at once, one per line
+_DATE_TERMS = re.compile(
+    r"date|time|year|month|quarter|q[1-4]|week|"
+    r"\b(jan(uary)?|feb(ruary)?|mar(ch)?|apr(il)?|may|june?|july?|aug(ust)?|sept?(ember)?|"
+    r"oct(ober)?|nov(ember)?|dec(ember)?)\b|"
+    r"^(19|20)\d\d$|^\d{4}[-/]\d{1,2}([-/]\d{1,2})?|^\d{1,2}/\d{1,2}/\d{2,4}$", re.MULTILINE)
+
+# Labels checked at each end of a long category axis
+DATE_SAMPLE = 128
+
+# Stacked 100% charts are only chosen for data this short
+PARTS_OF_WHOLE_MAX_CATEGORIES = 50
+
+
+def data_digest(data: Dict[str, Any]) -> str:
+    """Return a hash of the parts of chart data that decide its chart type."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(_column_bytes(data.get("categories") or []))
+    for series in data["series"]:
+        for key in sorted(series):
+            digest.update(key.encode("utf-8"))
+            digest.update(_column_bytes(series[key]))
+    return digest.hexdigest()
+
+
+def _column_bytes(values: Any) -> bytes:
+    # Packing numbers is far faster than formatting them, other values fall back to repr
+    if isinstance(values, list):
+        try:
+            return b"d" + array.array("d", values).tobytes()
+        except TypeError:
+            pass
+    return b"r" + repr(values).encode("utf-8")
+
+
+def _is_date_like(categories: Sequence[Any]) -> bool:
+    # Axis labels are uniform, the ends of a long axis tell whether it is a time axis
+    if len(categories) > 2 * DATE_SAMPLE:
+        categories = list(categories[:DATE_SAMPLE]) + list(categories[-DATE_SAMPLE:])
+    labels = "\n".join(str(category) for category in categories if not isinstance(category, bool))
+    return _DATE_TERMS.search(labels.lower()) is not None
+
+
+class ChartProfile:
+    """
+    What a chart's data looks like, computed once and reused to pick its chart type.
+
+    format is "category", "xy" or "bubble". For category data the per-point fields cover
+    every series' values, for XY and bubble data the y values; x_increasing tells whether
+    every XY series has its x values in ascending order.
+    """
+
+    def __init__(self):
+        self.format = "category"
+        self.series_count = 0
+        self.points = 0
+        self.categories = 0
+        self.distinct_categories = 0
+        self.date_like = False
+        self.numeric = True
+        self.minimum: Optional[float] = None
+        self.maximum: Optional[float] = None
+        self.series_sums: List[float] = []
+        self.category_sums: List[float] = []
+        self.x_increasing = True
+
+    @property
+    def non_negative(self) -> bool:
+        return self.minimum is None or self.minimum >= 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "format": self.format,
+            "series_count": self.series_count,
+            "points": self.points,
+            "categories": self.categories,
+            "distinct_categories": self.distinct_categories,
+            "date_like": self.date_like,
+            "numeric": self.numeric,
+            "minimum": self.minimum,
+            "maximum": self.maximum,
+            "x_increasing": self.x_increasing,
+        }
+
+
+def _series_format(series: Dict[str, Any]) -> str:
+    if "size" in series:
+        return "bubble"
+    if "x" in series:
+        return "xy"
+    values = series.get("values") or []
+    if values and isinstance(values[0], (list, tuple)):
+        return "bubble" if len(values[0]) == 3 else "xy"
+    return "category"
+
+
+def _numbers(values: Sequence[Any]) -> Tuple[List[float], bool]:
+    """Return the finite numbers among values and whether every other value was None."""
+    numbers = []
+    numeric = True
+    for value in values:
+        if value is None:
+            continue
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            numeric = False
+            continue
+        if number == number and not math.isinf(number):
+            numbers.append(number)
+    return numbers, numeric
+
+
+def _ascending(values: Sequence[Any]) -> bool:
+    try:
+        return all(map(operator.le, values, itertools.islice(values, 1, None)))
+    except TypeError:
+        return False
+
+
+def profile_chart_data(data: Dict[str, Any]) -> ChartProfile:
+    """
+    Profile chart data: its shape, the range and sums of its values, whether XY data is
+    ordered by x, and whether its categories look like dates. Every column is read once, by
+    builtin reductions when it holds plain numbers.
+
+    Args:
+        data: Chart data with "series" and optional "categories", as charts are added with
+    """
+    profile = ChartProfile()
+    series_list = data["series"]
+    categories = data.get("categories") or []
+    profile.series_count = len(series_list)
+    profile.categories = len(categories)
+    profile.date_like = _is_date_like(categories)
+    try:
+        profile.distinct_categories = len(set(categories))
+    except TypeError:
+        profile.distinct_categories = len(set(map(str, categories)))
+
+    for series in series_list:
+        # The first series with values decides the format
+        if series.get("values") or "x" in series:
+            profile.format = _series_format(series)
+            break
+
+    columns = []
+    for series in series_list:
+        if profile.format == "category":
+            values = series.get("values") or []
+        elif "x" in series:
+            values = series["y"]
+            profile.x_increasing = profile.x_increasing and _ascending(series["x"])
+        else:
+            pairs = series.get("values") or []
+            values = [pair[1] for pair in pairs]
+            profile.x_increasing = profile.x_increasing and _ascending([pair[0] for pair in pairs])
+        profile.points = max(profile.points, len(values))
+
+        try:
+            # Plain numbers, perhaps with gaps: reduce in C
+            present = [value for value in values if value is not None] if None in values else values
+            total, low, high = sum(present), min(present, default=None), max(present, default=None)
+            if total != total or math.isinf(total):
+                raise ValueError("NaN or infinite values")
+        except (TypeError, ValueError):
+            numbers, numeric = _numbers(values)
+            profile.numeric = profile.numeric and numeric
+            total, low, high = sum(numbers), min(numbers, default=None), max(numbers, default=None)
+        profile.series_sums.append(float(total))
+        if low is not None:
+            profile.minimum = low if profile.minimum is None else min(profile.minimum, low)
+            profile.maximum = high if profile.maximum is None else max(profile.maximum, high)
+        columns.append(values)
+
+    # Per-category totals only matter for short multi-series data, see PARTS_OF_WHOLE_MAX_CATEGORIES
+    if profile.format == "category" and profile.series_count > 1 and \
+            0 < profile.categories <= PARTS_OF_WHOLE_MAX_CATEGORIES:
+        sums = [0.0] * profile.categories
+        for values in columns:
+            for index, value in enumerate(values[:profile.categories]):
+                if isinstance(value, (int, float)) and value == value:
+                    sums[index] += value
+        profile.category_sums = sums
+    return profile
+
+
+def histogram_bins(values: Sequence[Any]) -> Dict[str, Any]:
+    """
+    Bin numeric values into equal-width buckets, Sturges' rule deciding their number.
+    Returns {"categories": bucket labels, "counts": values per bucket}.
+
+    Args:
+        values: The values to bin, None and non-numeric values are skipped
+    """
+    numbers, _ = _numbers(values)
+    if not numbers:
+        return {"categories": [], "counts": []}
+
+    low, high = min(numbers), max(numbers)
+    if low == high:
+        return {"categories": [f"{low:g}"], "counts": [len(numbers)]}
+    bins = math.ceil(math.log2(len(numbers))) + 1
+    width = (high - low) / bins
+    counts = [0] * bins
+    for number in numbers:
+        counts[min(int((number - low) / width), bins - 1)] += 1
+    categories = [f"{low + i * width:.4g}–{low + (i + 1) * width:.4g}" for i in range(bins)]
+    return {"categories": categories, "counts": counts}
@@ -0,0 +1,182 @@
+import os
+import logging
+from typing import Any, Callable, Dict, List
+
+from .presentation_manager import PresentationManager
+from .chart_manager import ChartManager
+from .table_writer import table_data_from_json
+from .chart_data import load_chart_source
+
+logger = logging.getLogger('mcp_powerpoint_server')
+
+
+class DeckBuilder:
+    """
+    Builds a whole presentation from an ordered list of slide specs in a single pass.
+    Every spec is validated before the first slide is added, so a bad spec never leaves
+    a half-built deck behind.
+    """
+
+    # Slide spec type -> required string fields
+    SLIDE_TYPES = {
+        "title": ["title"],
+        "section-header": ["header"],
+        "title-content": ["title", "content"],
+        "comparison": ["title", "left_side_title", "left_side_content",
+                       "right_side_title", "right_side_content"],
+        "table": ["title"],
+        "chart": ["title"],
+        "picture-with-caption": ["title", "caption", "image_path"],
+    }
+
+    def __init__(self, presentation_manager: PresentationManager, chart_manager: ChartManager):
+        self.presentation_manager = presentation_manager
+        self.chart_manager = chart_manager
+
+    def validate(self, slides: List[Dict[str, Any]],
+                 resolve_path: Callable[[str], str]) -> List[Dict[str, Any]]:
+        """
+        Check every slide spec and return a prepared copy ready for build(). Chart data
+        sources are loaded here, so this blocks on file I/O.
+        Raises ValueError listing every problem found.
+
+        Args:
+            slides: The ordered slide specs
+            resolve_path: Maps an image or data file name to a safe absolute path, raising
+                ValueError when the name is not allowed
+        """
+        if not isinstance(slides, list) or not slides:
+            raise ValueError("At least one slide spec is required")
+
+        errors = []
+        prepared = []
+        for index, spec in enumerate(slides):
+            where = f"slides[{index}]"
+            if not isinstance(spec, dict):
+                errors.append(f"{where}: must be an object")
+                continue
+
+            slide_type = spec.get("type")
+            if slide_type not in self.SLIDE_TYPES:
+                errors.append(f"{where}.type: must be one of {', '.join(self.SLIDE_TYPES)}")
+                continue
+
+            missing = [field for field in self.SLIDE_TYPES[slide_type] if not spec.get(field)]
+            if missing:
+                errors.extend(f"{where}.{field}: is required" for field in missing)
+                continue
+
+            spec = dict(spec)
+            if slide_type == "table":
+                errors.extend(self._validate_table(where, spec))
+            elif slide_type == "chart":
+                chart_data = spec.get("data")
+                if isinstance(chart_data, dict) and chart_data.get("source"):
+                    try:
+                        spec["data"] = chart_data = load_chart_source(chart_data, resolve_path)
+                    except (ValueError, OSError) as e:
+                        errors.append(f"{where}.data.source: {e}")
+                        continue
+                if not isinstance(chart_data, dict) or not chart_data.get("series"):
+                    errors.append(f"{where}.data.series: is required")
+                else:
+                    try:
+                        spec["chart_type"], spec["chart_format"] = \
+                            self.chart_manager.determine_chart_type(chart_data)
+                    except Exception as e:
+                        errors.append(f"{where}.data: unable to determine chart type ({e})")
+                        continue
+                    errors.extend(f"{where}.data.{error}" for error in
+                                  self.chart_manager.data_errors(chart_data, spec["chart_format"]))
+            elif slide_type == "picture-with-caption":
+                try:
+                    spec["image_path"] = resolve_path(spec["image_path"])
+                except ValueError as e:
+                    errors.append(f"{where}.image_path: {e}")
+                    continue
+                if not os.path.exists(spec["image_path"]):
+                    errors.append(f"{where}.image_path: image not found")
+
+            prepared.append(spec)
+
+        if errors:
+            raise ValueError("Invalid slide specs:\n" + "\n".join(errors))
+        return prepared
+
+    @staticmethod
+    def _validate_table(where: str, spec: Dict[str, Any]) -> List[str]:
+        table_data = spec.get("data")
+        if not isinstance(table_data, dict):
+            return [f"{where}.data: is required"]
+        try:
+            spec["headers"], spec["rows"] = table_data_from_json(table_data)
+        except ValueError as e:
+            return [f"{where}.data: {e}"]
+        return []
+
+    def build(self, presentation_name: str, slides: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Add the prepared slide specs to the presentation in order and return one result per slide.
+        A slide that still fails is rolled back and reported in its result, and the remaining
+        slides are built. The whole build is one step in the presentation's undo history.
+
+        Args:
+            presentation_name: The presentation to add the slides to
+            slides: Slide specs returned by validate()
+        """
+        manager = self.presentation_manager
+        results = []
+        with manager.transaction(presentation_name, f"Build {len(slides)} slides"):
+            for index, spec in enumerate(slides):
+                result = {"index": index, "type": spec["type"]}
+                try:
+                    with manager.transaction(presentation_name, f"Build slide {index}"):
+                        result.update(self._build_slide(presentation_name, spec))
+                    result["status"] = "ok"
+                except Exception as e:
+                    logger.warning(f"Failed to build slide {index} of {presentation_name}: {e}")
+                    result["status"] = "error"
+                    result["error"] = str(e)
+                results.append(result)
+        return results
+
+    def _build_slide(self, presentation_name: str, spec: Dict[str, Any]) -> Dict[str, Any]:
+        manager = self.presentation_manager
+        slide_type = spec["type"]
+
+        if slide_type == "title":
+            manager.add_title_slide(presentation_name, spec["title"])
+        elif slide_type == "section-header":
+            manager.add_section_header_slide(presentation_name, spec["header"], spec.get("subtitle"))
+            return {"title": spec["header"]}
+        elif slide_type == "title-content":
+            slides = manager.add_title_with_content_slide(presentation_name, spec["title"],
+                                                          spec["content"])
+            return {"title": spec["title"], "slides": len(slides)}
+        elif slide_type == "comparison":
+            manager.add_comparison_slide(presentation_name, spec["title"],
+                                         spec["left_side_title"], spec["left_side_content"],
+                                         spec["right_side_title"], spec["right_side_content"])
+        elif slide_type == "table":
+            slides = manager.add_table_slide(presentation_name, spec["title"], spec["headers"],
+                                             spec["rows"], spec["data"].get("number_format"))
+            return {"title": spec["title"], "slides": len(slides)}
+        elif slide_type == "chart":
+            data, reduced = self.chart_manager.downsample(spec["data"], spec["chart_type"],
+                                                          spec["chart_format"])
+            slide = manager.add_title_only_slide(presentation_name, spec["title"])
+            self.chart_manager.add_chart_to_slide(slide, spec["chart_type"], data,
+                                                  spec["chart_format"])
+            chart_type_name = spec["chart_type"].name.lower()
+            result = {"title": spec["title"], "chart_type": chart_type_name}
+            if reduced:
+                result["downsampled"] = reduced
+            return result
+        elif slide_type == "picture-with-caption":
+            image = spec.get("image")
+            manager.add_picture_with_caption_slide(presentation_name, spec["title"],
+                                                   image or spec["image_path"],
+                                                   spec["caption"])
+            if image:
+                return {"title": spec["title"], "image_bytes_saved": image.bytes_saved}
+        return {"title": spec["title"]}
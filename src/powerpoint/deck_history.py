@@ -0,0 +1,143 @@
+import itertools
+import logging
+from collections import deque
+from typing import Any, Deque, List, Tuple
+
+logger = logging.getLogger('mcp_powerpoint_server')
+
+# Operations kept per presentation for undo
+UNDO_DEPTH = 50
+
+# The slide list and relationships are edited through python-pptx internals
+# (_sldIdLst, _rels), which is why pyproject.toml pins python-pptx to 1.0.x and
+# tests/test_deck_history.py saves and reopens decks after every kind of edit.
+
+
+class Change:
+    """
+    The slides one operation appended to a presentation: their sldId elements in
+    presentation.xml and the presentation part's relationships to their slide parts.
+    Everything else the operation created (charts, workbooks, images) is only reachable
+    through those slide parts, so detaching the relationships drops it from the package and
+    attaching them brings it back.
+    """
+
+    __slots__ = ("label", "slide_ids", "rels")
+
+    def __init__(self, label: str, slide_ids: List[Any], rels: List[Tuple[str, Any]]):
+        self.label = label
+        self.slide_ids = slide_ids
+        self.rels = rels
+
+    def __bool__(self) -> bool:
+        return bool(self.slide_ids or self.rels)
+
+    def is_last(self, prs) -> bool:
+        """Return True when the change's slides are still the last ones of the presentation."""
+        count = len(self.slide_ids)
+        if not count:
+            return True
+        tail = prs.slides._sldIdLst[-count:]
+        return len(tail) == count and all(a is b for a, b in zip(tail, self.slide_ids))
+
+    def detach(self, prs):
+        slide_id_list = prs.slides._sldIdLst
+        for slide_id in self.slide_ids:
+            slide_id_list.remove(slide_id)
+        rels = prs.part.rels._rels
+        for rId, _ in self.rels:
+            rels.pop(rId, None)
+
+    def attach(self, prs):
+        slide_id_list = prs.slides._sldIdLst
+        for slide_id in self.slide_ids:
+            slide_id_list.append(slide_id)
+        prs.part.rels._rels.update(self.rels)
+
+
+class Transaction:
+    """
+    Records what an edit appends to a presentation so it can be rolled back. Edits only
+    append: a new sldId, a relationship from the presentation part to the new slide part,
+    and the parts behind it. Beginning a transaction records two lengths, and rolling back
+    or collecting the change only touches what was appended, however large the deck is.
+    """
+
+    __slots__ = ("prs", "label", "_slide_count", "_rel_count")
+
+    def __init__(self, prs, label: str):
+        self.prs = prs
+        self.label = label
+        self._slide_count = len(prs.slides._sldIdLst)
+        self._rel_count = len(prs.part.rels)
+
+    def change(self) -> Change:
+        """Return the slides and relationships appended since the transaction began."""
+        slide_id_list = self.prs.slides._sldIdLst
+        rels = self.prs.part.rels._rels
+        if len(slide_id_list) < self._slide_count or len(rels) < self._rel_count:
+            raise ValueError(f"Slides were removed during '{self.label}', it can't be recorded")
+        return Change(self.label, list(slide_id_list[self._slide_count:]),
+                      list(itertools.islice(rels.items(), self._rel_count, None)))
+
+    def rollback(self):
+        """Remove everything appended since the transaction began."""
+        self.change().detach(self.prs)
+        logger.debug(f"Rolled back '{self.label}'")
+
+
+class DeckHistory:
+    """
+    Undo and redo stacks of one presentation. Changes are undone last first, so the slides
+    of the change being undone are always the last ones of the deck. Recording a new change
+    clears the redo stack.
+    """
+
+    def __init__(self, prs, depth: int = UNDO_DEPTH):
+        self.prs = prs
+        self.undo_stack: Deque[Change] = deque(maxlen=depth)
+        self.redo_stack: List[Change] = []
+
+    def record(self, change: Change):
+        self.undo_stack.append(change)
+        self.redo_stack.clear()
+
+    def undo(self, steps: int = 1) -> List[str]:
+        """
+        Undo up to steps changes, newest first, and return their labels.
+
+        Args:
+            steps: The number of changes to undo
+        """
+        labels = []
+        while self.undo_stack and len(labels) < steps:
+            change = self.undo_stack[-1]
+            if not change.is_last(self.prs):
+                self.undo_stack.clear()
+                self.redo_stack.clear()
+                raise ValueError("The presentation no longer matches its undo history, the history was cleared")
+            self.undo_stack.pop()
+            change.detach(self.prs)
+            self.redo_stack.append(change)
+            labels.append(change.label)
+        return labels
+
+    def redo(self, steps: int = 1) -> List[str]:
+        """
+        Redo up to steps undone changes, oldest first, and return their labels.
+
+        Args:
+            steps: The number of changes to redo
+        """
+        labels = []
+        while self.redo_stack and len(labels) < steps:
+            change = self.redo_stack.pop()
+            change.attach(self.prs)
+            self.undo_stack.append(change)
+            labels.append(change.label)
+        return labels
+
+    def labels(self) -> Tuple[List[str], List[str]]:
+        """Return the labels of the changes that can be undone and redone, next first."""
+        return ([change.label for change in reversed(self.undo_stack)],
+                [change.label for change in reversed(self.redo_stack)])
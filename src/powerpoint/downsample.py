@@ -0,0 +1,159 @@
+import math
+import logging
+from typing import Any, List, Sequence
+
+try:
+    import numpy
+except ImportError:  # a dependency, but the loops below keep charts working without it
+    numpy = None
+
+logger = logging.getLogger('mcp_powerpoint_server')
+
+
+def _floats(values: Sequence[Any]):
+    # None marks a missing point and becomes NaN
+    return numpy.array(values, dtype=float)
+
+
+def _present(value: Any) -> bool:
+    return value is not None and value == value
+
+
+def lttb_indices(x_values: Sequence[Any], y_values: Sequence[Any], threshold: int) -> List[int]:
+    """
+    Pick the indices of threshold points that keep the visual shape of a line with the
+    Largest-Triangle-Three-Buckets algorithm. The first and last points are always kept and
+    points with a missing x or y value are skipped. X values are expected in drawing order.
+
+    Args:
+        x_values: X value of every point
+        y_values: Y value of every point, None for a missing point
+        threshold: Number of points to keep, at least 3
+    """
+    if numpy is not None:
+        x = _floats(x_values)
+        y = _floats(y_values)
+        positions = numpy.flatnonzero(~(numpy.isnan(x) | numpy.isnan(y)))
+        x, y = x[positions], y[positions]
+    else:
+        positions = [i for i, (xv, yv) in enumerate(zip(x_values, y_values))
+                     if _present(xv) and _present(yv)]
+        x = [float(x_values[i]) for i in positions]
+        y = [float(y_values[i]) for i in positions]
+
+    n = len(positions)
+    if threshold >= n or threshold < 3:
+        return [int(i) for i in positions]
+
+    # Point 0 and n - 1 are kept, the rest is split into threshold - 2 buckets
+    every = (n - 2) / (threshold - 2)
+    edges = [int(math.floor(i * every)) + 1 for i in range(threshold - 1)] + [n]
+    selected = [0]
+    a = 0
+    if numpy is not None:
+        # Averages of every bucket in one pass, the last "bucket" is the final point
+        sums_x = numpy.add.reduceat(x, edges[:-1])
+        sums_y = numpy.add.reduceat(y, edges[:-1])
+        counts = numpy.diff(edges)
+        avg_x, avg_y = sums_x / counts, sums_y / counts
+        for i in range(threshold - 2):
+            start, end = edges[i], edges[i + 1]
+            area = numpy.abs((x[a] - avg_x[i + 1]) * (y[start:end] - y[a])
+                             - (x[a] - x[start:end]) * (avg_y[i + 1] - y[a]))
+            a = start + int(area.argmax())
+            selected.append(a)
+    else:
+        for i in range(threshold - 2):
+            start, end = edges[i], edges[i + 1]
+            next_end = edges[i + 2]
+            count = next_end - end
+            avg_x = sum(x[end:next_end]) / count
+            avg_y = sum(y[end:next_end]) / count
+            xa, ya = x[a], y[a]
+            best, best_area = start, -1.0
+            for j in range(start, end):
+                area = abs((xa - avg_x) * (y[j] - ya) - (xa - x[j]) * (avg_y - ya))
+                if area > best_area:
+                    best, best_area = j, area
+            a = best
+            selected.append(a)
+    selected.append(n - 1)
+    return [int(positions[i]) for i in selected]
+
+
+def min_max_indices(columns: Sequence[Sequence[Any]], buckets: int) -> List[int]:
+    """
+    Split the points into equal buckets and keep the indices of the smallest and largest
+    value of every column in each bucket, so peaks survive. The columns share their indices,
+    as the series of a category chart share their categories. The first and last points are
+    always kept.
+
+    Args:
+        columns: Values of every series, None for a missing point
+        buckets: Number of buckets to split the points into
+    """
+    n = max((len(column) for column in columns), default=0)
+    buckets = max(1, buckets)
+    if n == 0:
+        return []
+    size = math.ceil(n / buckets)
+    buckets = math.ceil(n / size)
+    if numpy is not None:
+        chosen = [numpy.array([0, n - 1])]
+        offsets = numpy.arange(buckets) * size
+        for column in columns:
+            values = numpy.full(buckets * size, numpy.nan)
+            values[:len(column)] = _floats(column)
+            missing = numpy.isnan(values)
+            # Buckets without a single value contribute nothing
+            filled = ~missing.reshape(buckets, size).all(axis=1)
+            grid = numpy.where(missing, numpy.inf, values).reshape(buckets, size)
+            chosen.append((grid.argmin(axis=1) + offsets)[filled])
+            grid = numpy.where(missing, -numpy.inf, values).reshape(buckets, size)
+            chosen.append((grid.argmax(axis=1) + offsets)[filled])
+        indices = numpy.unique(numpy.concatenate(chosen))
+        return [int(i) for i in indices if i < n]
+
+    chosen = {0, n - 1}
+    for column in columns:
+        for start in range(0, len(column), size):
+            present = [(value, i) for i, value in enumerate(column[start:start + size], start)
+                       if _present(value)]
+            if present:
+                chosen.add(min(present)[1])
+                chosen.add(max(present)[1])
+    return sorted(chosen)
+
+
+def min_max_fill(columns: Sequence[Sequence[Any]], max_points: int) -> List[int]:
+    """
+    Keep the minimum and maximum of every column in as many buckets as fit max_points
+    shared indices. Series often peak at the same index and a bucket's minimum can be its
+    maximum, so the bucket count is searched for rather than derived from the worst case.
+
+    Args:
+        columns: Values of every series, None for a missing point
+        max_points: Most indices to keep, at least 2
+    """
+    n = max((len(column) for column in columns), default=0)
+    if n <= max_points:
+        return list(range(n))
+    # Up to two indices per column and bucket, plus the first and last point, always fit
+    low = max(1, (max_points - 2) // (2 * len(columns)))
+    best = min_max_indices(columns, low)
+    high = max_points
+    low += 1
+    while low <= high:
+        buckets = (low + high) // 2
+        indices = min_max_indices(columns, buckets)
+        if len(indices) <= max_points:
+            best, low = indices, buckets + 1
+        else:
+            high = buckets - 1
+    return best
+
+
+def take(values: Sequence[Any], indices: Sequence[int]) -> List[Any]:
+    """Return values at the given indices, None past the end of a short series."""
+    count = len(values)
+    return [values[i] if i < count else None for i in indices]
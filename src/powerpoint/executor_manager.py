@@ -0,0 +1,163 @@
+import asyncio
+import functools
+import contextvars
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger('mcp_powerpoint_server')
+
+
+class _PoolStats:
+    """Counters for a single worker pool. Updated from worker threads, so guarded by a lock."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.pending = 0
+        self.running = 0
+        self.max_pending = 0
+
+    def on_submit(self):
+        with self._lock:
+            self.submitted += 1
+            self.pending += 1
+            self.max_pending = max(self.max_pending, self.pending)
+
+    def on_start(self):
+        with self._lock:
+            self.running += 1
+
+    def on_finish(self, ok: bool, started: bool = True):
+        with self._lock:
+            self.pending -= 1
+            if started:
+                self.running -= 1
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "pending": self.pending,
+                "running": self.running,
+                "queue_depth": self.pending - self.running,
+                "max_pending": self.max_pending,
+            }
+
+
+class ExecutorManager:
+    """
+    Runs blocking work (file and network I/O, image generation, CPU-heavy serialization)
+    off the asyncio event loop so that concurrent tool calls can overlap.
+
+    I/O work goes to a thread pool. CPU work goes to an optional process pool; when no process
+    workers are configured it falls back to the thread pool. Both pools are bounded: once
+    max_pending calls are in flight, further submissions wait for a free slot.
+    """
+
+    def __init__(self, io_workers: int = 8, cpu_workers: int = 0, max_pending: int = 64):
+        if io_workers < 1:
+            raise ValueError("io_workers must be at least 1")
+        if cpu_workers < 0:
+            raise ValueError("cpu_workers must not be negative")
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+
+        self.io_workers = io_workers
+        self.cpu_workers = cpu_workers
+        self.max_pending = max_pending
+
+        self._io_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="pptx-io")
+        self._cpu_pool = ProcessPoolExecutor(max_workers=cpu_workers) if cpu_workers else None
+        self._io_stats = _PoolStats()
+        self._cpu_stats = _PoolStats()
+        self._io_slots = asyncio.Semaphore(max_pending)
+        self._cpu_slots = asyncio.Semaphore(max_pending)
+
+    async def run_io(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run a blocking I/O callable in the thread pool and return its result.
+
+        Args:
+            func: The callable to run
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+        """
+        call = functools.partial(func, *args, **kwargs)
+        stats = self._io_stats
+
+        def tracked():
+            stats.on_start()
+            try:
+                result = call()
+            except BaseException:
+                stats.on_finish(ok=False)
+                raise
+            stats.on_finish(ok=True)
+            return result
+
+        async with self._io_slots:
+            stats.on_submit()
+            loop = asyncio.get_running_loop()
+            # Carry the caller's context over, so stages timed in the thread join its tool call
+            context = contextvars.copy_context()
+            try:
+                future = loop.run_in_executor(self._io_pool, context.run, tracked)
+            except BaseException:
+                stats.on_finish(ok=False, started=False)
+                raise
+            return await future
+
+    async def run_cpu(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run a CPU-heavy callable in the process pool and return its result.
+        func and its arguments must be picklable. Falls back to the thread pool when
+        the server was started without process workers.
+
+        Args:
+            func: The callable to run
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+        """
+        if self._cpu_pool is None:
+            return await self.run_io(func, *args, **kwargs)
+
+        call = functools.partial(func, *args, **kwargs)
+        stats = self._cpu_stats
+        async with self._cpu_slots:
+            stats.on_submit()
+            # Worker processes can't report back when they start, so a CPU job counts as
+            # running for as long as it is pending.
+            stats.on_start()
+            loop = asyncio.get_running_loop()
+            try:
+                result = await loop.run_in_executor(self._cpu_pool, call)
+            except BaseException:
+                stats.on_finish(ok=False)
+                raise
+            stats.on_finish(ok=True)
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Return worker counts and queue-depth counters for both pools."""
+        return {
+            "io": {"workers": self.io_workers, **self._io_stats.snapshot()},
+            "cpu": {"workers": self.cpu_workers, **self._cpu_stats.snapshot()},
+            "max_pending": self.max_pending,
+        }
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting work and release the worker pools."""
+        logger.info("Shutting down executor pools")
+        self._io_pool.shutdown(wait=wait)
+        if self._cpu_pool is not None:
+            self._cpu_pool.shutdown(wait=wait)
@@ -0,0 +1,204 @@
+import os
+import logging
+from collections import OrderedDict
+from io import BytesIO
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .pagination import EMU_PER_INCH
+
+logger = logging.getLogger('mcp_powerpoint_server')
+
+# Images with more distinct colours than this are treated as photos and stored as JPEG
+PHOTO_MIN_COLORS = 256
+
+# Formats python-pptx can embed as they are; anything else is converted
+EMBEDDABLE_FORMATS = ("JPEG", "PNG", "GIF", "BMP", "TIFF")
+
+# Modes a PNG or GIF would be written in again anyway: transparency or few colours
+KEPT_LOSSLESS_MODES = ("1", "L", "LA", "P", "PA", "RGBA")
+
+
+class PreparedImage:
+    """An image normalized for embedding: data holds the bytes to insert into the slide."""
+
+    def __init__(self, data: bytes, image_format: str, original_bytes: int,
+                 size: Tuple[int, int], resized: bool):
+        # Identifies the source file and settings the image was prepared from, set by ImageProcessor
+        self.key: Optional[Hashable] = None
+        self.data = data
+        self.format = image_format
+        self.original_bytes = original_bytes
+        self.bytes = len(data)
+        self.size = size
+        self.resized = resized
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_bytes - self.bytes
+
+    def stream(self) -> BytesIO:
+        return BytesIO(self.data)
+
+
+def _has_alpha(image: Image.Image) -> bool:
+    return image.mode in ("RGBA", "LA", "PA") or (
+        image.mode == "P" and "transparency" in image.info)
+
+
+def _is_photo(image: Image.Image) -> bool:
+    if image.mode in ("1", "L", "P"):
+        return False
+    return image.getcolors(maxcolors=PHOTO_MIN_COLORS) is None
+
+
+def _embeds_as_is(image: Image.Image) -> bool:
+    """
+    Return True when re-encoding could only strip bytes the image doesn't have: it carries no
+    EXIF data, and it is a JPEG, or a PNG or GIF that would be written as PNG again. Decided from
+    the header alone.
+    """
+    # Read from the header, getexif() would decode a PNG
+    if image.info.get("exif"):
+        return False
+    if image.format == "JPEG":
+        return True
+    return image.format in ("PNG", "GIF") and image.mode in KEPT_LOSSLESS_MODES
+
+
+def prepare_image(image_path: str, max_width: int, max_height: int, dpi: int = 150,
+                  jpeg_quality: int = 85) -> PreparedImage:
+    """
+    Downscale an image to the pixel size it is displayed at and re-encode it without
+    metadata: photos as JPEG, images with transparency or few colours as PNG. The original
+    bytes are kept when re-encoding would not make them smaller, and images that already fit
+    the box in such a format are not decoded at all. Blocking and CPU heavy.
+
+    Args:
+        image_path: The image file
+        max_width: Width of the box the image is placed in, in EMU
+        max_height: Height of the box the image is placed in, in EMU
+        dpi: Pixels per inch to keep at the displayed size
+        jpeg_quality: JPEG quality for photos, 1-95
+    """
+    with open(image_path, "rb") as f:
+        original = f.read()
+
+    target = (max(1, int(max_width / EMU_PER_INCH * dpi)),
+              max(1, int(max_height / EMU_PER_INCH * dpi)))
+    try:
+        # Only reads the header
+        image = Image.open(BytesIO(original))
+        source_format = image.format
+        if getattr(image, "n_frames", 1) > 1:
+            # Keep animations intact
+            return PreparedImage(original, source_format, len(original), image.size, False)
+        if image.width <= target[0] and image.height <= target[1] and _embeds_as_is(image):
+            return PreparedImage(original, source_format, len(original), image.size, False)
+        image.load()
+    except (UnidentifiedImageError, OSError) as e:
+        raise ValueError(f"Image file {os.path.basename(image_path)} is not a valid image: {str(e)}")
+
+    image = ImageOps.exif_transpose(image)
+    resized = image.width > target[0] or image.height > target[1]
+    if resized:
+        image.thumbnail(target, Image.LANCZOS)
+
+    buffer = BytesIO()
+    if not _has_alpha(image) and _is_photo(image):
+        image_format = "JPEG"
+        image.convert("RGB").save(buffer, format="JPEG", quality=jpeg_quality, optimize=True)
+    else:
+        image_format = "PNG"
+        image.save(buffer, format="PNG", optimize=True)
+    data = buffer.getvalue()
+
+    if not resized and len(data) >= len(original) and source_format in EMBEDDABLE_FORMATS:
+        return PreparedImage(original, source_format, len(original), image.size, False)
+    return PreparedImage(data, image_format, len(original), image.size, resized)
+
+
+class ImageProcessor:
+    """
+    Normalizes images before they are inserted into slides, so a 4K source doesn't end up
+    embedded at full resolution. Work runs in the executor's CPU pool, and the bytes saved
+    are counted per presentation.
+
+    Prepared images are kept by file (real path, mtime and size) and box, up to
+    cache_max_bytes, so a file inserted again is neither read nor decoded again.
+    """
+
+    def __init__(self, executor_manager=None, dpi: int = 150, jpeg_quality: int = 85,
+                 cache_max_bytes: int = 64 * 1024 * 1024):
+        self.executor_manager = executor_manager
+        self.dpi = dpi
+        self.jpeg_quality = jpeg_quality
+        self.cache_max_bytes = cache_max_bytes
+        self._decks: Dict[str, Dict[str, int]] = {}
+        self._prepared: OrderedDict[Hashable, PreparedImage] = OrderedDict()
+        self.cached_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.dpi > 0
+
+    async def prepare(self, image_path: str, box: Tuple[int, int]) -> Optional[PreparedImage]:
+        """
+        Prepare an image for a placeholder, or return None when preprocessing is disabled.
+
+        Args:
+            image_path: The image file
+            box: Width and height of the placeholder in EMU
+        """
+        if not self.enabled:
+            return None
+        stat = os.stat(image_path)
+        key = (os.path.realpath(image_path), stat.st_mtime_ns, stat.st_size, box[0], box[1],
+               self.dpi, self.jpeg_quality)
+        image = self._prepared.get(key)
+        if image is not None:
+            self._prepared.move_to_end(key)
+            self.hits += 1
+            return image
+        self.misses += 1
+
+        args = (image_path, box[0], box[1], self.dpi, self.jpeg_quality)
+        if self.executor_manager is None:
+            image = prepare_image(*args)
+        else:
+            image = await self.executor_manager.run_cpu(prepare_image, *args)
+        image.key = key
+        if key not in self._prepared and image.bytes <= self.cache_max_bytes:
+            self._prepared[key] = image
+            self.cached_bytes += image.bytes
+            while self.cached_bytes > self.cache_max_bytes:
+                _, evicted = self._prepared.popitem(last=False)
+                self.cached_bytes -= evicted.bytes
+        return image
+
+    def record(self, presentation_name: str, image: PreparedImage):
+        """Count an image that was inserted into a presentation."""
+        deck = self._decks.setdefault(
+            presentation_name, {"images": 0, "original_bytes": 0, "bytes": 0, "bytes_saved": 0})
+        deck["images"] += 1
+        deck["original_bytes"] += image.original_bytes
+        deck["bytes"] += image.bytes
+        deck["bytes_saved"] += image.bytes_saved
+        logger.debug(f"Prepared image for {presentation_name}: {image.original_bytes} -> "
+                     f"{image.bytes} bytes ({image.format}, {image.size[0]}x{image.size[1]})")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the preprocessing settings, the cache counters and the bytes saved for each presentation."""
+        return {
+            "dpi": self.dpi,
+            "jpeg_quality": self.jpeg_quality,
+            "cached_images": len(self._prepared),
+            "cached_bytes": self.cached_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bytes_saved": sum(deck["bytes_saved"] for deck in self._decks.values()),
+            "presentations": {name: dict(deck) for name, deck in self._decks.items()},
+        }
@@ -0,0 +1,160 @@
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import IO, Any, Dict, Optional, Tuple, Union
+
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.oxml.shapes.picture import CT_Picture
+from pptx.parts.image import Image, ImagePart
+from pptx.shapes.placeholder import PlaceholderPicture
+
+from .image_processor import PreparedImage
+
+logger = logging.getLogger('mcp_powerpoint_server')
+
+
+class MediaStore:
+    """
+    Process-wide store of images keyed by the SHA-256 of their bytes. An image is read and
+    decoded once: every slide and presentation it is inserted into shares the same bytes,
+    and its pixel size and format are computed a single time. Unchanged files and prepared
+    images are found by their key without being read or hashed again. Least recently used images
+    are dropped from the store once it grows past max_bytes; decks that embed them keep
+    their copy.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._images: OrderedDict[str, Image] = OrderedDict()
+        # (real path, mtime, size) or a prepared image's key -> SHA-256, so unchanged files
+        # are not read and prepared images are not hashed again
+        self._paths: Dict[Any, str] = {}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_shared = 0
+
+    def image(self, image_file: Union[str, bytes, IO[bytes], PreparedImage]) -> Image:
+        """
+        Return the shared image for a path, bytes, file-like object or prepared image, loading
+        it on a miss.
+
+        Args:
+            image_file: The image to look up
+        """
+        path_key = None
+        filename = None
+        if isinstance(image_file, PreparedImage):
+            path_key = image_file.key
+        elif isinstance(image_file, str):
+            stat = os.stat(image_file)
+            path_key = (os.path.realpath(image_file), stat.st_mtime_ns, stat.st_size)
+            filename = os.path.basename(image_file)
+        if path_key is not None:
+            with self._lock:
+                digest = self._paths.get(path_key)
+                image = self._images.get(digest) if digest else None
+                if image is not None:
+                    return self._hit(digest, image)
+
+        if isinstance(image_file, PreparedImage):
+            blob = image_file.data
+        elif isinstance(image_file, str):
+            with open(image_file, "rb") as f:
+                blob = f.read()
+        elif isinstance(image_file, (bytes, bytearray, memoryview)):
+            blob = bytes(image_file)
+        else:
+            image_file.seek(0)
+            blob = image_file.read()
+
+        digest = hashlib.sha256(blob).hexdigest()
+        with self._lock:
+            if path_key is not None:
+                self._paths[path_key] = digest
+            image = self._images.get(digest)
+            if image is not None:
+                return self._hit(digest, image)
+            self.misses += 1
+
+        image = Image.from_blob(blob, filename)
+        # Decode the header now so every deck reuses the result
+        image.size, image.content_type, image.sha1
+
+        with self._lock:
+            existing = self._images.get(digest)
+            if existing is not None:
+                return existing
+            self._images[digest] = image
+            self.total_bytes += len(blob)
+            while self.total_bytes > self.max_bytes and len(self._images) > 1:
+                _, evicted = self._images.popitem(last=False)
+                self.total_bytes -= len(evicted.blob)
+                self.evictions += 1
+            if len(self._paths) > 4 * len(self._images) + 64:
+                live = set(self._images)
+                self._paths = {key: value for key, value in self._paths.items() if value in live}
+        return image
+
+    def _hit(self, digest: str, image: Image) -> Image:
+        self._images.move_to_end(digest)
+        self.hits += 1
+        self.bytes_shared += len(image.blob)
+        return image
+
+    @staticmethod
+    def get_or_add_image_part(slide_part, image: Image) -> Tuple[ImagePart, str]:
+        """
+        Return (image part, rId) relating the image to the slide, reusing an image part of the
+        presentation that already holds the same image. Mirrors SlidePart.get_or_add_image_part
+        without reading or decoding the image again.
+
+        Args:
+            slide_part: The part of the slide the image is shown on
+            image: An image returned by image()
+        """
+        package = slide_part.package
+        image_parts = package._image_parts
+        image_part = None
+        for part in image_parts:
+            # Parts created from the store share its bytes object
+            if getattr(part, "_blob", None) is image.blob:
+                image_part = part
+                break
+        if image_part is None:
+            image_part = image_parts._find_by_sha1(image.sha1) or ImagePart.new(package, image)
+        return image_part, slide_part.relate_to(image_part, RT.IMAGE)
+
+    def insert_picture(self, placeholder, image_file: Union[str, bytes, IO[bytes], PreparedImage]
+                       ) -> Tuple[PlaceholderPicture, Image]:
+        """
+        Fill a picture placeholder with an image from the store, cropped to fill the placeholder
+        like PicturePlaceholder.insert_picture. Returns the picture and the shared image.
+
+        Args:
+            placeholder: The picture placeholder to replace
+            image_file: The image to insert
+        """
+        image = self.image(image_file)
+        image_part, rId = self.get_or_add_image_part(placeholder.part, image)
+        pic = CT_Picture.new_ph_pic(placeholder.shape_id, placeholder.name, image_part.desc, rId)
+        pic.crop_to_fit(image.size, (placeholder.width, placeholder.height))
+        placeholder._replace_placeholder_with(pic)
+        return PlaceholderPicture(pic, placeholder._parent), image
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the store's size and hit/miss counters."""
+        with self._lock:
+            return {
+                "images": len(self._images),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "bytes_shared": self.bytes_shared,
+            }
@@ -0,0 +1,361 @@
+import os
+import json
+import time
+import queue
+import bisect
+import logging
+import threading
+import contextvars
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger('mcp_powerpoint_server')
+
+# Histogram buckets in seconds, from sub-millisecond slide edits to multi-minute renders
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+                   30.0, 60.0, 120.0, 300.0)
+
+# Finished traces waiting for the writer thread; more are dropped rather than slowing tools down
+TRACE_QUEUE_SIZE = 10000
+
+# The tool call running in the current task, or in the task that handed work to this thread
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "powerpoint_span", default=None)
+
+
+class Histogram:
+    """Counts of observations per bucket, with their sum. Not thread-safe, Metrics guards it."""
+
+    __slots__ = ("buckets", "counts", "count", "total", "maximum")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.maximum:
+            self.maximum = value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile by interpolating within its bucket, like Prometheus does."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                if index == len(self.buckets):
+                    return self.maximum
+                lower = self.buckets[index - 1] if index else 0.0
+                estimate = lower + (self.buckets[index] - lower) * (rank - seen) / count
+                return min(estimate, self.maximum)
+            seen += count
+        return self.maximum
+
+
+class Span:
+    """A tool call in progress and, when traces are written, the stages it went through."""
+
+    __slots__ = ("metrics", "tool", "trace_id", "started", "wall_started", "stages")
+
+    def __init__(self, metrics: "Metrics", tool: str):
+        self.metrics = metrics
+        self.tool = tool
+        self.started = time.perf_counter()
+        if metrics.tracing:
+            self.trace_id = os.urandom(8).hex()
+            self.wall_started = time.time()
+            self.stages: Optional[List[Tuple[str, float, float]]] = []
+        else:
+            self.stages = None
+
+
+class _ToolSpan:
+    __slots__ = ("metrics", "tool", "span", "token")
+
+    def __init__(self, metrics: "Metrics", tool: str):
+        self.metrics = metrics
+        self.tool = tool
+
+    def __enter__(self) -> Span:
+        self.span = Span(self.metrics, self.tool)
+        self.token = _current_span.set(self.span)
+        self.metrics._enter(self.tool)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_span.reset(self.token)
+        self.metrics._exit(self.span, exc)
+        return False
+
+
+class _StageSpan:
+    __slots__ = ("name", "span", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.span = _current_span.get()
+        self.started = time.perf_counter()
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.span is not None:
+            self.span.metrics._record_stage(self.span, self.name, self.started,
+                                            time.perf_counter() - self.started)
+        return False
+
+
+def stage(name: str) -> _StageSpan:
+    """
+    Time a stage of the current tool call, such as validate, build, save or upload. Works in
+    the event loop and in worker threads started with ExecutorManager; outside a tool call it
+    does nothing.
+
+    Args:
+        name: Name of the stage
+    """
+    return _StageSpan(name)
+
+
+def record_stage(name: str, seconds: float):
+    """
+    Record a stage of the current tool call that was timed elsewhere, like a lock wait.
+
+    Args:
+        name: Name of the stage
+        seconds: How long it took
+    """
+    span = _current_span.get()
+    if span is not None:
+        span.metrics._record_stage(span, name, time.perf_counter() - seconds, seconds)
+
+
+def _labels(**labels: str) -> str:
+    escaped = (f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+               for key, value in labels.items())
+    return "{" + ",".join(escaped) + "}"
+
+
+class Metrics:
+    """
+    Latency histograms, call counters and in-flight gauges for every tool and the stages
+    within it (validate, build, save, upload, generate, ...).
+
+    Metrics are exported as Prometheus text, served over HTTP when a port is configured, and
+    every finished call can be appended as a trace to a JSONL file by a background thread.
+    Recording costs a few microseconds per call, so it is always on.
+    """
+
+    def __init__(self, trace_file: Optional[str] = None, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.trace_file = trace_file
+        self._lock = threading.Lock()
+        self._calls: Dict[Tuple[str, str], int] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._durations: Dict[str, Histogram] = {}
+        self._stages: Dict[Tuple[str, str], Histogram] = {}
+        self._http: Optional[ThreadingHTTPServer] = None
+        self.traces_written = 0
+        self.traces_dropped = 0
+
+        self._traces: Optional[queue.Queue] = None
+        self._writer: Optional[threading.Thread] = None
+        if trace_file:
+            os.makedirs(os.path.dirname(os.path.abspath(trace_file)), exist_ok=True)
+            self._traces = queue.Queue(maxsize=TRACE_QUEUE_SIZE)
+            self._writer = threading.Thread(target=self._write_traces, name="pptx-traces", daemon=True)
+            self._writer.start()
+
+    @property
+    def tracing(self) -> bool:
+        return self._traces is not None
+
+    def span(self, tool: str) -> _ToolSpan:
+        """
+        Time a tool call. Stages timed inside it, in this task or in worker threads it starts,
+        are attributed to it.
+
+        Args:
+            tool: Name of the tool
+        """
+        return _ToolSpan(self, tool)
+
+    def _enter(self, tool: str):
+        with self._lock:
+            self._in_flight[tool] = self._in_flight.get(tool, 0) + 1
+
+    def _exit(self, span: Span, exc: Optional[BaseException]):
+        duration = time.perf_counter() - span.started
+        status = "ok" if exc is None else "error"
+        with self._lock:
+            self._in_flight[span.tool] -= 1
+            key = (span.tool, status)
+            self._calls[key] = self._calls.get(key, 0) + 1
+            histogram = self._durations.get(span.tool)
+            if histogram is None:
+                histogram = self._durations[span.tool] = Histogram(self.buckets)
+            histogram.observe(duration)
+
+        if self._traces is not None:
+            trace = {
+                "trace_id": span.trace_id,
+                "tool": span.tool,
+                "start": round(span.wall_started, 6),
+                "duration_ms": round(duration * 1000, 3),
+                "status": status,
+                "stages": [{"name": name, "offset_ms": round((started - span.started) * 1000, 3),
+                            "duration_ms": round(seconds * 1000, 3)}
+                           for name, started, seconds in span.stages],
+            }
+            if exc is not None:
+                trace["error"] = f"{type(exc).__name__}: {exc}"
+            try:
+                self._traces.put_nowait(trace)
+            except queue.Full:
+                with self._lock:
+                    self.traces_dropped += 1
+
+    def _record_stage(self, span: Span, name: str, started: float, seconds: float):
+        key = (span.tool, name)
+        with self._lock:
+            histogram = self._stages.get(key)
+            if histogram is None:
+                histogram = self._stages[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+        if span.stages is not None:
+            span.stages.append((name, started, seconds))
+
+    def _write_traces(self):
+        with open(self.trace_file, "a", encoding="utf-8") as f:
+            while True:
+                trace = self._traces.get()
+                if trace is None:
+                    break
+                f.write(json.dumps(trace) + "\n")
+                self.traces_written += 1
+                if self._traces.empty():
+                    f.flush()
+
+    def prometheus(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        with self._lock:
+            calls = sorted(self._calls.items())
+            in_flight = sorted(self._in_flight.items())
+            durations = [(tool, list(h.counts), h.count, h.total) for tool, h in sorted(self._durations.items())]
+            stages = [(key, list(h.counts), h.count, h.total) for key, h in sorted(self._stages.items())]
+
+        lines = ["# HELP powerpoint_tool_calls_total Tool calls by outcome",
+                 "# TYPE powerpoint_tool_calls_total counter"]
+        lines += [f"powerpoint_tool_calls_total{_labels(tool=tool, status=status)} {count}"
+                  for (tool, status), count in calls]
+        lines += ["# HELP powerpoint_tool_in_flight Tool calls currently running",
+                  "# TYPE powerpoint_tool_in_flight gauge"]
+        lines += [f"powerpoint_tool_in_flight{_labels(tool=tool)} {count}" for tool, count in in_flight]
+        lines += ["# HELP powerpoint_tool_duration_seconds Tool call latency",
+                  "# TYPE powerpoint_tool_duration_seconds histogram"]
+        for tool, counts, count, total in durations:
+            lines += self._histogram_lines("powerpoint_tool_duration_seconds", {"tool": tool},
+                                           counts, count, total)
+        lines += ["# HELP powerpoint_stage_duration_seconds Latency of the stages within tool calls",
+                  "# TYPE powerpoint_stage_duration_seconds histogram"]
+        for (tool, name), counts, count, total in stages:
+            lines += self._histogram_lines("powerpoint_stage_duration_seconds", {"tool": tool, "stage": name},
+                                           counts, count, total)
+        return "\n".join(lines) + "\n"
+
+    def _histogram_lines(self, metric: str, labels: Dict[str, str], counts: List[int],
+                         count: int, total: float) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            lines.append(f"{metric}_bucket{_labels(**labels, le=f'{bound:g}')} {cumulative}")
+        lines.append(f"{metric}_bucket{_labels(**labels, le='+Inf')} {count}")
+        lines.append(f"{metric}_sum{_labels(**labels)} {total:.6f}")
+        lines.append(f"{metric}_count{_labels(**labels)} {count}")
+        return lines
+
+    def serve(self, host: str, port: int) -> int:
+        """
+        Serve the metrics as Prometheus text at /metrics in a background thread. Returns the
+        port, which is picked by the OS when port is 0.
+
+        Args:
+            host: Address to listen on
+            port: Port to listen on
+        """
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._http = ThreadingHTTPServer((host, port), Handler)
+        self._http.daemon_threads = True
+        threading.Thread(target=self._http.serve_forever, name="pptx-metrics", daemon=True).start()
+        port = self._http.server_address[1]
+        logger.info(f"Serving metrics at http://{host}:{port}/metrics")
+        return port
+
+    def stats(self) -> Dict[str, Any]:
+        """Return calls, errors, in-flight calls and latency estimates per tool and stage."""
+        def milliseconds(value):
+            return None if value is None else round(value * 1000, 3)
+
+        with self._lock:
+            tools = {}
+            for tool, histogram in self._durations.items():
+                tools[tool] = {
+                    "calls": histogram.count,
+                    "errors": self._calls.get((tool, "error"), 0),
+                    "in_flight": self._in_flight.get(tool, 0),
+                    "mean_ms": milliseconds(histogram.total / histogram.count),
+                    "p50_ms": milliseconds(histogram.quantile(0.5)),
+                    "p99_ms": milliseconds(histogram.quantile(0.99)),
+                    "stages": {},
+                }
+            for (tool, name), histogram in self._stages.items():
+                if tool in tools:
+                    tools[tool]["stages"][name] = {
+                        "count": histogram.count,
+                        "mean_ms": milliseconds(histogram.total / histogram.count),
+                        "p99_ms": milliseconds(histogram.quantile(0.99)),
+                    }
+            return {
+                "in_flight": sum(self._in_flight.values()),
+                "tools": tools,
+                "endpoint": f"http://{self._http.server_address[0]}:{self._http.server_address[1]}/metrics"
+                if self._http else None,
+                "trace_file": self.trace_file,
+                "traces_written": self.traces_written,
+                "traces_dropped": self.traces_dropped,
+            }
+
+    def close(self):
+        """Stop the metrics endpoint and flush outstanding traces."""
+        if self._http is not None:
+            self._http.shutdown()
+            self._http.server_close()
+            self._http = None
+        if self._writer is not None:
+            self._traces.put(None)
+            self._writer.join(timeout=5)
+            self._writer = None
@@ -0,0 +1,319 @@
+import os
+import time
+import zlib
+import struct
+import hashlib
+import logging
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+from pptx.opc.constants import CONTENT_TYPE as CT
+from pptx.opc.oxml import serialize_part_xml
+from pptx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI
+from pptx.opc.package import XmlPart
+from pptx.opc.serialized import _ContentTypesItem
+
+logger = logging.getLogger('mcp_powerpoint_server')
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+# zipfile's default deflate level, which python-pptx saves with
+DEFAULT_COMPRESS_LEVEL = 6
+
+# Parts that are already compressed, deflating them again costs CPU and saves almost nothing
+INCOMPRESSIBLE_CONTENT_TYPES = (
+    "image/jpeg", "image/png", "image/gif", "image/webp",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+)
+INCOMPRESSIBLE_PREFIXES = ("video/", "audio/")
+
+# Blobs smaller than this are compressed inline, a thread hand-off would cost more
+PARALLEL_MIN_BYTES = 64 * 1024
+
+_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+_CENTRAL_HEADER = struct.Struct("<4s6H3L5H2L")
+_END_RECORD = struct.Struct("<4s4H2LH")
+_ZIP_LIMIT = 0xFFFFFFFF
+_ZIP_MAX_ENTRIES = 0xFFFF
+
+
+class ZipEntry:
+    """A compressed zip member, kept between saves so unchanged parts are not deflated again."""
+
+    __slots__ = ("name", "key", "crc", "size", "method", "data")
+
+    def __init__(self, name: bytes, key: Any, crc: int, size: int, method: int, data: bytes):
+        self.name = name
+        self.key = key
+        self.crc = crc
+        self.size = size
+        self.method = method
+        self.data = data
+
+
+def compress_entry(name: str, key: Any, blob: bytes, level: int = DEFAULT_COMPRESS_LEVEL) -> ZipEntry:
+    """
+    Deflate a blob into a zip entry. A level of 0 stores it uncompressed.
+
+    Args:
+        name: The zip member name
+        key: Identifies the blob's content, compared on the next save
+        blob: The uncompressed bytes
+        level: zlib compression level, 0-9
+    """
+    if level == 0:
+        method, data = ZIP_STORED, bytes(blob)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+        method, data = ZIP_DEFLATED, compressor.compress(blob) + compressor.flush()
+    return ZipEntry(name.encode("utf-8"), key, zlib.crc32(blob), len(blob), method, data)
+
+
+def write_zip(file: IO[bytes], entries: Iterator[ZipEntry]):
+    """
+    Write already compressed entries as a zip archive.
+
+    Args:
+        file: A writable binary file positioned where the archive starts
+        entries: The members in archive order
+    """
+    now = time.localtime()
+    dos_time = (now.tm_hour << 11) | (now.tm_min << 5) | (now.tm_sec // 2)
+    dos_date = ((now.tm_year - 1980) << 9) | (now.tm_mon << 5) | now.tm_mday
+
+    offset = 0
+    central = []
+    count = 0
+    for entry in entries:
+        header = _LOCAL_HEADER.pack(b"PK\x03\x04", 20, 0, entry.method, dos_time, dos_date,
+                                    entry.crc, len(entry.data), entry.size, len(entry.name), 0)
+        central.append(_CENTRAL_HEADER.pack(b"PK\x01\x02", 20, 20, 0, entry.method, dos_time,
+                                            dos_date, entry.crc, len(entry.data), entry.size,
+                                            len(entry.name), 0, 0, 0, 0, 0, offset) + entry.name)
+        file.write(header)
+        file.write(entry.name)
+        file.write(entry.data)
+        offset += len(header) + len(entry.name) + len(entry.data)
+        count += 1
+        if offset > _ZIP_LIMIT or count > _ZIP_MAX_ENTRIES:
+            raise ValueError("Presentation is too large for the incremental writer")
+
+    central_directory = b"".join(central)
+    file.write(central_directory)
+    file.write(_END_RECORD.pack(b"PK\x05\x06", 0, 0, count, count, len(central_directory), offset, 0))
+
+
+def needs_zip64(entries: List[ZipEntry]) -> bool:
+    """Return True when the entries don't fit a zip archive without zip64 extensions."""
+    if len(entries) > _ZIP_MAX_ENTRIES:
+        return True
+    total = 0
+    for entry in entries:
+        if entry.size > _ZIP_LIMIT:
+            return True
+        # The central directory follows the members and must start within the limit too
+        total += _LOCAL_HEADER.size + len(entry.name) + len(entry.data)
+    return total > _ZIP_LIMIT
+
+
+def is_incompressible(content_type: str) -> bool:
+    """Return True for content types whose bytes are already compressed."""
+    return content_type in INCOMPRESSIBLE_CONTENT_TYPES or content_type.startswith(INCOMPRESSIBLE_PREFIXES)
+
+
+class PptxPackageWriter:
+    """
+    Saves presentations like python-pptx's PackageWriter, with control over compression:
+    XML parts are deflated at compress_level, already compressed media is stored as is, and
+    large parts are deflated in parallel across worker threads.
+
+    When incremental, the writer also remembers the compressed bytes of every part it writes.
+    On the next save of the same presentation, parts whose content is unchanged are copied
+    into the archive as they are instead of being deflated again: binary parts such as images
+    are recognised by identity, XML parts by a hash of their serialized XML.
+
+    The writer doesn't emit zip64 extensions. A deck too large for a plain zip archive is
+    saved by python-pptx instead, whose zipfile writes them.
+    """
+
+    def __init__(self, compress_level: int = DEFAULT_COMPRESS_LEVEL, store_media: bool = True,
+                 workers: Optional[int] = None, incremental: bool = True):
+        self.compress_level = compress_level
+        self.store_media = store_media
+        self.workers = workers if workers is not None else min(4, os.cpu_count() or 1)
+        self.incremental = incremental
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Package -> {member name: ZipEntry} from its previous save, and their compressed size
+        self._entries: "weakref.WeakKeyDictionary[Any, Dict[str, ZipEntry]]" = weakref.WeakKeyDictionary()
+        self._entry_bytes: "weakref.WeakKeyDictionary[Any, int]" = weakref.WeakKeyDictionary()
+        self.saves = 0
+        self.zip64_saves = 0
+        self.parts_reused = 0
+        self.parts_written = 0
+        self.bytes_reused = 0
+        self.bytes_compressed = 0
+        self.bytes_stored = 0
+
+    def _level(self, content_type: str) -> int:
+        if self.store_media and is_incompressible(content_type):
+            return 0
+        return self.compress_level
+
+    def _get_pool(self) -> Optional[ThreadPoolExecutor]:
+        if self.workers <= 1:
+            return None
+        with self._lock:
+            if self._pool is None:
+                # zlib releases the GIL while deflating, so threads compress in parallel
+                self._pool = ThreadPoolExecutor(max_workers=self.workers,
+                                                thread_name_prefix="pptx-deflate")
+            return self._pool
+
+    def write(self, prs, file: IO[bytes]):
+        """
+        Write the presentation to a binary file as a .pptx archive. Blocking.
+
+        Args:
+            prs: The presentation to save
+            file: A writable binary file
+        """
+        package = prs.part.package
+        previous: Dict[str, ZipEntry] = {}
+        if self.incremental:
+            with self._lock:
+                previous = self._entries.get(package, {})
+        pool = self._get_pool()
+
+        # Reuse unchanged entries, compress the rest, large blobs on the pool
+        slots: List[Any] = []
+        reused = compressed = 0
+        reused_bytes = compressed_bytes = stored_bytes = 0
+        for name, blob, key, content_type in self._members(package):
+            entry = previous.get(name)
+            if entry is not None and entry.key == key:
+                reused += 1
+                reused_bytes += entry.size
+                slots.append(entry)
+                continue
+            level = self._level(content_type)
+            compressed += 1
+            if level == 0:
+                stored_bytes += len(blob)
+            else:
+                compressed_bytes += len(blob)
+            if pool is not None and level and len(blob) >= PARALLEL_MIN_BYTES:
+                slots.append(pool.submit(compress_entry, name, key, blob, level))
+            else:
+                slots.append(compress_entry(name, key, blob, level))
+
+        entries = [slot if isinstance(slot, ZipEntry) else slot.result() for slot in slots]
+        if needs_zip64(entries):
+            logger.info("Presentation needs zip64, saving it with python-pptx")
+            prs.save(file)
+            with self._lock:
+                self._entries.pop(package, None)
+                self._entry_bytes.pop(package, None)
+                self.saves += 1
+                self.zip64_saves += 1
+            return
+        write_zip(file, iter(entries))
+
+        with self._lock:
+            if self.incremental:
+                self._entries[package] = {entry.name.decode("utf-8"): entry for entry in entries}
+                self._entry_bytes[package] = sum(len(entry.data) for entry in entries)
+            self.saves += 1
+            self.parts_reused += reused
+            self.parts_written += compressed
+            self.bytes_reused += reused_bytes
+            self.bytes_compressed += compressed_bytes
+            self.bytes_stored += stored_bytes
+        logger.debug(f"Saved package: {compressed} parts compressed, {reused} reused")
+
+    def _xml_member(self, name: str, blob: bytes, content_type: str = CT.XML) -> Tuple[str, bytes, Any, str]:
+        key = hashlib.blake2b(blob, digest_size=16).digest() if self.incremental else None
+        return name, blob, key, content_type
+
+    def _members(self, package) -> Iterator[Tuple[str, bytes, Any, str]]:
+        """
+        Generate (member name, blob, content key, content type) in the order PackageWriter
+        writes them.
+        """
+        parts = tuple(package.iter_parts())
+        yield self._xml_member(CONTENT_TYPES_URI.membername,
+                               serialize_part_xml(_ContentTypesItem.xml_for(parts)))
+        yield self._xml_member(PACKAGE_URI.rels_uri.membername, package._rels.xml, CT.OPC_RELATIONSHIPS)
+        for part in parts:
+            blob = part.blob
+            if isinstance(part, XmlPart):
+                yield self._xml_member(part.partname.membername, blob, part.content_type)
+            else:
+                # Binary parts keep their bytes object until they are replaced
+                yield part.partname.membername, blob, _Identity(blob), part.content_type
+            if part._rels:
+                yield self._xml_member(part.partname.rels_uri.membername, part.rels.xml,
+                                       CT.OPC_RELATIONSHIPS)
+
+    def forget(self, prs) -> bool:
+        """
+        Drop the entries kept for the presentation's next incremental save, returning
+        whether there were any.
+
+        Args:
+            prs: The presentation
+        """
+        with self._lock:
+            self._entry_bytes.pop(prs.part.package, None)
+            return self._entries.pop(prs.part.package, None) is not None
+
+    def cached_bytes(self, prs) -> int:
+        """
+        Return the compressed bytes kept for the presentation's next incremental save.
+
+        Args:
+            prs: The presentation
+        """
+        with self._lock:
+            return self._entry_bytes.get(prs.part.package, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the compression settings and how many parts were written and reused."""
+        with self._lock:
+            return {
+                "compress_level": self.compress_level,
+                "store_media": self.store_media,
+                "workers": self.workers,
+                "saves": self.saves,
+                "zip64_saves": self.zip64_saves,
+                "cached_bytes": sum(self._entry_bytes.values()),
+                "parts_written": self.parts_written,
+                "parts_reused": self.parts_reused,
+                "bytes_compressed": self.bytes_compressed,
+                "bytes_reused": self.bytes_reused,
+                "bytes_stored": self.bytes_stored,
+            }
+
+    def close(self):
+        """Release the compression threads."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+
+
+class _Identity:
+    """Compares equal only to a key for the very same object, keeping that object alive."""
+
+    __slots__ = ("obj",)
+
+    def __init__(self, obj: Any):
+        self.obj = obj
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, _Identity) and other.obj is self.obj
+
+    __hash__ = object.__hash__
@@ -0,0 +1,140 @@
+import math
+from typing import Any, List, Optional, Sequence, Tuple
+
+from pptx.enum.shapes import PP_PLACEHOLDER
+
+EMU_PER_POINT = 12700
+EMU_PER_INCH = 914400
+
+# Average glyph width as a fraction of the font size, for typical proportional fonts
+AVERAGE_CHAR_WIDTH = 0.5
+LINE_SPACING = 1.2
+
+# python-pptx's default table cell margins
+CELL_MARGIN_X = int(0.1 * EMU_PER_INCH)
+CELL_MARGIN_Y = int(0.05 * EMU_PER_INCH)
+
+# Placeholders that sit at the bottom of a slide and should not be covered by content
+_FOOTER_PLACEHOLDERS = (PP_PLACEHOLDER.DATE, PP_PLACEHOLDER.FOOTER, PP_PLACEHOLDER.SLIDE_NUMBER)
+
+
+def estimate_text_lines(text: str, width: int, font_size: float) -> int:
+    """
+    Estimate how many lines text wraps to in a box of the given width.
+
+    Args:
+        text: The text, explicit line breaks are honoured
+        width: Width available to the text in EMU
+        font_size: Font size in points
+    """
+    chars_per_line = max(1, int(width / (font_size * AVERAGE_CHAR_WIDTH * EMU_PER_POINT)))
+    return sum(max(1, math.ceil(len(line) / chars_per_line)) for line in text.split("\n"))
+
+
+def line_height(font_size: float) -> int:
+    """Return the height of one line of text at font_size points, in EMU."""
+    return int(font_size * LINE_SPACING * EMU_PER_POINT)
+
+
+def content_bottom(slide_layout, slide_height: int) -> int:
+    """
+    Return the lowest y coordinate content can reach on slides using the layout: the top of
+    the footer placeholders, or the bottom of the slide when the layout has none.
+    """
+    tops = [placeholder.top for placeholder in slide_layout.placeholders
+            if placeholder.placeholder_format.type in _FOOTER_PLACEHOLDERS and placeholder.top]
+    return min(tops) if tops else slide_height
+
+
+def estimate_row_height(row: Sequence[Any], col_width: int, font_size: float, min_height: int) -> int:
+    """
+    Estimate the rendered height of a table row, growing it for cells whose text wraps.
+
+    Args:
+        row: The display text of each cell
+        col_width: Width of each column in EMU
+        font_size: Font size of the row in points
+        min_height: The row height the table is created with
+    """
+    text_width = col_width - 2 * CELL_MARGIN_X
+    lines = max(estimate_text_lines(str(value), text_width, font_size) for value in row)
+    return max(min_height, lines * line_height(font_size) + 2 * CELL_MARGIN_Y)
+
+
+def paginate_rows(rows: Sequence[Sequence[Any]], header_height: int, available_height: int,
+                  row_height) -> List[Tuple[int, int]]:
+    """
+    Split table rows into pages that fit the available height, leaving room on every page for
+    a repeated header row. Returns (start, end) index ranges into rows. Runs in linear time.
+
+    Args:
+        rows: The table body
+        header_height: Height of the header row in EMU
+        available_height: Height available to the whole table in EMU
+        row_height: Callable returning the estimated height of a row in EMU
+    """
+    budget = max(available_height - header_height, 0)
+    pages = []
+    start = 0
+    used = 0
+    for index, row in enumerate(rows):
+        height = row_height(row)
+        # Every page holds at least one row, even one taller than the slide
+        if used + height > budget and index > start:
+            pages.append((start, index))
+            start, used = index, 0
+        used += height
+    pages.append((start, len(rows)))
+    return pages
+
+
+def paginate_lines(items: Sequence[Tuple[int, str]], width: int, available_height: int,
+                   level_font_sizes: Sequence[float], level_indents: Sequence[int],
+                   paragraph_spacing: Optional[float] = None) -> List[List[Tuple[int, str]]]:
+    """
+    Split (level, text) bullet items into pages that fit a text placeholder. Runs in linear time.
+
+    Args:
+        items: The bullets in order, with their indentation level
+        width: Width of the placeholder's text area in EMU
+        available_height: Height of the placeholder's text area in EMU
+        level_font_sizes: Font size in points for each bullet level
+        level_indents: Left indent in EMU for each bullet level
+        paragraph_spacing: Extra space before each bullet, as a fraction of its line height
+    """
+    if paragraph_spacing is None:
+        paragraph_spacing = 0.2
+    last_level = len(level_font_sizes) - 1
+    pages = []
+    page = []
+    used = 0
+    for level, text in items:
+        level_index = min(level, last_level)
+        font_size = level_font_sizes[level_index]
+        text_width = max(width - level_indents[level_index], EMU_PER_INCH)
+        lines = estimate_text_lines(text, text_width, font_size)
+        height = int(line_height(font_size) * (lines + paragraph_spacing))
+        if used + height > available_height and page:
+            pages.append(page)
+            page, used = [], 0
+        page.append((level, text))
+        used += height
+    pages.append(page)
+    return pages
+
+
+def body_text_style(slide_master) -> Tuple[List[float], List[int]]:
+    """
+    Read the bullet font size (points) and left indent (EMU) of each level from the slide
+    master's body text style, falling back to PowerPoint's defaults.
+    """
+    defaults = [32, 28, 24, 20, 20, 20, 20, 20, 20]
+    font_sizes = []
+    indents = []
+    master = slide_master._element
+    for level in range(1, 10):
+        sizes = master.xpath(f'./p:txStyles/p:bodyStyle/a:lvl{level}pPr/a:defRPr/@sz')
+        margins = master.xpath(f'./p:txStyles/p:bodyStyle/a:lvl{level}pPr/@marL')
+        font_sizes.append(int(sizes[0]) / 100 if sizes else defaults[level - 1])
+        indents.append(int(margins[0]) if margins else int(0.375 * EMU_PER_INCH * level))
+    return font_sizes, indents
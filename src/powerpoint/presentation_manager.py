@@ -1,15 +1,67 @@
 import os
+import shutil
+import asyncio
+import contextlib
+import functools
+import time
 from pptx import Presentation
 from pptx.util import Inches, Pt
 from pptx.util import Inches
 from pptx.slide import Slide
 from PIL import Image, UnidentifiedImageError
+from .deck_history import UNDO_DEPTH, DeckHistory, Transaction
+from .image_processor import PreparedImage
+from .media_store import MediaStore
+from .metrics import record_stage
+from .table_writer import normalize_table_data, write_table, format_cell
+from .pagination import (EMU_PER_INCH, body_text_style, content_bottom, estimate_row_height,
+                         paginate_lines, paginate_rows)
 
 import logging
-from typing import Literal, Union, List, Dict, Any
+from collections.abc import MutableMapping
+from typing import IO, Literal, Union, List, Dict, Any, Optional, Tuple
 
 ChartTypes = Literal["bar", "line", "pie", "scatter", "area"]
 
+
+def _transactional(label: str):
+    """
+    Run a slide-adding method in a transaction, so a slide it leaves half-built is rolled
+    back and the slides it adds can be undone. The label is followed by the method's first
+    argument after the presentation name, its title.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, presentation_name, *args, **kwargs):
+            description = f"{label} '{args[0]}'" if args else label
+            with self.transaction(presentation_name, description):
+                return method(self, presentation_name, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class _DeckLock:
+    """An asyncio lock for one presentation plus its contention counters."""
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.waiting = 0
+        self.acquisitions = 0
+        self.contended = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "locked": self.lock.locked(),
+            "waiting": self.waiting,
+            "acquisitions": self.acquisitions,
+            "contended": self.contended,
+            "total_wait_ms": round(self.total_wait * 1000, 3),
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+        }
+
+
 class PresentationManager:
     # Slide layout constants
     SLIDE_LAYOUT_TITLE = 0
@@ -23,18 +75,216 @@ class PresentationManager:
     SLIDE_LAYOUT_PICTURE_WITH_CAPTION = 8
 
 
-    def __init__(self):
-        self.presentations: Dict[str, Any] = {}
+    def __init__(self, presentations: Optional[MutableMapping] = None,
+                 media_store: Optional[MediaStore] = None, undo_depth: int = UNDO_DEPTH):
+        self.presentations: MutableMapping = presentations if presentations is not None else {}
+        self.media_store = media_store if media_store is not None else MediaStore()
+        self.undo_depth = undo_depth
+        self._locks: Dict[str, _DeckLock] = {}
+        self._pending_backups: Dict[str, tuple] = {}
+        self._histories: Dict[str, DeckHistory] = {}
+        self._transactions: Dict[str, Transaction] = {}
+        self._notices: Dict[str, List[str]] = {}
 
-    def _add_formatted_bullets(self, text_frame, text_block):
+    def get_presentation(self, presentation_name: str):
+        """
+        Return the named presentation, reloading it if it was spilled to disk. May block.
+
+        Args:
+            presentation_name: The presentation to return
+        """
+        try:
+            return self.presentations[presentation_name]
+        except KeyError as e:
+            raise ValueError(f"Presentation '{presentation_name}' not found")
+
+    def set_presentation(self, presentation_name: str, prs):
+        """
+        Store a presentation under the given name. May block while other decks are spilled.
+
+        Args:
+            presentation_name: The name to store the presentation under
+            prs: The presentation
+        """
+        self._pending_backups.pop(presentation_name, None)
+        self._histories.pop(presentation_name, None)
+        self._notices.pop(presentation_name, None)
+        self.presentations[presentation_name] = prs
+
+    def release_history(self, presentation_name: str) -> int:
+        """
+        Drop the undo history of a presentation, e.g. once it was spilled to disk, and
+        return how many operations it held. The history keeps the deck it belongs to alive.
+
+        Args:
+            presentation_name: The presentation whose history to drop
+        """
+        history = self._histories.pop(presentation_name, None)
+        if history is None:
+            return 0
+        return len(history.undo_stack) + len(history.redo_stack)
+
+    def notify(self, presentation_name: str, notice: str):
         """
-        Process a text block and add paragraphs with proper bullet indentation
-        using ASCII code detection:
+        Keep a notice for the next tool call on the presentation to pass on to the client.
+
+        Args:
+            presentation_name: The presentation the notice is about
+            notice: The text of the notice
+        """
+        self._notices.setdefault(presentation_name, []).append(notice)
+
+    def pop_notices(self, presentation_name: str) -> List[str]:
+        """Return and forget the notices kept for the presentation."""
+        return self._notices.pop(presentation_name, [])
+
+    def register_backup(self, presentation_name: str, source_path: str, backup_path: str):
+        """
+        Arrange for source_path to be copied to backup_path before the presentation is first
+        modified or saved. Presentations that are only opened never pay for a backup.
+
+        Args:
+            presentation_name: The presentation that was opened from source_path
+            source_path: The file the presentation was opened from
+            backup_path: Where to copy the original file to
+        """
+        self._pending_backups[presentation_name] = (source_path, backup_path)
+
+    def ensure_backup(self, presentation_name: str):
+        """Write the pending backup for the presentation, if there is one. Blocking."""
+        pending = self._pending_backups.pop(presentation_name, None)
+        if pending is None:
+            return
+        source_path, backup_path = pending
+        try:
+            shutil.copyfile(source_path, backup_path)
+        except OSError as e:
+            raise ValueError(f"Unable to save {backup_path}. Error: {str(e)}")
+
+    def _get_for_edit(self, presentation_name: str):
+        prs = self.get_presentation(presentation_name)
+        self.ensure_backup(presentation_name)
+        return prs
+
+    def _history(self, presentation_name: str, prs) -> DeckHistory:
+        # A deck spilled to disk comes back as a new object, without its history
+        history = self._histories.get(presentation_name)
+        if history is None or history.prs is not prs:
+            history = self._histories[presentation_name] = DeckHistory(prs, self.undo_depth)
+        return history
+
+    @contextlib.contextmanager
+    def transaction(self, presentation_name: str, label: str):
+        """
+        Run an edit of a presentation as one operation. If the block raises, the slides it
+        added are removed again. Otherwise they are recorded as one step that undo() can take
+        back. Transactions nest: an inner one rolls back on its own, but only the outermost
+        one is recorded. Blocking, call it under the presentation's lock.
+
+        Args:
+            presentation_name: The presentation to edit
+            label: Describes the operation in the undo history
+        """
+        prs = self._get_for_edit(presentation_name)
+        outermost = presentation_name not in self._transactions
+        transaction = Transaction(prs, label)
+        if outermost:
+            self._transactions[presentation_name] = transaction
+        try:
+            yield transaction
+        except BaseException:
+            transaction.rollback()
+            raise
+        finally:
+            if outermost:
+                del self._transactions[presentation_name]
+        if outermost:
+            change = transaction.change()
+            if change:
+                self._history(presentation_name, prs).record(change)
+
+    def undo(self, presentation_name: str, steps: int = 1) -> List[str]:
+        """
+        Take back the last operations on a presentation, newest first, and return their
+        labels. Only what each operation added is touched. Blocking.
+
+        Args:
+            presentation_name: The presentation to undo operations on
+            steps: The number of operations to undo
+        """
+        prs = self._get_for_edit(presentation_name)
+        return self._history(presentation_name, prs).undo(steps)
+
+    def redo(self, presentation_name: str, steps: int = 1) -> List[str]:
+        """
+        Reapply operations taken back by undo(), oldest first, and return their labels.
+        Blocking.
+
+        Args:
+            presentation_name: The presentation to redo operations on
+            steps: The number of operations to redo
+        """
+        prs = self._get_for_edit(presentation_name)
+        return self._history(presentation_name, prs).redo(steps)
+
+    def history(self, presentation_name: str) -> Tuple[List[str], List[str]]:
+        """
+        Return the labels of the operations that can be undone and redone, next first. May
+        block.
+
+        Args:
+            presentation_name: The presentation to describe
+        """
+        prs = self.get_presentation(presentation_name)
+        return self._history(presentation_name, prs).labels()
+
+    def is_locked(self, presentation_name: str) -> bool:
+        """Return True while a tool call holds the lock for the presentation."""
+        deck_lock = self._locks.get(presentation_name)
+        return deck_lock is not None and deck_lock.lock.locked()
+
+    @contextlib.asynccontextmanager
+    async def lock(self, presentation_name: str):
+        """
+        Serialize access to a single presentation. Calls on different presentations run
+        in parallel, calls on the same presentation are granted in arrival order.
+
+        Args:
+            presentation_name: The presentation to lock
+        """
+        deck_lock = self._locks.get(presentation_name)
+        if deck_lock is None:
+            deck_lock = self._locks[presentation_name] = _DeckLock()
+
+        if deck_lock.lock.locked():
+            deck_lock.contended += 1
+        deck_lock.waiting += 1
+        start = time.perf_counter()
+        try:
+            await deck_lock.lock.acquire()
+        finally:
+            deck_lock.waiting -= 1
+        wait = time.perf_counter() - start
+        deck_lock.acquisitions += 1
+        deck_lock.total_wait += wait
+        deck_lock.max_wait = max(deck_lock.max_wait, wait)
+        record_stage("lock_wait", wait)
+        try:
+            yield
+        finally:
+            deck_lock.lock.release()
+
+    def lock_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return contention and wait-time counters for every presentation that has been locked."""
+        return {name: deck_lock.snapshot() for name, deck_lock in self._locks.items()}
+
+    def _parse_bullets(self, text_block) -> List[tuple]:
+        """
+        Split a text block into (level, text) bullets using ASCII code detection:
         - ASCII 10 (LF) or ASCII 13 (CR) or combination for new lines (main bullets)
         - ASCII 9 (HT) for tab indentation (sub-bullets)
 
         Args:
-            text_frame: The PowerPoint text frame to add text to
             text_block: String of text to process
         """
         # First, normalize all line endings to a single format
@@ -43,30 +293,9 @@ class PresentationManager:
         # Replace any remaining CR (old Mac) with LF
         normalized_text = normalized_text.replace('\r', '\n')
 
+        bullets = []
         # Split the text block into lines using ASCII 10 (LF)
-        lines = normalized_text.split('\n')
-
-        # Clear any existing text
-        if text_frame.paragraphs:
-            p = text_frame.paragraphs[0]
-            p.text = ""
-        else:
-            p = text_frame.add_paragraph()
-
-        # Process the first line separately (if it exists)
-        if lines and lines[0].strip():
-            first_line = lines[0]
-            # Count leading tabs (ASCII 9) to determine indentation level
-            level = 0
-            while first_line and ord(first_line[0]) == 9:  # ASCII 9 is HT (tab)
-                level += 1
-                first_line = first_line[1:]
-
-            p.text = first_line.strip()
-            p.level = level
-
-        # Process remaining lines
-        for line in lines[1:]:
+        for line in normalized_text.split('\n'):
             if not line.strip():
                 continue  # Skip empty lines
 
@@ -75,12 +304,42 @@ class PresentationManager:
             while line and ord(line[0]) == 9:  # ASCII 9 is HT (tab)
                 level += 1
                 line = line[1:]
+            bullets.append((level, line.strip()))
+        return bullets
 
-            # Add the paragraph with proper indentation
+    def _write_bullets(self, text_frame, bullets):
+        """
+        Replace the text of a text frame with (level, text) bullets, one paragraph each.
+
+        Args:
+            text_frame: The PowerPoint text frame to add text to
+            bullets: The bullets returned by _parse_bullets
+        """
+        # Clear any existing text
+        if text_frame.paragraphs:
+            p = text_frame.paragraphs[0]
+            p.text = ""
+        else:
             p = text_frame.add_paragraph()
-            p.text = line.strip()
+
+        for index, (level, text) in enumerate(bullets):
+            # The first bullet reuses the existing paragraph
+            if index:
+                p = text_frame.add_paragraph()
+            p.text = text
             p.level = level
 
+    def _add_formatted_bullets(self, text_frame, text_block):
+        """
+        Process a text block and add paragraphs with proper bullet indentation.
+
+        Args:
+            text_frame: The PowerPoint text frame to add text to
+            text_block: String of text to process
+        """
+        self._write_bullets(text_frame, self._parse_bullets(text_block))
+
+    @_transactional("Add section header slide")
     def add_section_header_slide(self, presentation_name: str, header: str, subtitle: str):
         """
         Create a section header slide for the given presentation
@@ -90,10 +349,7 @@ class PresentationManager:
             header: The section header to use
             subtitle: The subtitle of the section header to use
         """
-        try:
-            prs = self.presentations[presentation_name]
-        except KeyError as e:
-            raise ValueError(f"Presentation '{presentation_name}' not found")
+        prs = self._get_for_edit(presentation_name)
         slide_master = prs.slide_master
 
         # Add a new slide with layout
@@ -113,6 +369,7 @@ class PresentationManager:
 
         return slide
 
+    @_transactional("Add comparison slide")
     def add_comparison_slide(self, presentation_name: str, title: str, left_side_title: str, left_side_content: str,
                              right_side_title: str, right_side_content: str ):
         """
@@ -126,10 +383,7 @@ class PresentationManager:
             right_side_title: The title of the right hand side content
             right_side_content: The body content for the right hand side
         """
-        try:
-            prs = self.presentations[presentation_name]
-        except KeyError as e:
-            raise ValueError(f"Presentation '{presentation_name}' not found")
+        prs = self._get_for_edit(presentation_name)
         slide_master = prs.slide_master
 
         # Add a new slide with layout
@@ -159,8 +413,24 @@ class PresentationManager:
         text_frame.text = right_side_content
         return slide
 
+    def picture_placeholder_size(self, presentation_name: str) -> Tuple[int, int]:
+        """
+        Return the width and height in EMU of the picture placeholder on the presentation's
+        picture with caption layout, or the slide size when the layout doesn't define one.
+        """
+        prs = self.get_presentation(presentation_name)
+        try:
+            slide_layout = prs.slide_layouts[self.SLIDE_LAYOUT_PICTURE_WITH_CAPTION]
+        except IndexError:
+            slide_layout = None
+        placeholder = self._layout_placeholder(slide_layout, 1) if slide_layout is not None else None
+        if placeholder is not None and placeholder.width and placeholder.height:
+            return placeholder.width, placeholder.height
+        return prs.slide_width, prs.slide_height
+
+    @_transactional("Add picture slide")
     def add_picture_with_caption_slide(self, presentation_name: str, title: str,
-                                       image_path: str, caption_text: str) -> Slide:
+                                       image_path: Union[str, IO[bytes], PreparedImage], caption_text: str) -> Slide:
 
         """
         For the given presentation builds a slide with the picture with caption template.
@@ -168,14 +438,12 @@ class PresentationManager:
         Args:
             presentation_name: The presentation to add the slide to
             title: The title of the slide
-            image_path: The path to the image to insert
+            image_path: The path to the image to insert, a file-like object with its bytes, or an
+                image prepared by the ImageProcessor
             caption_text: The caption content
 
         """
-        try:
-            prs = self.presentations[presentation_name]
-        except KeyError as e:
-            raise ValueError(f"Presentation '{presentation_name}' not found")
+        prs = self._get_for_edit(presentation_name)
 
         # Add a new slide with layout 8 (Picture with Caption)
         try:
@@ -196,10 +464,11 @@ class PresentationManager:
             raise ValueError(error_message)
 
         # Insert the picture into the placeholder
-        if not os.path.exists(image_path):
+        if isinstance(image_path, str) and not os.path.exists(image_path):
             raise FileNotFoundError(f"Image not found: {image_path}")
         try:
-            picture = placeholder.insert_picture(image_path)
+            # Images come from the shared media store, so they are read and decoded only once
+            picture, image = self.media_store.insert_picture(placeholder, image_path)
         except FileNotFoundError as e:
             error_message = f"Image not found during insertion: {str(e)}"
             raise
@@ -214,8 +483,8 @@ class PresentationManager:
         available_width = picture.width
         available_height = picture.height
 
-        # Get original image dimensions directly from the picture object
-        image_width, image_height = picture.image.size
+        # Get original image dimensions from the decoded image
+        image_width, image_height = image.size
 
         # Calculate aspect ratios
         placeholder_aspect_ratio = float(available_width) / float(available_height)
@@ -250,45 +519,67 @@ class PresentationManager:
 
         return slide
 
-    def add_title_with_content_slide(self, presentation_name: str, title: str, content: str) -> Slide:
-        try:
-            prs = self.presentations[presentation_name]
-        except KeyError as e:
-            raise ValueError(f"Presentation '{presentation_name}' not found")
-        slide_master = prs.slide_master
+    @_transactional("Add title and content slide")
+    def add_title_with_content_slide(self, presentation_name: str, title: str, content: str,
+                                     paginate: bool = True) -> List[Slide]:
+        """
+        Add a title and content slide. Content that does not fit the layout's body placeholder
+        continues on further slides titled "<title> (cont.)".
+
+        Args:
+            presentation_name: The presentation to add the slide to
+            title: The title of the slide
+            content: Bullet text, one bullet per line, tabs for sub-bullets
+            paginate: Split content that overflows the placeholder across slides
+        """
+        prs = self._get_for_edit(presentation_name)
         # Add a slide with title and content
         slide_layout = prs.slide_layouts[self.SLIDE_LAYOUT_TITLE_AND_CONTENT]  # Use layout with title and content
-        slide = prs.slides.add_slide(slide_layout)
-
-        # Set the title
-        title_shape = slide.shapes.title
-        title_shape.text = title
 
-        # Set the content
-        content_shape = slide.placeholders[1]
-        #content_shape.text = content
-        # Get the content placeholder and add our formatted text
+        bullets = self._parse_bullets(content)
+        pages = [bullets]
+        body = self._layout_placeholder(slide_layout, 1)
+        if paginate and body is not None and body.width and body.height:
+            font_sizes, indents = body_text_style(prs.slide_master)
+            text_frame_margin = 2 * int(0.1 * EMU_PER_INCH)
+            pages = paginate_lines(bullets, body.width - text_frame_margin,
+                                   body.height - text_frame_margin, font_sizes, indents)
+
+        slides = []
+        for page_index, page in enumerate(pages):
+            slide = prs.slides.add_slide(slide_layout)
 
-        text_frame = content_shape.text_frame
-        self._add_formatted_bullets(text_frame, content)
-        return slide
+            # Set the title
+            title_shape = slide.shapes.title
+            title_shape.text = title if page_index == 0 else f"{title} (cont.)"
 
-    def add_table_slide(self, presentation_name: str, title: str, headers: str, rows: str) -> Slide:
+            # Set the content
+            content_shape = slide.placeholders[1]
+            text_frame = content_shape.text_frame
+            self._write_bullets(text_frame, page)
+            slides.append(slide)
+        return slides
 
-        try:
-            prs = self.presentations[presentation_name]
-        except KeyError as e:
-            raise ValueError(f"Presentation '{presentation_name}' not found")
+    @_transactional("Add table slide")
+    def add_table_slide(self, presentation_name: str, title: str, headers: str, rows: str,
+                        number_format: Optional[str] = None, paginate: bool = True) -> List[Slide]:
+        """
+        Add title-only slides with a table built from headers and rows. Rows that do not fit
+        on the slide continue on further slides titled "<title> (cont.)", each repeating the
+        header row.
 
+        Args:
+            presentation_name: The presentation to add the slide to
+            title: The title of the slide
+            headers: The header row, optional when rows is a column-oriented dict or a DataFrame
+            rows: A list of rows, a column-oriented dict, or a NumPy/pandas-style array
+            number_format: Format spec applied to numeric cells, e.g. ",.2f"
+            paginate: Split rows that overflow the slide across slides
+        """
+        headers, rows = normalize_table_data(headers, rows)
+        prs = self._get_for_edit(presentation_name)
         slide_layout = prs.slide_layouts[self.SLIDE_LAYOUT_TITLE_ONLY]
-        slide = prs.slides.add_slide(slide_layout)
 
-        # Set the title
-        title_shape = slide.shapes.title
-        title_shape.text = title
-
-        # Calculate table dimensions and position
-        num_rows = len(rows) + 1  # +1 for header row
         num_cols = len(headers)
 
         # Position table in the middle of the slide with some margins
@@ -299,44 +590,53 @@ class PresentationManager:
         width_per_col = Inches(8 / num_cols)  # Divide available width (8 inches) by number of columns
         height_per_row = Inches(0.4)  # Standard height per row
 
-        # Create table
-        shape = slide.shapes.add_table(
-            num_rows,
-            num_cols,
-            x,
-            y,
-            width_per_col * num_cols,
-            height_per_row * num_rows
-        )
-        table = shape.table
-
-        # Add headers
-        for col_idx, header in enumerate(headers):
-            cell = table.cell(0, col_idx)
-            cell.text = str(header)
-            # Style header row
-            paragraph = cell.text_frame.paragraphs[0]
-            paragraph.font.bold = True
-            paragraph.font.size = Pt(11)
-
-
-
-        # Add data rows
-        for row_idx, row_data in enumerate(rows, start=1):
-            for col_idx, cell_value in enumerate(row_data):
-                cell = table.cell(row_idx, col_idx)
-                cell.text = str(cell_value)
-                # Style data cells
-                paragraph = cell.text_frame.paragraphs[0]
-                paragraph.font.size = Pt(10)
-
-        return slide
+        pages = [(0, len(rows))]
+        if paginate:
+            available_height = content_bottom(slide_layout, prs.slide_height) - y
+            header_height = estimate_row_height([str(header) for header in headers],
+                                                width_per_col, 11, height_per_row)
+            pages = paginate_rows(
+                rows, header_height, available_height,
+                lambda row: estimate_row_height([format_cell(value, number_format) for value in row],
+                                                width_per_col, 10, height_per_row))
+
+        slides = []
+        for page_index, (start, end) in enumerate(pages):
+            slide = prs.slides.add_slide(slide_layout)
 
+            # Set the title
+            title_shape = slide.shapes.title
+            title_shape.text = title if page_index == 0 else f"{title} (cont.)"
+
+            page_rows = rows[start:end]
+            num_rows = len(page_rows) + 1  # +1 for header row
+
+            # Create the table frame, then write every row and cell in one pass
+            shape = slide.shapes.add_table(
+                1,
+                num_cols,
+                x,
+                y,
+                width_per_col * num_cols,
+                height_per_row * num_rows
+            )
+            write_table(shape, headers, page_rows, width_per_col, height_per_row,
+                        header_font_size=1100, body_font_size=1000,
+                        number_format=number_format)
+            slides.append(slide)
+
+        return slides
+
+    @staticmethod
+    def _layout_placeholder(slide_layout, idx: int):
+        for placeholder in slide_layout.placeholders:
+            if placeholder.placeholder_format.idx == idx:
+                return placeholder
+        return None
+
+    @_transactional("Add title slide")
     def add_title_slide(self, presentation_name: str, title: str) -> Slide:
-        try:
-            prs = self.presentations[presentation_name]
-        except KeyError as e:
-            raise ValueError(f"Presentation '{presentation_name}' not found")
+        prs = self._get_for_edit(presentation_name)
 
         # Add a slide with title and content
         slide_layout = prs.slide_layouts[self.SLIDE_LAYOUT_TITLE]
@@ -347,4 +647,21 @@ class PresentationManager:
         title_shape.text = title
         return slide
 
+    @_transactional("Add title only slide")
+    def add_title_only_slide(self, presentation_name: str, title: str) -> Slide:
+        """
+        Add a slide with only a title, leaving the body free for tables or charts
+
+        Args:
+            presentation_name: The presentation to add the slide to
+            title: The title of the slide
+        """
+        prs = self._get_for_edit(presentation_name)
+
+        slide_layout = prs.slide_layouts[self.SLIDE_LAYOUT_TITLE_ONLY]
+        slide = prs.slides.add_slide(slide_layout)
 
+        # Set the title
+        title_shape = slide.shapes.title
+        title_shape.text = title
+        return slide
@@ -0,0 +1,324 @@
+import os
+import time
+import shutil
+import asyncio
+import hashlib
+import logging
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from PIL import Image
+from pptx import Presentation
+from pptx.opc.constants import CONTENT_TYPE as CT
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.oxml import serialize_part_xml
+from pptx.opc.package import XmlPart
+
+from .vision_manager import ImageCache
+
+logger = logging.getLogger('mcp_powerpoint_server')
+
+# Bump when the rendering pipeline changes so old cache entries are not reused
+RENDER_VERSION = "1"
+
+# Relationships that don't change how a slide looks
+_IGNORED_RELATIONSHIPS = (RT.NOTES_SLIDE, RT.SLIDE, RT.PACKAGE)
+
+# Related parts whose own relationships are part of the slide's look as well
+_FOLLOWED_RELATIONSHIPS = (RT.SLIDE_LAYOUT, RT.SLIDE_MASTER, RT.CHART)
+
+
+def find_soffice() -> Optional[str]:
+    """Return the path of the LibreOffice executable on PATH, or None."""
+    return shutil.which("soffice") or shutil.which("libreoffice")
+
+
+def _convert(soffice: str, file_path: str, out_dir: str, target: str, timeout: int):
+    # Every conversion gets its own profile, concurrent LibreOffice instances can't share one
+    profile = os.path.join(out_dir, "profile")
+    command = [soffice, "--headless", "--norestore", f"-env:UserInstallation=file://{profile}",
+               "--convert-to", target, "--outdir", out_dir, file_path]
+    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            timeout=timeout, check=False)
+    output = os.path.join(out_dir, os.path.splitext(os.path.basename(file_path))[0] + "." + target)
+    if result.returncode != 0 or not os.path.exists(output):
+        message = result.stdout.decode("utf-8", "replace").strip()
+        raise ValueError(f"LibreOffice could not convert the presentation to {target}: {message}")
+    return output
+
+
+def render_slide(deck_path: str, index: int, soffice: str, width: int, timeout: int = 120) -> bytes:
+    """
+    Render one slide of a saved deck to a PNG at most width pixels wide and return its bytes.
+    LibreOffice renders the first slide of a document to PNG, so the slide is rendered from a
+    copy of the deck holding only that slide. Blocking; runs in a worker process.
+
+    Args:
+        deck_path: The saved .pptx file
+        index: Zero-based index of the slide
+        soffice: Path of the LibreOffice executable
+        width: Width of the thumbnail in pixels
+        timeout: Seconds to wait for LibreOffice
+    """
+    prs = Presentation(deck_path)
+    slide_ids = prs.slides._sldIdLst
+    for position, slide_id in reversed(list(enumerate(slide_ids))):
+        if position != index:
+            # Drop the other slides and their parts, so LibreOffice doesn't load them
+            prs.part.rels.pop(slide_id.rId)
+            slide_ids.remove(slide_id)
+
+    with tempfile.TemporaryDirectory(prefix="pptx-render-") as work_dir:
+        single = os.path.join(work_dir, "slide.pptx")
+        prs.save(single)
+        png_path = _convert(soffice, single, work_dir, "png", timeout)
+        image = Image.open(png_path)
+        image.load()
+    if image.width > width:
+        image.thumbnail((width, max(1, image.height * width // image.width)), Image.LANCZOS)
+    buffer = BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+def render_pdf(deck_path: str, soffice: str, timeout: int = 300) -> bytes:
+    """
+    Convert a saved deck to PDF and return its bytes. Blocking; runs in a worker process.
+
+    Args:
+        deck_path: The saved .pptx file
+        soffice: Path of the LibreOffice executable
+        timeout: Seconds to wait for LibreOffice
+    """
+    with tempfile.TemporaryDirectory(prefix="pptx-render-") as work_dir:
+        pdf_path = _convert(soffice, deck_path, work_dir, "pdf", timeout)
+        with open(pdf_path, "rb") as f:
+            return f.read()
+
+
+class RenderManager:
+    """
+    Renders slides to PNG thumbnails, or whole decks to PDF, with headless LibreOffice in a
+    pool of worker processes, one slide per task.
+
+    Renders are cached on disk by a hash of everything a slide is drawn from: its XML and the
+    parts it relates to (layout, master, theme, images, charts). After an edit only the
+    slides whose content changed are rendered again. Cache reads and writes run in the
+    executor's I/O pool.
+    """
+
+    def __init__(self, cache_dir: str, executor_manager=None, soffice: Optional[str] = None,
+                 workers: Optional[int] = None, cache_max_bytes: int = 256 * 1024 * 1024,
+                 timeout: int = 120):
+        self.executor_manager = executor_manager
+        self.soffice = soffice or find_soffice()
+        self.workers = workers if workers is not None else min(4, os.cpu_count() or 1)
+        self.timeout = timeout
+        self.cache = ImageCache(cache_dir, max_bytes=cache_max_bytes)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.renders = 0
+        self.slides_rendered = 0
+        self.slides_cached = 0
+        self.failures = 0
+        self.render_seconds = 0.0
+
+    async def _run_io(self, func, *args):
+        if self.executor_manager is None:
+            return func(*args)
+        # The cache reads and writes files, keep that off the event loop
+        return await self.executor_manager.run_io(func, *args)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=max(1, self.workers))
+            return self._pool
+
+    @staticmethod
+    def slide_keys(prs, variant: str) -> List[str]:
+        """
+        Return a render cache key for every slide of a presentation. Blocking.
+
+        Args:
+            prs: The presentation
+            variant: Render settings that change the output, such as the thumbnail width
+        """
+        part_hashes: Dict[Any, bytes] = {}
+
+        def part_hash(part) -> bytes:
+            cached = part_hashes.get(part)
+            if cached is not None:
+                return cached
+            if isinstance(part, XmlPart):
+                blob = serialize_part_xml(part._element)
+            else:
+                blob = part.blob
+            digest = hashlib.blake2b(blob, digest_size=16).digest()
+            part_hashes[part] = digest
+            return digest
+
+        def visit(part, digest, seen):
+            # Hash the parts a slide is drawn from, following layout -> master -> theme
+            for rel in sorted(part.rels.values(), key=lambda rel: rel.rId):
+                if rel.is_external:
+                    digest.update(rel.target_ref.encode("utf-8"))
+                    continue
+                if rel.reltype in _IGNORED_RELATIONSHIPS or rel.target_part in seen:
+                    continue
+                if rel.reltype == RT.SLIDE_LAYOUT and part.content_type == CT.PML_SLIDE_MASTER:
+                    # A master relates to all of its layouts, only the slide's own one matters
+                    continue
+                target = rel.target_part
+                seen.add(target)
+                digest.update(rel.rId.encode("utf-8"))
+                digest.update(part_hash(target))
+                if rel.reltype in _FOLLOWED_RELATIONSHIPS:
+                    visit(target, digest, seen)
+
+        header = f"{RENDER_VERSION}:{variant}:{prs.slide_width}x{prs.slide_height}".encode("utf-8")
+        keys = []
+        for slide in prs.slides:
+            digest = hashlib.sha256(header)
+            digest.update(part_hash(slide.part))
+            visit(slide.part, digest, {slide.part})
+            keys.append(digest.hexdigest())
+        return keys
+
+    def needs_render(self, keys: Sequence[str]) -> bool:
+        """
+        Return True when some of the keys are not cached, so the deck has to be saved for
+        the renderer.
+
+        Args:
+            keys: Cache keys from slide_keys(), or the PDF key from pdf_key()
+        """
+        return not all(self.cache.contains(key) for key in keys)
+
+    @staticmethod
+    def pdf_key(keys: Sequence[str]) -> str:
+        """Return the cache key of a deck's PDF from the keys of its slides."""
+        return hashlib.sha256(("pdf:" + ",".join(keys)).encode("utf-8")).hexdigest()
+
+    def _require_soffice(self) -> str:
+        if not self.soffice:
+            raise ValueError("Rendering needs LibreOffice: install it so soffice is on PATH, "
+                             "or start the server with --soffice-path")
+        return self.soffice
+
+    async def render_slides(self, deck_path: str, keys: Sequence[str], indexes: Sequence[int],
+                            width: int) -> List[bytes]:
+        """
+        Return PNG thumbnails of the given slides, rendering the ones not in the cache in
+        parallel.
+
+        Args:
+            deck_path: The presentation saved as a .pptx file
+            keys: Render cache key of every slide, from slide_keys()
+            indexes: Zero-based indexes of the slides to render
+            width: Width of the thumbnails in pixels
+        """
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        results = await self._run_io(self._cached_slides, keys, indexes)
+        missing = [index for index in indexes if index not in results]
+
+        if missing:
+            soffice = self._require_soffice()
+            pool = self._get_pool()
+            rendered = await asyncio.gather(
+                *(loop.run_in_executor(pool, render_slide, deck_path, index, soffice, width, self.timeout)
+                  for index in missing),
+                return_exceptions=True)
+            for index, result in zip(missing, rendered):
+                if isinstance(result, BaseException):
+                    with self._lock:
+                        self.failures += 1
+                    raise ValueError(f"Failed to render slide {index + 1}: {str(result)}")
+                results[index] = result
+            await self._run_io(self._cache_all,
+                               [(keys[index], results[index], "image/png") for index in missing])
+
+        with self._lock:
+            self.renders += 1
+            self.slides_rendered += len(missing)
+            self.slides_cached += len(indexes) - len(missing)
+            self.render_seconds += time.perf_counter() - started
+        logger.info(f"Rendered {len(missing)} slides, {len(indexes) - len(missing)} from cache")
+        return [results[index] for index in indexes]
+
+    async def render_pdf(self, deck_path: str, keys: Sequence[str]) -> bytes:
+        """
+        Return the presentation as a PDF, from the cache when no slide changed.
+
+        Args:
+            deck_path: The presentation saved as a .pptx file
+            keys: Render cache key of every slide, from slide_keys()
+        """
+        key = self.pdf_key(keys)
+        cached = await self._run_io(self.cache.get, key)
+        if cached is not None:
+            with self._lock:
+                self.renders += 1
+                self.slides_cached += len(keys)
+            return cached[0]
+
+        soffice = self._require_soffice()
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            pdf = await loop.run_in_executor(self._get_pool(), render_pdf, deck_path, soffice,
+                                             self.timeout * 4)
+        except Exception as e:
+            with self._lock:
+                self.failures += 1
+            raise ValueError(f"Failed to render presentation to PDF: {str(e)}")
+        await self._run_io(self._cache_all, [(key, pdf, "application/pdf")])
+        with self._lock:
+            self.renders += 1
+            self.slides_rendered += len(keys)
+            self.render_seconds += time.perf_counter() - started
+        return pdf
+
+    def _cached_slides(self, keys: Sequence[str], indexes: Sequence[int]) -> Dict[int, bytes]:
+        # Blocking, returns the cached render of every slide that has one
+        results = {}
+        for index in indexes:
+            cached = self.cache.get(keys[index])
+            if cached is not None:
+                results[index] = cached[0]
+        return results
+
+    def _cache_all(self, renders: Sequence[Tuple[str, bytes, str]]):
+        # Blocking, a render that can't be cached is only logged, it was still returned
+        for key, data, mime_type in renders:
+            try:
+                self.cache.put(key, data, mime_type)
+            except OSError as e:
+                logger.warning(f"Unable to cache render: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the renderer, its workers and how many slides were rendered or cached."""
+        with self._lock:
+            stats = {
+                "soffice": self.soffice,
+                "workers": self.workers,
+                "renders": self.renders,
+                "slides_rendered": self.slides_rendered,
+                "slides_cached": self.slides_cached,
+                "failures": self.failures,
+                "render_seconds": round(self.render_seconds, 3),
+            }
+        stats["cache"] = self.cache.stats()
+        return stats
+
+    def close(self):
+        """Stop the render worker processes."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
@@ -0,0 +1,130 @@
+import os
+import mmap
+import logging
+import tempfile
+from io import BytesIO
+from typing import Any, Dict, Literal, Optional
+
+from .package_writer import DEFAULT_COMPRESS_LEVEL, PptxPackageWriter
+
+logger = logging.getLogger('mcp_powerpoint_server')
+
+SaveModes = Literal["memory", "mmap", "disk"]
+SAVE_MODES = ("memory", "mmap", "disk")
+
+
+class SerializedDeck:
+    """
+    A serialized presentation. data is a read-only view of the .pptx bytes; path is set
+    when the deck was persisted to disk. Use as a context manager to release the buffer.
+    """
+
+    def __init__(self, data: memoryview, path: Optional[str] = None, closer=None):
+        self.data = data
+        self.size = len(data)
+        self.path = path
+        self._closer = closer
+
+    def close(self):
+        self.data.release()
+        if self._closer is not None:
+            try:
+                self._closer()
+            except BufferError:
+                # Another view of the buffer is still alive, it is freed with that view
+                logger.debug("Serialized deck buffer still referenced, leaving it to the GC")
+            self._closer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SaveManager:
+    """
+    Serializes presentations for upload without a write-then-reread round trip.
+
+    Modes:
+        memory: serialize into a BytesIO buffer
+        mmap: serialize into an anonymous temporary file and memory-map it, keeping large
+              decks out of the Python heap
+        disk: persist the deck at the requested path and memory-map the written file
+
+    Archives are written by PptxPackageWriter: XML is deflated at compress_level, already
+    compressed media is stored when store_media is set, and large parts are deflated on
+    compress_workers threads. With incremental saves, parts unchanged since a presentation's
+    previous save are copied into the archive as already compressed bytes.
+    """
+
+    def __init__(self, mode: SaveModes = "memory", spool_dir: Optional[str] = None,
+                 incremental: bool = True, compress_level: int = DEFAULT_COMPRESS_LEVEL,
+                 store_media: bool = True, compress_workers: Optional[int] = None):
+        if mode not in SAVE_MODES:
+            raise ValueError(f"Unknown save mode: {mode}. Use one of {', '.join(SAVE_MODES)}")
+        if not 0 <= compress_level <= 9:
+            raise ValueError(f"Compression level must be between 0 and 9, got {compress_level}")
+        self.mode = mode
+        self.spool_dir = spool_dir
+        self.writer = PptxPackageWriter(compress_level=compress_level, store_media=store_media,
+                                        workers=compress_workers, incremental=incremental)
+
+    def _write(self, prs, file):
+        self.writer.write(prs, file)
+
+    def serialize(self, prs, file_path: str) -> SerializedDeck:
+        """
+        Serialize the presentation according to the configured mode. Blocking.
+
+        Args:
+            prs: The presentation to serialize
+            file_path: Where to persist the deck in disk mode. Ignored by the other modes
+        """
+        try:
+            if self.mode == "memory":
+                buffer = BytesIO()
+                self._write(prs, buffer)
+                return SerializedDeck(buffer.getbuffer(), closer=buffer.close)
+
+            if self.mode == "mmap":
+                file = tempfile.TemporaryFile(dir=self.spool_dir)
+            else:
+                os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+                file = open(file_path, "w+b")
+            try:
+                self._write(prs, file)
+                file.flush()
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except BaseException:
+                file.close()
+                raise
+
+            def close():
+                mapped.close()
+                file.close()
+
+            path = file_path if self.mode == "disk" else None
+            return SerializedDeck(memoryview(mapped), path=path, closer=close)
+        except Exception as e:
+            raise ValueError(f"Unable to save {os.path.basename(file_path)}. Error: {e}")
+
+    def forget(self, prs) -> bool:
+        """Drop what was kept for the presentation's next incremental save, returning whether there was any."""
+        return self.writer.forget(prs)
+
+    def cached_bytes(self, prs) -> int:
+        """Return the bytes kept for the presentation's next incremental save."""
+        return self.writer.cached_bytes(prs)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the save mode, compression settings and part counters."""
+        return {
+            "mode": self.mode,
+            "incremental": self.writer.incremental,
+            **self.writer.stats(),
+        }
+
+    def close(self):
+        """Release the compression threads."""
+        self.writer.close()
@@ -0,0 +1,354 @@
+import math
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+# A compiled check returns None when the value is valid, otherwise a list of errors. Each error
+# is (path, message) with the path's segments innermost first, as parents prepend their key
+# on the way out. Valid values never build a path.
+Errors = List[Tuple[List[Any], str]]
+Check = Callable[[Any], Optional[Errors]]
+
+# Problems reported per call, an array of 100k bad values doesn't need 100k messages
+MAX_ERRORS = 20
+
+# The Python types json.loads produces for each JSON schema type. bool is excluded from the
+# numeric types on purpose: json.loads never turns true into a number
+_PYTHON_TYPES = {
+    "string": (str,),
+    "number": (int, float),
+    "integer": (int,),
+    "boolean": (bool,),
+    "array": (list, tuple),
+    "object": (dict,),
+    "null": (type(None),),
+}
+
+# Keywords that only document a schema
+_ANNOTATIONS = frozenset(("description", "title", "default", "examples"))
+
+
+class SchemaError(ValueError):
+    """Arguments that don't match a tool's input schema. errors holds (path, message) pairs."""
+
+    def __init__(self, errors: List[Tuple[str, str]]):
+        self.errors = errors
+        super().__init__("Invalid arguments:\n" + "\n".join(
+            f"{path}: {message}" if path else message for path, message in errors))
+
+
+def _json_type(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, (list, tuple)):
+        return "array"
+    if isinstance(value, dict):
+        return "object"
+    return type(value).__name__
+
+
+def _format_path(segments: Sequence[Any]) -> str:
+    path = ""
+    for segment in reversed(segments):
+        if isinstance(segment, int):
+            path += f"[{segment}]"
+        else:
+            path += f".{segment}" if path else segment
+    return path
+
+
+def _prefixed(errors: Errors, segment: Any) -> Errors:
+    for path, _ in errors:
+        path.append(segment)
+    return errors
+
+
+def _schema_types(schema: Dict[str, Any]) -> Optional[FrozenSet[type]]:
+    if not isinstance(schema, dict) or "type" not in schema:
+        return None
+    names = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+    return frozenset(python_type for name in names for python_type in _PYTHON_TYPES[name])
+
+
+def _bulk_types(schema: Dict[str, Any]) -> Optional[FrozenSet[type]]:
+    """
+    Return Python types whose values a schema accepts whatever they are, so arrays of such
+    values can be checked by their types alone. None when no type is always accepted.
+    Integral floats are integers too but take the slow path, like any other type not listed.
+    """
+    if not isinstance(schema, dict):
+        return None
+    keywords = [key for key in schema if key not in _ANNOTATIONS]
+    if keywords == ["type"]:
+        return _schema_types(schema)
+    if keywords not in (["oneOf"], ["anyOf"]):
+        return None
+
+    # Alternatives constraining only the type; for oneOf, less the types that another
+    # alternative might accept as well
+    accepted: FrozenSet[type] = frozenset()
+    contested: FrozenSet[type] = frozenset()
+    for alternative in schema[keywords[0]]:
+        types = _schema_types(alternative)
+        if [key for key in alternative if key not in _ANNOTATIONS] == ["type"]:
+            contested |= accepted & types
+            accepted |= types
+        elif types is not None:
+            contested |= types
+        elif keywords == ["oneOf"]:
+            # An untyped alternative may accept a value of any type
+            return None
+    if keywords == ["anyOf"]:
+        return accepted or None
+    return (accepted - contested) or None
+
+
+def _type_check(names: Sequence[str]) -> Check:
+    accepted = tuple(python_type for name in names for python_type in _PYTHON_TYPES[name])
+    accepts_bool = "boolean" in names
+    integral_floats = "integer" in names and "number" not in names
+    expected = " or ".join(names)
+
+    def check(value):
+        if isinstance(value, accepted) and (accepts_bool or not isinstance(value, bool)):
+            return None
+        if integral_floats and isinstance(value, float) and value.is_integer():
+            return None
+        return [([], f"expected {expected}, got {_json_type(value)}")]
+
+    return check
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def compile_schema(schema: Dict[str, Any]) -> Check:
+    """
+    Compile a JSON schema into a check function. Supports the keywords tool schemas use:
+    type, enum, const, minimum, maximum, minLength, maxLength, minItems, maxItems, items,
+    properties, required, additionalProperties, oneOf and anyOf. Others are ignored.
+
+    Args:
+        schema: The JSON schema
+    """
+    if not isinstance(schema, dict):
+        return lambda value: None
+
+    checks: List[Check] = []
+    refinements: List[Check] = []
+
+    if "type" in schema:
+        names = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+        checks.append(_type_check(names))
+
+    if "enum" in schema:
+        allowed = list(schema["enum"])
+        listed = ", ".join(str(option) for option in allowed)
+
+        def check_enum(value):
+            # True == 1 in Python but not in JSON
+            for option in allowed:
+                if value == option and isinstance(value, bool) == isinstance(option, bool):
+                    return None
+            return [([], f"must be one of {listed}")]
+        checks.append(check_enum)
+
+    if "const" in schema:
+        constant = schema["const"]
+
+        def check_const(value):
+            return None if value == constant else [([], f"must be {constant!r}")]
+        checks.append(check_const)
+
+    minimum, maximum = schema.get("minimum"), schema.get("maximum")
+    if minimum is not None or maximum is not None:
+        def check_range(value):
+            if not _is_number(value):
+                return None
+            if math.isnan(value):
+                return [([], "must be a number, got NaN")]
+            if minimum is not None and value < minimum:
+                return [([], f"must be at least {minimum}")]
+            if maximum is not None and value > maximum:
+                return [([], f"must be at most {maximum}")]
+            return None
+        refinements.append(check_range)
+
+    min_length, max_length = schema.get("minLength"), schema.get("maxLength")
+    if min_length is not None or max_length is not None:
+        def check_length(value):
+            if not isinstance(value, str):
+                return None
+            if min_length is not None and len(value) < min_length:
+                return [([], f"must be at least {min_length} characters long")]
+            if max_length is not None and len(value) > max_length:
+                return [([], f"must be at most {max_length} characters long")]
+            return None
+        refinements.append(check_length)
+
+    if any(key in schema for key in ("items", "minItems", "maxItems")):
+        refinements.append(_compile_array(schema))
+
+    if any(key in schema for key in ("properties", "required", "additionalProperties")):
+        refinements.append(_compile_object(schema))
+
+    for keyword in ("oneOf", "anyOf"):
+        if keyword in schema:
+            checks.append(_compile_alternatives(schema[keyword], exactly_one=keyword == "oneOf"))
+
+    checks.extend(refinements)
+    if not checks:
+        return lambda value: None
+    if len(checks) == 1:
+        return checks[0]
+
+    def check_all(value):
+        # The type is checked first, the other keywords only make sense for the right type
+        for check in checks:
+            errors = check(value)
+            if errors:
+                return errors
+        return None
+
+    return check_all
+
+
+def _compile_array(schema: Dict[str, Any]) -> Check:
+    min_items, max_items = schema.get("minItems"), schema.get("maxItems")
+    items_schema = schema.get("items")
+    item_check = compile_schema(items_schema) if items_schema is not None else None
+    # Arrays of plain values (numbers, strings, ...) are checked in bulk: the set of their
+    # types is built in C, items are only checked one by one when it holds an unexpected type
+    bulk_types = _bulk_types(items_schema) if items_schema is not None else None
+
+    def check(value):
+        if not isinstance(value, (list, tuple)):
+            return None
+        if min_items is not None and len(value) < min_items:
+            return [([], f"must have at least {min_items} items")]
+        if max_items is not None and len(value) > max_items:
+            return [([], f"must have at most {max_items} items")]
+        if item_check is None:
+            return None
+        if bulk_types is not None and set(map(type, value)) <= bulk_types:
+            return None
+        errors: Errors = []
+        for index, item in enumerate(value):
+            item_errors = item_check(item)
+            if item_errors:
+                errors.extend(_prefixed(item_errors, index))
+                if len(errors) >= MAX_ERRORS:
+                    break
+        return errors or None
+
+    return check
+
+
+def _compile_object(schema: Dict[str, Any]) -> Check:
+    properties = {key: compile_schema(sub_schema) for key, sub_schema in schema.get("properties", {}).items()}
+    required = tuple(schema.get("required", ()))
+    additional = schema.get("additionalProperties", True)
+    additional_check = compile_schema(additional) if isinstance(additional, dict) else None
+    closed = additional is False
+
+    def check(value):
+        if not isinstance(value, dict):
+            return None
+        errors: Errors = []
+        for key in required:
+            if key not in value:
+                errors.append(([key], "is required"))
+        for key, item in value.items():
+            property_check = properties.get(key)
+            if property_check is None:
+                if closed:
+                    errors.append(([key], "is not an allowed property"))
+                    continue
+                property_check = additional_check
+                if property_check is None:
+                    continue
+            item_errors = property_check(item)
+            if item_errors:
+                errors.extend(_prefixed(item_errors, key))
+            if len(errors) >= MAX_ERRORS:
+                break
+        return errors or None
+
+    return check
+
+
+def _compile_alternatives(schemas: List[Dict[str, Any]], exactly_one: bool) -> Check:
+    checks = [compile_schema(sub_schema) for sub_schema in schemas]
+    described = " or ".join(_describe(sub_schema) for sub_schema in schemas)
+
+    # When every alternative declares its type, a value is only tried against the
+    # alternatives of its own type
+    candidates: Optional[Dict[type, List[Check]]] = None
+    types = [_schema_types(sub_schema) for sub_schema in schemas]
+    if all(types):
+        candidates = {}
+        for alternative, accepted in zip(checks, types):
+            for python_type in accepted:
+                candidates.setdefault(python_type, []).append(alternative)
+        # An integral float may still match an integer alternative
+        if int in candidates:
+            floats = candidates.setdefault(float, [])
+            floats.extend(alternative for alternative in candidates[int] if alternative not in floats)
+
+    def check(value):
+        matches = 0
+        for alternative in (checks if candidates is None else candidates.get(type(value), ())):
+            if alternative(value) is None:
+                matches += 1
+                if not exactly_one or matches > 1:
+                    break
+        if matches == 1 or (matches and not exactly_one):
+            return None
+        if matches > 1:
+            return [([], f"matches more than one of {described}")]
+        return [([], f"expected {described}, got {_json_type(value)}")]
+
+    return check
+
+
+def _describe(schema: Dict[str, Any]) -> str:
+    names = schema.get("type", "value") if isinstance(schema, dict) else "value"
+    names = " or ".join(names) if isinstance(names, list) else names
+    if names == "array" and isinstance(schema.get("items"), dict):
+        item = _describe(schema["items"])
+        if "minItems" in schema and schema.get("minItems") == schema.get("maxItems"):
+            return f"{schema['minItems']} {item}s"
+        if "minItems" in schema or "maxItems" in schema:
+            return f"{schema.get('minItems', 0)}-{schema.get('maxItems', 'n')} {item}s"
+        return f"array of {item}s"
+    return names
+
+
+def compile_validator(input_schema: Dict[str, Any]) -> Callable[[Dict[str, Any]], None]:
+    """
+    Compile a tool's input schema into a validator that raises SchemaError with the path of
+    every problem, e.g. "data.series[0].values[3]: expected number, got string". Required
+    string, array and object arguments must also not be empty.
+
+    Args:
+        input_schema: The tool's JSON schema
+    """
+    check = compile_schema(input_schema)
+    required = tuple(input_schema.get("required", ()))
+
+    def validate(arguments: Dict[str, Any]):
+        errors = check(arguments)
+        if errors is None:
+            empty = [key for key in required
+                     if isinstance(arguments.get(key), (str, list, dict)) and not arguments[key]]
+            if not empty:
+                return
+            errors = [([key], "must not be empty") for key in empty]
+        raise SchemaError([(_format_path(path), message) for path, message in errors[:MAX_ERRORS]])
+
+    return validate
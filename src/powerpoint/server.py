@@ -1,15 +1,32 @@
 import os
-import requests
+import json
+import base64
+import tempfile
 from mcp.server import Server, NotificationOptions
 from mcp.server.models import InitializationOptions
 import mcp.server.stdio
 import mcp.types as types
 import asyncio
-from pptx import Presentation
 import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from .presentation_manager import PresentationManager
 from .chart_manager import ChartManager
-from .vision_manager import VisionManager
+from .vision_manager import VisionManager, GeminiImageGenerator, FakeImageGenerator
+from .executor_manager import ExecutorManager
+from .deck_builder import DeckBuilder
+from .template_manager import TemplateManager
+from .session_store import PresentationStore
+from .upload_manager import UploadManager
+from .save_manager import SaveManager
+from .table_writer import table_data_from_json
+from .image_processor import ImageProcessor
+from .chart_data import load_chart_source
+from .render_manager import RenderManager
+from .media_store import MediaStore
+from .metrics import Metrics, stage
+from .admission import CallAdmission
+from .tool_registry import ToolRegistry, ToolResult
 
 logger = logging.getLogger('mcp_powerpoint_server')
 logger.info("Starting MCP Powerpoint Server")
@@ -34,800 +51,1426 @@ def sanitize_path(base_path: str, file_name: str) -> str:
     return normalized_path
 
 
-async def main(folder_path, owui_url, owui_token):
-    logger.info(f"Starting Powerpoint MCP Server")
-    presentation_manager = PresentationManager()
-    chart_manager = ChartManager()
-    vision_manager = VisionManager()
+def save_and_upload(prs, file_path: str, save_manager: SaveManager,
+                    upload_manager: UploadManager) -> str:
+    """
+    Serialize the presentation and upload it to Open-WebUI, returning the file URL.
+    Blocking, run it through the ExecutorManager.
+    """
+    with stage("save"):
+        deck = save_manager.serialize(prs, file_path)
+    with deck, stage("upload"):
+        return upload_manager.upload(os.path.basename(file_path), deck.data)
+
+
+def load_presentation(template_manager: TemplateManager, file_path: str):
+    """Load the presentation at file_path. Blocking."""
+    try:
+        return template_manager.load(file_path)
+    except Exception as e:
+        raise ValueError(f"Unable to load {file_path}. Error: {str(e)}")
+
+
+def create_server(folder_path, owui_url, owui_token, io_workers=8, cpu_workers=0, max_pending=64,
+               template_dir=None, max_presentations=32, memory_budget_mb=512, idle_ttl=1800,
+               spill_dir=None, upload_timeout=60, upload_retries=3, upload_concurrency=4,
+               save_mode="memory", image_generator="gemini", image_cache_dir=None,
+               image_cache_mb=256, image_concurrency=4, image_dpi=150, image_quality=85,
+               media_cache_mb=256, incremental_save=True, compress_level=6, store_media=True,
+               compress_workers=None, chart_max_points=0, static_charts=False, soffice_path=None,
+               render_workers=None, render_cache_dir=None, render_cache_mb=256, metrics_port=0,
+               metrics_host="127.0.0.1", trace_file=None, max_concurrent_calls=0,
+               max_queued_calls=64,
+               stats_sources: Optional[Dict[str, Callable[[], Dict[str, Any]]]] = None
+               ) -> Tuple[Server, Callable[[], None]]:
+    """
+    Build the MCP server and the managers behind its tools without starting a transport.
+    Returns (server, shutdown), where shutdown stops the worker pools and closes connections.
+    Benchmarks drive the returned server's request handlers in-process.
+
+    Args:
+        folder_path: Folder presentations, images and data files are read from and saved to
+        owui_url: Base URL of the Open-WebUI server decks are uploaded to
+        owui_token: API token for Open-WebUI
+        stats_sources: Further sections of get-server-stats by name, e.g. the transport's.
+            Read on every call, so sources can be added once the server is built
+        The remaining arguments are the command line options of the same name
+    """
+    stats_sources = stats_sources if stats_sources is not None else {}
+    executor_manager = ExecutorManager(io_workers=io_workers,
+                                       cpu_workers=cpu_workers,
+                                       max_pending=max_pending)
+    template_manager = TemplateManager(template_dir)
+    save_manager = SaveManager(save_mode, incremental=incremental_save,
+                               compress_level=compress_level, store_media=store_media,
+                               compress_workers=compress_workers)
+    upload_manager = UploadManager(owui_url, owui_token,
+                                   read_timeout=upload_timeout,
+                                   retries=upload_retries,
+                                   max_concurrent=upload_concurrency)
+
+    def release_spilled(name: str, prs):
+        # The checkpoint holds the slides only, tell the client what the deck lost
+        lost = []
+        operations = presentation_manager.release_history(name)
+        if operations:
+            lost.append(f"its undo history ({operations} operation(s))")
+        if save_manager.forget(prs):
+            lost.append("its incremental save cache, the next save writes every part")
+        if lost:
+            presentation_manager.notify(
+                name, f"Presentation '{name}' was moved out of memory and lost {' and '.join(lost)}")
+
+    presentation_store = PresentationStore(
+        spill_dir=spill_dir,
+        max_presentations=max_presentations,
+        memory_budget=memory_budget_mb * 1024 * 1024,
+        idle_ttl=idle_ttl,
+        is_pinned=lambda name: presentation_manager.is_locked(name),
+        on_spill=release_spilled,
+        cached_bytes=save_manager.cached_bytes)
+    media_store = MediaStore(max_bytes=media_cache_mb * 1024 * 1024)
+
+    # Decks otherwise only expire when some deck is accessed, which never happens on an idle server
+    stop_sweeping = threading.Event()
+
+    def sweep_idle_presentations():
+        while not stop_sweeping.wait(presentation_store.sweep_interval):
+            try:
+                presentation_store.sweep()
+            except Exception as e:
+                logger.warning(f"Unable to spill idle presentations: {e}")
+
+    if presentation_store.sweep_interval:
+        threading.Thread(target=sweep_idle_presentations, name="pptx-session-sweep", daemon=True).start()
+    presentation_manager = PresentationManager(presentation_store, media_store)
+    chart_manager = ChartManager(max_points=chart_max_points, static=static_charts)
+    vision_manager = VisionManager(
+        executor_manager,
+        generator=FakeImageGenerator() if image_generator == "fake" else GeminiImageGenerator(),
+        cache_dir=image_cache_dir or os.path.join(tempfile.gettempdir(), "powerpoint-image-cache"),
+        cache_max_bytes=image_cache_mb * 1024 * 1024,
+        max_concurrent=image_concurrency)
+    image_processor = ImageProcessor(executor_manager, dpi=image_dpi, jpeg_quality=image_quality)
+    deck_builder = DeckBuilder(presentation_manager, chart_manager)
+    render_manager = RenderManager(
+        cache_dir=render_cache_dir or os.path.join(tempfile.gettempdir(), "powerpoint-render-cache"),
+        executor_manager=executor_manager,
+        soffice=soffice_path,
+        workers=render_workers,
+        cache_max_bytes=render_cache_mb * 1024 * 1024)
+    metrics = Metrics(trace_file=trace_file)
+    if metrics_port:
+        metrics.serve(metrics_host, metrics_port)
+    admission = CallAdmission(max_concurrent=max_concurrent_calls, max_queued=max_queued_calls)
     server = Server("powerpoint-server")
+    tools = ToolRegistry()
     logger.debug("Registering Handlers")
     path = folder_path
 
-    @server.list_tools()
-    async def handle_list_tools() -> list[types.Tool]:
-        """List available PowerPoint tools."""
+    @tools.tool(
+        name="create-presentation",
+        description=
+        "This tool starts the process of generating a new powerpoint presentation with the name given "
+        "by the user. Use this tool when the user requests to create or generate a new presentation.",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "name": {
+                    "type":
+                    "string",
+                    "description":
+                    "Name of the presentation (without .pptx extension)",
+                },
+                "template": {
+                    "type":
+                    "string",
+                    "description":
+                    "Name of a template in the server's template directory to base the "
+                    "presentation on (optional, defaults to the built-in template)",
+                },
+            },
+            "required": ["name"],
+        },
+    )
+    async def create_presentation(arguments: Dict[str, Any]) -> ToolResult:
+        presentation_name = arguments.get("name")
+        template = arguments.get("template")
+        # Create new presentation from a cached copy of the template
+        async with presentation_manager.lock(presentation_name):
+            with stage("build"):
+                prs = await executor_manager.run_io(
+                    template_manager.new_presentation, template)
+            try:
+                await executor_manager.run_io(
+                    presentation_manager.set_presentation, presentation_name, prs)
+            except KeyError as e:
+                raise ValueError(
+                    f"Unable to add {presentation_name} to presentation. Error: {str(e)}"
+                )
+
         return [
-            types.Tool(
-                name="create-presentation",
-                description=
-                "This tool starts the process of generating a new powerpoint presentation with the name given "
-                "by the user. Use this tool when the user requests to create or generate a new presentation.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "name": {
-                            "type":
-                            "string",
-                            "description":
-                            "Name of the presentation (without .pptx extension)",
-                        },
-                    },
-                    "required": ["name"],
-                },
-            ),
-            types.Tool(
-                name="generate-and-save-image",
-                description=
-                "Generates an image using a Gemini model and save the image to the specified path. The tool "
-                "will return a PNG file path. It should be used when the user asks to generate or create an "
-                "image or a picture.",
-                inputSchema={
+            types.TextContent(
+                type="text",
+                text=f"Created new presentation: {presentation_name}")
+        ]
+
+    @tools.tool(
+        name="generate-and-save-image",
+        description=
+        "Generates an image using a Gemini model and save the image to the specified path. The tool "
+        "will return a PNG file path. It should be used when the user asks to generate or create an "
+        "image or a picture.",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "prompt": {
+                    "type":
+                    "string",
+                    "description":
+                    "Description of the image to generate in the form of a prompt.",
+                },
+                "file_name": {
+                    "type":
+                    "string",
+                    "description":
+                    "Filename of the image. Include the extension of .png",
+                },
+            },
+            "required": ["prompt", "file_name"],
+        },
+    )
+    async def generate_and_save_image(arguments: Dict[str, Any]) -> ToolResult:
+        prompt = arguments.get("prompt")
+        file_name = arguments.get("file_name")
+        try:
+            safe_file_path = sanitize_path(folder_path, file_name)
+        except ValueError as e:
+            raise ValueError(f"Invalid file path: {str(e)}")
+
+        try:
+            with stage("generate"):
+                saved_path = await vision_manager.generate_and_save_image(
+                    prompt, str(safe_file_path))
+            return [
+                types.TextContent(
+                    type="text",
+                    text=
+                    f"Successfully generated and saved image to: {saved_path}"
+                )
+            ]
+        except Exception as e:
+            return [
+                types.TextContent(
+                    type="text",
+                    text=f"Failed to generate image: {str(e)}")
+            ]
+
+    @tools.tool(
+        name="add-slide-title-only",
+        description=
+        "This tool adds a new title slide to the presentation you are working on. The tool doesn't "
+        "return anything. It requires the presentation_name to work on.",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "presentation_name": {
+                    "type":
+                    "string",
+                    "description":
+                    "Name of the presentation to add the slide to",
+                },
+                "title": {
+                    "type": "string",
+                    "description": "Title of the slide",
+                }
+            },
+            "required": ["presentation_name", "title"],
+        },
+    )
+    async def add_slide_title_only(arguments: Dict[str, Any]) -> ToolResult:
+        presentation_name = arguments.get("presentation_name")
+        title = arguments.get("title")
+
+        if presentation_name not in presentation_manager.presentations:
+            raise ValueError(
+                f"Presentation not found: {presentation_name}")
+
+        try:
+            async with presentation_manager.lock(presentation_name):
+                with stage("build"):
+                    slide = await executor_manager.run_io(
+                        presentation_manager.add_title_slide,
+                        presentation_name, title)
+        except Exception as e:
+            raise ValueError(
+                f"Unable to add '{title} to presentation: {presentation_name}. Error: {e}"
+            )
+
+        return [
+            types.TextContent(
+                type="text",
+                text=
+                f"Added slide '{title}' to presentation: {presentation_name}"
+            )
+        ]
+
+    @tools.tool(
+        name="add-slide-section-header",
+        description=
+        "This tool adds a section header (a.k.a segue) slide to the presentation you are working on. The tool doesn't "
+        "return anything. It requires the presentation_name to work on.",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "presentation_name": {
+                    "type":
+                    "string",
+                    "description":
+                    "Name of the presentation to add the slide to",
+                },
+                "header": {
+                    "type": "string",
+                    "description": "Section header title",
+                },
+                "subtitle": {
+                    "type": "string",
+                    "description": "Section header subtitle",
+                }
+            },
+            "required": ["presentation_name", "header"],
+        },
+    )
+    async def add_slide_section_header(arguments: Dict[str, Any]) -> ToolResult:
+        presentation_name = arguments.get("presentation_name")
+        header = arguments.get("header")
+        subtitle = arguments.get("subtitle")
+
+        if presentation_name not in presentation_manager.presentations:
+            raise ValueError(
+                f"Presentation not found: {presentation_name}")
+
+        try:
+            async with presentation_manager.lock(presentation_name):
+                with stage("build"):
+                    slide = await executor_manager.run_io(
+                        presentation_manager.add_section_header_slide,
+                        presentation_name, header, subtitle)
+        except Exception as e:
+            raise ValueError(
+                f"Unable to add slide '{header}' to presentation: {presentation_name}"
+            )
+
+        return [
+            types.TextContent(
+                type="text",
+                text=
+                f"Added slide '{header}' to presentation: {presentation_name}"
+            )
+        ]
+
+    @tools.tool(
+        name="add-slide-title-content",
+        description=
+        "Add a new slide with a title and content to an existing presentation",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "presentation_name": {
+                    "type":
+                    "string",
+                    "description":
+                    "Name of the presentation to add the slide to",
+                },
+                "title": {
+                    "type": "string",
+                    "description": "Title of the slide",
+                },
+                "content": {
+                    "type":
+                    "string",
+                    "description":
+                    "Content/body text of the slide. "
+                    "Separate main points with a single carriage return character."
+                    "Make sub-points with tab character."
+                    "Do not use bullet points, asterisks or dashes for points."
+                    "Max main points is 4"
+                },
+            },
+            "required": ["presentation_name", "title", "content"],
+        },
+    )
+    async def add_slide_title_content(arguments: Dict[str, Any]) -> ToolResult:
+        presentation_name = arguments.get("presentation_name")
+        title = arguments.get("title")
+        content = arguments.get("content")
+
+        if presentation_name not in presentation_manager.presentations:
+            raise ValueError(
+                f"Presentation not found: {presentation_name}")
+
+        try:
+            async with presentation_manager.lock(presentation_name):
+                with stage("build"):
+                    slides = await executor_manager.run_io(
+                        presentation_manager.add_title_with_content_slide,
+                        presentation_name, title, content)
+        except Exception as e:
+            raise ValueError(
+                f"Unable to add slide '{title}' to presentation: {presentation_name}"
+            )
+
+        continued = f" (continued across {len(slides)} slides)" if len(slides) > 1 else ""
+        return [
+            types.TextContent(
+                type="text",
+                text=
+                f"Added slide '{title}' to presentation: {presentation_name}{continued}"
+            )
+        ]
+
+    @tools.tool(
+        name="add-slide-comparison",
+        description=
+        "Add a new a comparison slide with title and comparison content. Use when you wish to "
+        "compare two concepts",
+        input_schema={
+            "type":
+            "object",
+            "properties": {
+                "presentation_name": {
+                    "type":
+                    "string",
+                    "description":
+                    "Name of the presentation to add the slide to",
+                },
+                "title": {
+                    "type": "string",
+                    "description": "Title of the slide",
+                },
+                "left_side_title": {
+                    "type": "string",
+                    "description": "Title of the left concept",
+                },
+                "left_side_content": {
+                    "type":
+                    "string",
+                    "description":
+                    "Content/body text of left concept. "
+                    "Separate main points with a single carriage return character."
+                    "Make sub-points with tab character."
+                    "Do not use bullet points, asterisks or dashes for points."
+                    "Max main points is 4"
+                },
+                "right_side_title": {
+                    "type": "string",
+                    "description": "Title of the right concept",
+                },
+                "right_side_content": {
+                    "type":
+                    "string",
+                    "description":
+                    "Content/body text of right concept. "
+                    "Separate main points with a single carriage return character."
+                    "Make sub-points with tab character."
+                    "Do not use bullet points, asterisks or dashes for points."
+                    "Max main points is 4"
+                },
+            },
+            "required": [
+                "presentation_name", "title", "left_side_title",
+                "left_side_content", "right_side_title",
+                "right_side_content"
+            ],
+        },
+    )
+    async def add_slide_comparison(arguments: Dict[str, Any]) -> ToolResult:
+        # Get arguments
+        presentation_name = arguments["presentation_name"]
+        title = arguments["title"]
+        left_side_title = arguments["left_side_title"]
+        left_side_content = arguments["left_side_content"]
+        right_side_title = arguments["right_side_title"]
+        right_side_content = arguments["right_side_content"]
+
+        if presentation_name not in presentation_manager.presentations:
+            raise ValueError(
+                f"Presentation not found: {presentation_name}")
+        try:
+            async with presentation_manager.lock(presentation_name):
+                with stage("build"):
+                    slide = await executor_manager.run_io(
+                        presentation_manager.add_comparison_slide,
+                        presentation_name, title, left_side_title,
+                        left_side_content, right_side_title, right_side_content)
+        except Exception as e:
+            raise ValueError(
+                f"Unable to add comparison slide to {presentation_name}.pptx"
+            )
+
+        return [
+            types.TextContent(
+                type="text",
+                text=
+                f"Successfully added comparison slide {title} to {presentation_name}.pptx"
+            )
+        ]
+
+    @tools.tool(
+        name="add-slide-title-with-table",
+        description=
+        "Add a new slide with a title and table containing the provided data",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "presentation_name": {
+                    "type":
+                    "string",
+                    "description":
+                    "Name of the presentation to add the slide to",
+                },
+                "title": {
+                    "type": "string",
+                    "description": "Title of the slide",
+                },
+                "data": {
                     "type": "object",
+                    "description":
+                    "Table data object with headers and rows",
                     "properties": {
-                        "prompt": {
-                            "type":
-                            "string",
-                            "description":
-                            "Description of the image to generate in the form of a prompt.",
+                        "headers": {
+                            "type": "array",
+                            "items": {
+                                "type": "string"
+                            },
+                            "description": "Array of column headers"
                         },
-                        "file_name": {
-                            "type":
-                            "string",
-                            "description":
-                            "Filename of the image. Include the extension of .png",
+                        "rows": {
+                            "type": "array",
+                            "items": {
+                                "type": "array",
+                                "items": {
+                                    "type": ["string", "number", "null"]
+                                },
+                            },
+                            "description": "Array of row data arrays"
                         },
-                    },
-                    "required": ["prompt", "file_name"],
-                },
-            ),
-            types.Tool(
-                name="add-slide-title-only",
-                description=
-                "This tool adds a new title slide to the presentation you are working on. The tool doesn't "
-                "return anything. It requires the presentation_name to work on.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "presentation_name": {
-                            "type":
-                            "string",
+                        "columns": {
+                            "type": "object",
+                            "additionalProperties": {
+                                "type": "array",
+                                "items": {
+                                    "type": ["string", "number", "null"]
+                                },
+                            },
                             "description":
-                            "Name of the presentation to add the slide to",
+                            "Column-oriented alternative to rows: an object mapping each header to "
+                            "its array of values. Headers default to the object's keys"
                         },
-                        "title": {
+                        "number_format": {
                             "type": "string",
-                            "description": "Title of the slide",
-                        }
-                    },
-                    "required": ["presentation_name", "title"],
-                },
-            ),
-            types.Tool(
-                name="add-slide-section-header",
-                description=
-                "This tool adds a section header (a.k.a segue) slide to the presentation you are working on. The tool doesn't "
-                "return anything. It requires the presentation_name to work on.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "presentation_name": {
-                            "type":
-                            "string",
                             "description":
-                            "Name of the presentation to add the slide to",
-                        },
-                        "header": {
-                            "type": "string",
-                            "description": "Section header title",
-                        },
-                        "subtitle": {
-                            "type": "string",
-                            "description": "Section header subtitle",
+                            "Python format spec applied to numeric cells, e.g. ',.2f' or '.1%' (optional)"
                         }
-                    },
-                    "required": ["presentation_name", "header"],
-                },
-            ),
-            types.Tool(
-                name="add-slide-title-content",
-                description=
-                "Add a new slide with a title and content to an existing presentation",
-                inputSchema={
+                    }
+                }
+            },
+            "required": ["presentation_name", "title", "data"],
+        },
+    )
+    async def add_slide_title_with_table(arguments: Dict[str, Any]) -> ToolResult:
+        presentation_name = arguments.get("presentation_name")
+        title = arguments.get("title")
+        table_data = arguments.get("data")
+
+        if presentation_name not in presentation_manager.presentations:
+            raise ValueError(
+                f"Presentation not found: {presentation_name}")
+
+        # Validate table data structure
+        with stage("validate"):
+            headers, rows = table_data_from_json(table_data)
+        try:
+            async with presentation_manager.lock(presentation_name):
+                with stage("build"):
+                    slides = await executor_manager.run_io(
+                        presentation_manager.add_table_slide,
+                        presentation_name, title, headers, rows,
+                        table_data.get("number_format"))
+        except Exception as e:
+            raise ValueError(
+                f"Unable to add slide '{title}' with a table to presentation: {presentation_name}"
+            )
+
+        continued = f" (continued across {len(slides)} slides)" if len(slides) > 1 else ""
+        return [
+            types.TextContent(
+                type="text",
+                text=
+                f"Added slide '{title}' with a table to presentation: {presentation_name}{continued}"
+            )
+        ]
+
+    @tools.tool(
+        name="add-slide-title-with-chart",
+        description=
+        "Add a new slide with a title and chart. The chart type will be automatically selected based on the data structure.",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "presentation_name": {
+                    "type":
+                    "string",
+                    "description":
+                    "Name of the presentation to add the slide to",
+                },
+                "title": {
+                    "type": "string",
+                    "description": "Title of the slide",
+                },
+                "data": {
                     "type": "object",
+                    "description": "Chart data structure",
                     "properties": {
-                        "presentation_name": {
-                            "type":
-                            "string",
-                            "description":
-                            "Name of the presentation to add the slide to",
-                        },
-                        "title": {
-                            "type": "string",
-                            "description": "Title of the slide",
-                        },
-                        "content": {
+                        "categories": {
                             "type":
-                            "string",
+                            "array",
+                            "items": {
+                                "type": ["string", "number"]
+                            },
                             "description":
-                            "Content/body text of the slide. "
-                            "Separate main points with a single carriage return character."
-                            "Make sub-points with tab character."
-                            "Do not use bullet points, asterisks or dashes for points."
-                            "Max main points is 4"
+                            "X-axis categories or labels (optional)"
                         },
-                    },
-                    "required": ["presentation_name", "title", "content"],
-                },
-            ),
-            types.Tool(
-                name="add-slide-comparison",
-                description=
-                "Add a new a comparison slide with title and comparison content. Use when you wish to "
-                "compare two concepts",
-                inputSchema={
-                    "type":
-                    "object",
-                    "properties": {
-                        "presentation_name": {
-                            "type":
-                            "string",
-                            "description":
-                            "Name of the presentation to add the slide to",
+                        "series": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "name": {
+                                        "type":
+                                        "string",
+                                        "description":
+                                        "Name of the data series"
+                                    },
+                                    "values": {
+                                        "type":
+                                        "array",
+                                        "items": {
+                                            "oneOf": [{
+                                                "type": ["number", "null"]
+                                            }, {
+                                                "type": "array",
+                                                "items": {
+                                                    "type": "number"
+                                                },
+                                                "minItems": 2,
+                                                "maxItems": 3
+                                            }]
+                                        },
+                                        "description":
+                                        "Values for the series. Can be simple numbers, [x,y] pairs for scatter plots "
+                                        "or [x,y,size] triples for bubble charts"
+                                    },
+                                    "x": {
+                                        "type": "array",
+                                        "items": {"type": ["number", "null"]},
+                                        "description": "X values of a scatter or bubble series, instead of values (optional)"
+                                    },
+                                    "y": {
+                                        "type": "array",
+                                        "items": {"type": ["number", "null"]},
+                                        "description": "Y values matching x (optional)"
+                                    },
+                                    "size": {
+                                        "type": "array",
+                                        "items": {"type": "number"},
+                                        "description": "Bubble sizes matching x, for a bubble chart (optional)"
+                                    }
+                                },
+                                "required": ["name"]
+                            }
                         },
-                        "title": {
+                        "x_axis": {
                             "type": "string",
-                            "description": "Title of the slide",
+                            "description": "X-axis title (optional)"
                         },
-                        "left_side_title": {
+                        "y_axis": {
                             "type": "string",
-                            "description": "Title of the left concept",
+                            "description": "Y-axis title (optional)"
                         },
-                        "left_side_content": {
-                            "type":
-                            "string",
+                        "static": {
+                            "type": "boolean",
                             "description":
-                            "Content/body text of left concept. "
-                            "Separate main points with a single carriage return character."
-                            "Make sub-points with tab character."
-                            "Do not use bullet points, asterisks or dashes for points."
-                            "Max main points is 4"
+                            "Leave out the embedded workbook: the chart is smaller and faster to add, "
+                            "but its data can't be edited in PowerPoint (optional)"
                         },
-                        "right_side_title": {
-                            "type": "string",
-                            "description": "Title of the right concept",
-                        },
-                        "right_side_content": {
-                            "type":
-                            "string",
+                        "histogram": {
+                            "type": "boolean",
                             "description":
-                            "Content/body text of right concept. "
-                            "Separate main points with a single carriage return character."
-                            "Make sub-points with tab character."
-                            "Do not use bullet points, asterisks or dashes for points."
-                            "Max main points is 4"
+                            "Draw the distribution of a single series: its values are binned into "
+                            "counts and categories are not needed (optional)"
                         },
-                    },
-                    "required": [
-                        "presentation_name", "title", "left_side_title",
-                        "left_side_content", "right_side_title",
-                        "right_side_content"
-                    ],
-                },
-            ),
-            types.Tool(
-                name="add-slide-title-with-table",
-                description=
-                "Add a new slide with a title and table containing the provided data",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "presentation_name": {
-                            "type":
-                            "string",
+                        "max_points": {
+                            "type": "integer",
                             "description":
-                            "Name of the presentation to add the slide to",
-                        },
-                        "title": {
-                            "type": "string",
-                            "description": "Title of the slide",
+                            "Most points to draw, larger series are downsampled keeping their shape, "
+                            "peaks and troughs (optional, 0 keeps every point)"
                         },
-                        "data": {
+                        "source": {
                             "type": "object",
                             "description":
-                            "Table data object with headers and rows",
+                            "Load the series from a file in the folder path or an inline array instead "
+                            "of passing them in \"series\". Use for large data sets (optional)",
                             "properties": {
-                                "headers": {
-                                    "type": "array",
-                                    "items": {
-                                        "type": "string"
-                                    },
-                                    "description": "Array of column headers"
+                                "path": {
+                                    "type": "string",
+                                    "description": "A .csv file with a header row, or a 1D/2D numeric .npy file"
                                 },
-                                "rows": {
+                                "buffer": {
+                                    "type": "string",
+                                    "description": "Base64 of packed little-endian numbers in row-major order"
+                                },
+                                "dtype": {
+                                    "type": "string",
+                                    "description": "Type of the buffer's numbers, e.g. float64 (default), float32, int32"
+                                },
+                                "shape": {
                                     "type": "array",
-                                    "items": {
-                                        "type": "array",
-                                        "items": {
-                                            "type": ["string", "number"]
-                                        },
-                                    },
-                                    "description": "Array of row data arrays"
-                                }
-                            },
-                            "required": ["headers", "rows"]
-                        }
-                    },
-                    "required": ["presentation_name", "title", "data"],
-                },
-            ),
-            types.Tool(
-                name="add-slide-title-with-chart",
-                description=
-                "Add a new slide with a title and chart. The chart type will be automatically selected based on the data structure.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "presentation_name": {
-                            "type":
-                            "string",
-                            "description":
-                            "Name of the presentation to add the slide to",
-                        },
-                        "title": {
-                            "type": "string",
-                            "description": "Title of the slide",
-                        },
-                        "data": {
-                            "type": "object",
-                            "description": "Chart data structure",
-                            "properties": {
-                                "categories": {
-                                    "type":
-                                    "array",
-                                    "items": {
-                                        "type": ["string", "number"]
-                                    },
-                                    "description":
-                                    "X-axis categories or labels (optional)"
+                                    "items": {"type": "integer"},
+                                    "description": "[rows] or [rows, columns] of the buffer"
                                 },
-                                "series": {
+                                "names": {
                                     "type": "array",
-                                    "items": {
-                                        "type": "object",
-                                        "properties": {
-                                            "name": {
-                                                "type":
-                                                "string",
-                                                "description":
-                                                "Name of the data series"
-                                            },
-                                            "values": {
-                                                "type":
-                                                "array",
-                                                "items": {
-                                                    "oneOf": [{
-                                                        "type": "number"
-                                                    }, {
-                                                        "type": "array",
-                                                        "items": {
-                                                            "type": "number"
-                                                        },
-                                                        "minItems": 2,
-                                                        "maxItems": 2
-                                                    }]
-                                                },
-                                                "description":
-                                                "Values for the series. Can be simple numbers or [x,y] pairs for scatter plots"
-                                            }
-                                        },
-                                        "required": ["name", "values"]
-                                    }
+                                    "items": {"type": "string"},
+                                    "description": "Column names for .npy files and buffers"
                                 },
-                                "x_axis": {
-                                    "type": "string",
-                                    "description": "X-axis title (optional)"
+                                "x": {
+                                    "type": ["string", "integer"],
+                                    "description": "Column with X values, for a scatter chart"
                                 },
-                                "y_axis": {
-                                    "type": "string",
-                                    "description": "Y-axis title (optional)"
+                                "categories": {
+                                    "type": ["string", "integer"],
+                                    "description": "Column with category labels"
+                                },
+                                "y": {
+                                    "type": "array",
+                                    "items": {"type": ["string", "integer"]},
+                                    "description": "Columns to plot, defaults to every other column"
                                 }
-                            },
-                            "required": ["series"]
+                            }
                         }
-                    },
-                    "required": ["presentation_name", "title", "data"],
-                },
-            ),
-            types.Tool(
-                name="add-slide-picture-with-caption",
-                description=
-                "Add a new slide with a picture and caption to an existing presentation",
-                inputSchema={
-                    "type":
-                    "object",
-                    "properties": {
-                        "presentation_name": {
-                            "type":
-                            "string",
-                            "description":
-                            "Name of the presentation to add the slide to",
-                        },
-                        "title": {
-                            "type": "string",
-                            "description": "Title of the slide",
-                        },
-                        "caption": {
-                            "type":
-                            "string",
-                            "description":
-                            "Caption text to appear below the picture"
-                        },
-                        "image_path": {
-                            "type": "string",
-                            "description": "Path to the image file to insert"
-                        }
-                    },
-                    "required":
-                    ["presentation_name", "title", "caption", "image_path"],
-                },
-            ),
-            types.Tool(
-                name="open-presentation",
-                description=
-                "Opens an existing presentation and saves a copy to a new file for backup. Use this tool when "
-                "the user requests to open a presentation that has already been created.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "presentation_name": {
-                            "type": "string",
-                            "description": "Name of the presentation to open",
-                        },
-                        "output_path": {
-                            "type":
-                            "string",
-                            "description":
-                            "Path where to save the presentation (optional)",
-                        },
-                    },
-                    "required": ["presentation_name"],
-                },
-            ),
-            types.Tool(
-                name="save-presentation",
-                description=
-                "Save the presentation to a file. Always use this tool at the end of any process that has "
-                "added slides to a presentation.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "presentation_name": {
-                            "type": "string",
-                            "description": "Name of the presentation to save",
-                        },
-                        "output_path": {
-                            "type":
-                            "string",
-                            "description":
-                            "Path where to save the presentation (optional)",
-                        },
-                    },
-                    "required": ["presentation_name"],
-                },
-            ),
-        ]
-
-    @server.call_tool()
-    async def handle_call_tool(
-        name: str, arguments: dict | None
-    ) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
-        """Handle PowerPoint tool execution requests."""
-        if not arguments:
-            raise ValueError("Missing arguments")
-        if name == "open-presentation":
-            presentation_name = arguments.get("presentation_name")
-            if not presentation_name:
-                raise ValueError("Missing presentation name")
-            file_name = f"{presentation_name}.pptx"
-
-            try:
-                safe_file_path = sanitize_path(folder_path, file_name)
-            except ValueError as e:
-                raise ValueError(f"Invalid file path: {str(e)}")
-
-            # attempt to load presentation
-            try:
-                prs = Presentation(safe_file_path)
-            except Exception as e:
-                raise ValueError(
-                    f"Unable to load {safe_file_path}. Error: {str(e)}")
-
-            # Create a backup of the original file
-            file_name = BACKUP_FILE_NAME
-            try:
-                safe_file_path = sanitize_path(folder_path, file_name)
-            except ValueError as e:
-                raise ValueError(f"Invalid file path: {str(e)}")
-            # attempt to save a backup of presentation
-            try:
-                prs.save(safe_file_path)
-            except Exception as e:
-                raise ValueError(
-                    f"Unable to save {safe_file_path}. Error: {str(e)}")
-
-            presentation_manager.presentations[presentation_name] = prs
-
-            return [
-                types.TextContent(
-                    type="text",
-                    text=f"Opened presentation: {presentation_name}")
-            ]
-        elif name == "generate-and-save-image":
-            prompt = arguments.get("prompt")
-            file_name = arguments.get("file_name")
-            try:
-                safe_file_path = sanitize_path(folder_path, file_name)
-            except ValueError as e:
-                raise ValueError(f"Invalid file path: {str(e)}")
-
-            if not all([prompt, file_name]):
-                raise ValueError("Missing required arguments")
-
-            try:
-                saved_path = await vision_manager.generate_and_save_image(
-                    prompt, str(safe_file_path))
-                return [
-                    types.TextContent(
-                        type="text",
-                        text=
-                        f"Successfully generated and saved image to: {saved_path}"
-                    )
-                ]
-            except Exception as e:
-                return [
-                    types.TextContent(
-                        type="text",
-                        text=f"Failed to generate image: {str(e)}")
-                ]
-        elif name == "add-slide-comparison":
-            # Get arguments
-            presentation_name = arguments["presentation_name"]
-            title = arguments["title"]
-            left_side_title = arguments["left_side_title"]
-            left_side_content = arguments["left_side_content"]
-            right_side_title = arguments["right_side_title"]
-            right_side_content = arguments["right_side_content"]
-
-            if not all([
-                    presentation_name, title, left_side_title,
-                    left_side_content, right_side_title, right_side_content
-            ]):
-                raise ValueError("Missing required arguments")
-
-            if presentation_name not in presentation_manager.presentations:
-                raise ValueError(
-                    f"Presentation not found: {presentation_name}")
-            try:
-                slide = presentation_manager.add_comparison_slide(
-                    presentation_name, title, left_side_title,
-                    left_side_content, right_side_title, right_side_content)
-            except Exception as e:
-                raise ValueError(
-                    f"Unable to add comparison slide to {presentation_name}.pptx"
-                )
-
-            return [
-                types.TextContent(
-                    type="text",
-                    text=
-                    f"Successfully added comparison slide {title} to {presentation_name}.pptx"
-                )
-            ]
-
-        elif name == "add-slide-picture-with-caption":
-
-            # Get arguments
-            presentation_name = arguments["presentation_name"]
-            title = arguments["title"]
-            caption = arguments["caption"]
-            file_name = arguments["image_path"]
-
-            if not all([presentation_name, title, caption, file_name]):
-                raise ValueError("Missing required arguments")
-
-            if presentation_name not in presentation_manager.presentations:
-                raise ValueError(
-                    f"Presentation not found: {presentation_name}")
-
-            try:
-                safe_file_path = sanitize_path(folder_path, file_name)
-            except ValueError as e:
-                raise ValueError(f"Invalid file path: {str(e)}")
-
-            try:
-                slide = presentation_manager.add_picture_with_caption_slide(
-                    presentation_name, title, str(safe_file_path), caption)
-            except Exception as e:
-                raise ValueError(
-                    f"Unable to add slide with caption and picture layout to {presentation_name}.pptx. Error: {str(e)}"
-                )
-            finally:
-                # Clean up the image file if it exists
-                if os.path.exists(safe_file_path):
-                    os.remove(safe_file_path)  # Clean up the image file
-
-            return [
-                types.TextContent(
-                    type="text",
-                    text=
-                    f"Successfully added slide with caption and picture layout to {presentation_name}.pptx"
-                )
-            ]
-
-        elif name == "create-presentation":
-
-            presentation_name = arguments.get("name")
-            if not presentation_name:
-                raise ValueError("Missing presentation name")
-
-            # Create new presentation
-            prs = Presentation()
-            try:
-                presentation_manager.presentations[presentation_name] = prs
-            except KeyError as e:
-                raise ValueError(
-                    f"Unable to add {presentation_name} to presentation. Error: {str(e)}"
-                )
-
-            return [
-                types.TextContent(
-                    type="text",
-                    text=f"Created new presentation: {presentation_name}")
-            ]
-
-        elif name == "add-slide-title-content":
-            presentation_name = arguments.get("presentation_name")
-            title = arguments.get("title")
-            content = arguments.get("content")
-
-            if not all([presentation_name, title, content]):
-                raise ValueError("Missing required arguments")
-
-            if presentation_name not in presentation_manager.presentations:
-                raise ValueError(
-                    f"Presentation not found: {presentation_name}")
-
-            try:
-                slide = presentation_manager.add_title_with_content_slide(
-                    presentation_name, title, content)
-            except Exception as e:
-                raise ValueError(
-                    f"Unable to add slide '{title}' to presentation: {presentation_name}"
-                )
-
-            return [
-                types.TextContent(
-                    type="text",
-                    text=
-                    f"Added slide '{title}' to presentation: {presentation_name}"
-                )
-            ]
-        elif name == "add-slide-section-header":
-            presentation_name = arguments.get("presentation_name")
-            header = arguments.get("header")
-            subtitle = arguments.get("subtitle")
-
-            if not all([presentation_name, header]):
-                raise ValueError("Missing required arguments")
-
-            if presentation_name not in presentation_manager.presentations:
-                raise ValueError(
-                    f"Presentation not found: {presentation_name}")
-
-            try:
-                slide = presentation_manager.add_section_header_slide(
-                    presentation_name, header, subtitle)
-            except Exception as e:
-                raise ValueError(
-                    f"Unable to add slide '{header}' to presentation: {presentation_name}"
-                )
-
-            return [
-                types.TextContent(
-                    type="text",
-                    text=
-                    f"Added slide '{header}' to presentation: {presentation_name}"
-                )
-            ]
-        elif name == "add-slide-title-with-table":
-            presentation_name = arguments.get("presentation_name")
-            title = arguments.get("title")
-            table_data = arguments.get("data")
-
-            if not all([presentation_name, title, table_data]):
-                raise ValueError("Missing required arguments")
-
-            if presentation_name not in presentation_manager.presentations:
-                raise ValueError(
-                    f"Presentation not found: {presentation_name}")
-
-            # Validate table data structure
-            headers = table_data.get("headers", [])
-            rows = table_data.get("rows", [])
-
-            if not headers:
-                raise ValueError("Table headers are required")
-
-            if not rows:
-                raise ValueError("Table rows are required")
-
-            # Validate that all rows match header length
-            if not all(len(row) == len(headers) for row in rows):
-                raise ValueError(
-                    "All rows must have the same number of columns as headers")
-            try:
-                slide = presentation_manager.add_table_slide(
-                    presentation_name, title, headers, rows)
-            except Exception as e:
-                raise ValueError(
-                    f"Unable to add slide '{title}' with a table to presentation: {presentation_name}"
-                )
-
-            return [
-                types.TextContent(
-                    type="text",
-                    text=
-                    f"Added slide '{title}' with a table to presentation: {presentation_name}"
-                )
-            ]
-        elif name == "add-slide-title-with-chart":
-            presentation_name = arguments.get("presentation_name")
-            title = arguments.get("title")
-            chart_data = arguments.get("data")
-
-            if not all([presentation_name, title, chart_data]):
-                raise ValueError("Missing required arguments")
-
-            if presentation_name not in presentation_manager.presentations:
-                raise ValueError(
-                    f"Presentation not found: {presentation_name}")
-
-            # Get the presentation and create a new slide
-            prs = presentation_manager.presentations[presentation_name]
-            slide_layout = prs.slide_layouts[5]  # Title and blank content
-            slide = prs.slides.add_slide(slide_layout)
-
-            # Set the title
-            title_shape = slide.shapes.title
-            title_shape.text = title
-
-            # Determine the best chart type for the data
+                    }
+                }
+            },
+            "required": ["presentation_name", "title", "data"],
+        },
+    )
+    async def add_slide_title_with_chart(arguments: Dict[str, Any]) -> ToolResult:
+        presentation_name = arguments.get("presentation_name")
+        title = arguments.get("title")
+        chart_data = arguments.get("data")
+
+        if presentation_name not in presentation_manager.presentations:
+            raise ValueError(
+                f"Presentation not found: {presentation_name}")
+
+        # Read a CSV/NPY file or array buffer source into series
+        try:
+            with stage("validate"):
+                chart_data = await executor_manager.run_io(
+                    load_chart_source, chart_data,
+                    lambda file_name: str(sanitize_path(folder_path, file_name)))
+        except (ValueError, OSError) as e:
+            raise ValueError(f"Unable to load chart data source: {str(e)}")
+        if not chart_data.get("series"):
+            raise ValueError("Chart data needs series or a source")
+
+        def add_chart_slide():
+            # Determine the best chart type for the data, before the deck is touched
             try:
                 chart_type, chart_format = chart_manager.determine_chart_type(
                     chart_data)
             except Exception as e:
-                raise ValueError(f"Unable to determine chart type.")
+                raise ValueError(f"Unable to determine chart type: {e}")
+            errors = chart_manager.data_errors(chart_data, chart_format)
+            if errors:
+                raise ValueError(f"Invalid chart data: {'; '.join(errors)}")
 
-            # Add the chart to the slide
+            # Reduce large series to the point budget
             try:
-                chart = chart_manager.add_chart_to_slide(
-                    slide, chart_type, chart_data, chart_format)
-                chart_type_name = chart_type.name.lower().replace(
-                    'xl_chart_type.', '')
-
-                return [
-                    types.TextContent(
-                        type="text",
-                        text=
-                        f"Added slide '{title}' with a {chart_type_name} chart to presentation: {presentation_name}"
-                    )
-                ]
+                data, reduced = chart_manager.downsample(chart_data, chart_type, chart_format)
             except Exception as e:
                 raise ValueError(
                     f"Failed to create slide with chart: {str(e)}")
-        elif name == "add-slide-title-only":
-            presentation_name = arguments.get("presentation_name")
-            title = arguments.get("title")
 
-            if not all([presentation_name, title]):
-                raise ValueError("Missing required arguments")
+            # Create a new slide with a title and add the chart, the slide is rolled back if that fails
+            with presentation_manager.transaction(presentation_name, f"Add chart slide '{title}'"):
+                slide = presentation_manager.add_title_only_slide(
+                    presentation_name, title)
+                try:
+                    chart_manager.add_chart_to_slide(slide, chart_type,
+                                                     data, chart_format)
+                except Exception as e:
+                    raise ValueError(
+                        f"Failed to create slide with chart: {str(e)}")
+            return chart_type, reduced
+
+        async with presentation_manager.lock(presentation_name):
+            with stage("build"):
+                chart_type, reduced = await executor_manager.run_io(add_chart_slide)
+        chart_type_name = chart_type.name.lower().replace(
+            'xl_chart_type.', '')
+        note = ""
+        if reduced:
+            note = (f" (downsampled from {reduced['original_points']} to {reduced['points']} "
+                    f"points with {reduced['method']})")
 
-            if presentation_name not in presentation_manager.presentations:
-                raise ValueError(
-                    f"Presentation not found: {presentation_name}")
+        return [
+            types.TextContent(
+                type="text",
+                text=
+                f"Added slide '{title}' with a {chart_type_name} chart to presentation: {presentation_name}{note}"
+            )
+        ]
 
-            try:
-                slide = presentation_manager.add_title_slide(
-                    presentation_name, title)
-            except Exception as e:
-                raise ValueError(
-                    f"Unable to add '{title} to presentation: {presentation_name}. Error: {e}"
-                )
+    @tools.tool(
+        name="add-slide-picture-with-caption",
+        description=
+        "Add a new slide with a picture and caption to an existing presentation",
+        input_schema={
+            "type":
+            "object",
+            "properties": {
+                "presentation_name": {
+                    "type":
+                    "string",
+                    "description":
+                    "Name of the presentation to add the slide to",
+                },
+                "title": {
+                    "type": "string",
+                    "description": "Title of the slide",
+                },
+                "caption": {
+                    "type":
+                    "string",
+                    "description":
+                    "Caption text to appear below the picture"
+                },
+                "image_path": {
+                    "type": "string",
+                    "description": "Path to the image file to insert"
+                }
+            },
+            "required":
+            ["presentation_name", "title", "caption", "image_path"],
+        },
+    )
+    async def add_slide_picture_with_caption(arguments: Dict[str, Any]) -> ToolResult:
+        # Get arguments
+        presentation_name = arguments["presentation_name"]
+        title = arguments["title"]
+        caption = arguments["caption"]
+        file_name = arguments["image_path"]
+
+        if presentation_name not in presentation_manager.presentations:
+            raise ValueError(
+                f"Presentation not found: {presentation_name}")
+
+        try:
+            safe_file_path = sanitize_path(folder_path, file_name)
+        except ValueError as e:
+            raise ValueError(f"Invalid file path: {str(e)}")
+
+        try:
+            async with presentation_manager.lock(presentation_name):
+                # Downscale the image to the placeholder before it is embedded
+                with stage("image"):
+                    box = await executor_manager.run_io(
+                        presentation_manager.picture_placeholder_size, presentation_name)
+                    image = await image_processor.prepare(str(safe_file_path), box)
+                with stage("build"):
+                    slide = await executor_manager.run_io(
+                        presentation_manager.add_picture_with_caption_slide,
+                        presentation_name, title,
+                        image or str(safe_file_path), caption)
+                if image:
+                    image_processor.record(presentation_name, image)
+        except Exception as e:
+            raise ValueError(
+                f"Unable to add slide with caption and picture layout to {presentation_name}.pptx. Error: {str(e)}"
+            )
+        finally:
+            # Clean up the image file if it exists
+            if os.path.exists(safe_file_path):
+                os.remove(safe_file_path)  # Clean up the image file
 
-            return [
-                types.TextContent(
-                    type="text",
-                    text=
-                    f"Added slide '{title}' to presentation: {presentation_name}"
-                )
-            ]
-        elif name == "save-presentation":
-            presentation_name = arguments.get("presentation_name")
-            output_path = arguments.get("output_path")
+        return [
+            types.TextContent(
+                type="text",
+                text=
+                f"Successfully added slide with caption and picture layout to {presentation_name}.pptx"
+                + (f" (image reduced from {image.original_bytes} to {image.bytes} bytes)"
+                   if image and image.bytes_saved > 0 else "")
+            )
+        ]
 
-            if not presentation_name:
-                raise ValueError("Missing presentation name")
+    @tools.tool(
+        name="open-presentation",
+        description=
+        "Opens an existing presentation and saves a copy to a new file for backup. Use this tool when "
+        "the user requests to open a presentation that has already been created.",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "presentation_name": {
+                    "type": "string",
+                    "description": "Name of the presentation to open",
+                },
+                "output_path": {
+                    "type":
+                    "string",
+                    "description":
+                    "Path where to save the presentation (optional)",
+                },
+            },
+            "required": ["presentation_name"],
+        },
+    )
+    async def open_presentation(arguments: Dict[str, Any]) -> ToolResult:
+        presentation_name = arguments.get("presentation_name")
+        file_name = f"{presentation_name}.pptx"
+
+        try:
+            safe_file_path = sanitize_path(folder_path, file_name)
+        except ValueError as e:
+            raise ValueError(f"Invalid file path: {str(e)}")
+
+        # The original file is backed up before the first edit or save
+        try:
+            backup_file_path = sanitize_path(folder_path, BACKUP_FILE_NAME)
+        except ValueError as e:
+            raise ValueError(f"Invalid file path: {str(e)}")
+
+        # attempt to load presentation
+        async with presentation_manager.lock(presentation_name):
+            with stage("load"):
+                prs = await executor_manager.run_io(load_presentation,
+                                                    template_manager,
+                                                    safe_file_path)
+            await executor_manager.run_io(
+                presentation_manager.set_presentation, presentation_name, prs)
+            presentation_manager.register_backup(presentation_name,
+                                                 safe_file_path,
+                                                 backup_file_path)
 
-            if presentation_name not in presentation_manager.presentations:
-                raise ValueError(
-                    f"Presentation not found: {presentation_name}")
+        return [
+            types.TextContent(
+                type="text",
+                text=f"Opened presentation: {presentation_name}")
+        ]
 
-            prs = presentation_manager.presentations[presentation_name]
+    @tools.tool(
+        name="save-presentation",
+        description=
+        "Save the presentation to a file. Always use this tool at the end of any process that has "
+        "added slides to a presentation.",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "presentation_name": {
+                    "type": "string",
+                    "description": "Name of the presentation to save",
+                },
+                "output_path": {
+                    "type":
+                    "string",
+                    "description":
+                    "Path where to save the presentation (optional)",
+                },
+            },
+            "required": ["presentation_name"],
+        },
+    )
+    async def save_presentation(arguments: Dict[str, Any]) -> ToolResult:
+        presentation_name = arguments.get("presentation_name")
+        output_path = arguments.get("output_path")
+
+        if presentation_name not in presentation_manager.presentations:
+            raise ValueError(
+                f"Presentation not found: {presentation_name}")
+
+        # Default output path if none provided
+        if not output_path:
+            output_path = f"{presentation_name}.pptx"
+
+        try:
+            file_path = sanitize_path(folder_path, output_path)
+        except ValueError as e:
+            raise ValueError(f"Invalid file path: {str(e)}")
+
+        # Save and upload the presentation
+        async with presentation_manager.lock(presentation_name):
+            prs = await executor_manager.run_io(
+                presentation_manager.get_presentation, presentation_name)
+            if save_manager.mode == "disk":
+                # Persisting may overwrite the file the deck was opened from
+                await executor_manager.run_io(
+                    presentation_manager.ensure_backup, presentation_name)
+            file_url = await executor_manager.run_io(
+                save_and_upload, prs, file_path, save_manager, upload_manager)
+        return [
+            types.TextContent(
+                type="text",
+                text=f"Saved Open-WebUI with URL {file_url}")
+        ]
 
-            # Default output path if none provided
-            if not output_path:
-                output_path = f"{presentation_name}.pptx"
+    history_schema = {
+        "type": "object",
+        "properties": {
+            "presentation_name": {
+                "type": "string",
+                "description": "Name of the presentation",
+            },
+            "steps": {
+                "type": "integer",
+                "minimum": 1,
+                "description": "Number of operations (default: 1)",
+            },
+        },
+        "required": ["presentation_name"],
+    }
+
+    async def step_history(arguments: Dict[str, Any], step: Callable[[str, int], List[str]],
+                           action: str, done: str) -> ToolResult:
+        presentation_name = arguments.get("presentation_name")
+        steps = int(arguments.get("steps", 1))
+
+        if presentation_name not in presentation_manager.presentations:
+            raise ValueError(
+                f"Presentation not found: {presentation_name}")
+
+        def run():
+            labels = step(presentation_name, steps)
+            return labels, presentation_manager.history(presentation_name)
+
+        async with presentation_manager.lock(presentation_name):
+            labels, (undoable, redoable) = await executor_manager.run_io(run)
+
+        if labels:
+            text = f"{done} {len(labels)} operation(s) on presentation {presentation_name}: " + ", ".join(labels)
+        else:
+            text = f"Nothing to {action} on presentation: {presentation_name}"
+        text += (f". {len(undoable)} operation(s) can be undone"
+                 + (f", next: {undoable[0]}" if undoable else "")
+                 + f"; {len(redoable)} can be redone"
+                 + (f", next: {redoable[0]}" if redoable else "") + ".")
+        return [types.TextContent(type="text", text=text)]
+
+    @tools.tool(
+        name="undo-operation",
+        description=
+        "Undo the last operations that added slides to a presentation, newest first. Each tool call "
+        "that added slides is one operation, build-presentation included. Operations can be redone "
+        "with redo-operation until slides are added again.",
+        input_schema=history_schema,
+    )
+    async def undo_operation(arguments: Dict[str, Any]) -> ToolResult:
+        return await step_history(arguments, presentation_manager.undo, "undo", "Undid")
+
+    @tools.tool(
+        name="redo-operation",
+        description=
+        "Redo operations on a presentation that were taken back with undo-operation, oldest first.",
+        input_schema=history_schema,
+    )
+    async def redo_operation(arguments: Dict[str, Any]) -> ToolResult:
+        return await step_history(arguments, presentation_manager.redo, "redo", "Redid")
+
+    @tools.tool(
+        name="build-presentation",
+        description=
+        "Builds a whole presentation in one call from an ordered list of slide specs, and optionally "
+        "saves it. Prefer this tool over adding slides one at a time when the content of the deck is "
+        "known up front. Every slide spec is validated before any slide is added. Creates the "
+        "presentation if it does not exist yet, otherwise appends the slides to it.",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "name": {
+                    "type":
+                    "string",
+                    "description":
+                    "Name of the presentation (without .pptx extension)",
+                },
+                "template": {
+                    "type":
+                    "string",
+                    "description":
+                    "Name of a template in the server's template directory, used when the "
+                    "presentation is created (optional, defaults to the built-in template)",
+                },
+                "slides": {
+                    "type": "array",
+                    "description": "Slides to add, in order",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "type": {
+                                "type": "string",
+                                "enum": list(DeckBuilder.SLIDE_TYPES),
+                                "description": "Layout of the slide",
+                            },
+                            "title": {
+                                "type": "string",
+                                "description": "Title of the slide. Required for every type except section-header",
+                            },
+                            "header": {
+                                "type": "string",
+                                "description": "Section header title (section-header only)",
+                            },
+                            "subtitle": {
+                                "type": "string",
+                                "description": "Section header subtitle (section-header only, optional)",
+                            },
+                            "content": {
+                                "type": "string",
+                                "description": "Body text, same format as add-slide-title-content (title-content only)",
+                            },
+                            "left_side_title": {"type": "string"},
+                            "left_side_content": {"type": "string"},
+                            "right_side_title": {"type": "string"},
+                            "right_side_content": {"type": "string"},
+                            "data": {
+                                "type": "object",
+                                "description":
+                                "Table data (headers, rows or columns, number_format) for table slides or chart data (categories, "
+                                "series or source, x_axis, y_axis) for chart slides, in the same shape as "
+                                "add-slide-title-with-table and add-slide-title-with-chart",
+                            },
+                            "caption": {
+                                "type": "string",
+                                "description": "Caption text (picture-with-caption only)",
+                            },
+                            "image_path": {
+                                "type": "string",
+                                "description": "Image file name in the folder path (picture-with-caption only)",
+                            },
+                        },
+                        "required": ["type"],
+                    },
+                },
+                "save": {
+                    "type": "boolean",
+                    "description": "Save and upload the presentation after building it, only when every "
+                                   "slide was built (default false)",
+                },
+                "output_path": {
+                    "type": "string",
+                    "description": "Path where to save the presentation (optional)",
+                },
+            },
+            "required": ["name", "slides"],
+        },
+    )
+    async def build_presentation(arguments: Dict[str, Any]) -> ToolResult:
+        presentation_name = arguments.get("name")
+        template = arguments.get("template")
+        slides = arguments.get("slides")
+        save = arguments.get("save", False)
+        output_path = arguments.get("output_path")
+
+        try:
+            file_path = sanitize_path(
+                folder_path, output_path or f"{presentation_name}.pptx")
+        except ValueError as e:
+            raise ValueError(f"Invalid file path: {str(e)}")
+
+        # Validate every slide before touching the deck
+        with stage("validate"):
+            prepared = await executor_manager.run_io(
+                deck_builder.validate, slides,
+                lambda file_name: str(sanitize_path(folder_path, file_name)))
+
+        file_url = None
+        try:
+            async with presentation_manager.lock(presentation_name):
+                if presentation_name not in presentation_manager.presentations:
+                    prs = await executor_manager.run_io(
+                        template_manager.new_presentation, template)
+                    await executor_manager.run_io(
+                        presentation_manager.set_presentation, presentation_name, prs)
+
+                # Downscale images to the placeholder before they are embedded, once per file:
+                # every picture slide shares the layout's box
+                pictures = [spec for spec in prepared if spec["type"] == "picture-with-caption"]
+                if pictures and image_processor.enabled:
+                    with stage("image"):
+                        box = await executor_manager.run_io(
+                            presentation_manager.picture_placeholder_size, presentation_name)
+                        image_paths = list(dict.fromkeys(spec["image_path"] for spec in pictures))
+                        images = await asyncio.gather(
+                            *(image_processor.prepare(image_path, box) for image_path in image_paths),
+                            return_exceptions=True)
+                    images = dict(zip(image_paths, images))
+                    for spec in pictures:
+                        # A failed image is inserted as is, so the builder reports the error
+                        if not isinstance(images[spec["image_path"]], Exception):
+                            spec["image"] = images[spec["image_path"]]
+
+                with stage("build"):
+                    results = await executor_manager.run_io(
+                        deck_builder.build, presentation_name, prepared)
+                for spec, result in zip(prepared, results):
+                    if spec.get("image") and result["status"] == "ok":
+                        image_processor.record(presentation_name, spec["image"])
+
+                # A deck with missing slides is not saved or uploaded
+                failed = sum(1 for result in results if result["status"] != "ok")
+                if save and not failed:
+                    prs = await executor_manager.run_io(
+                        presentation_manager.get_presentation, presentation_name)
+                    if save_manager.mode == "disk":
+                        await executor_manager.run_io(
+                            presentation_manager.ensure_backup, presentation_name)
+                    file_url = await executor_manager.run_io(
+                        save_and_upload, prs, file_path, save_manager,
+                        upload_manager)
+        finally:
+            # Clean up the image files like add-slide-picture-with-caption does
+            for spec in prepared:
+                if spec["type"] == "picture-with-caption" and os.path.exists(spec["image_path"]):
+                    os.remove(spec["image_path"])
+
+        built = sum(1 for result in results if result["status"] == "ok")
+        summary = {
+            "presentation": presentation_name,
+            "slides_built": built,
+            "slides_failed": len(results) - built,
+            "slides": results,
+        }
+        if file_url:
+            summary["url"] = file_url
+        if save and failed:
+            raise ValueError(f"Presentation not saved, {failed} of {len(results)} slides failed "
+                             f"to build: {json.dumps(summary)}")
+        return [types.TextContent(type="text", text=json.dumps(summary))]
+
+    @tools.tool(
+        name="render-presentation",
+        description=
+        "Render slides of a presentation to PNG thumbnails, or the whole presentation to a PDF in the "
+        "folder path, to check how it looks. Slides that did not change since they were last rendered "
+        "are taken from a cache.",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "presentation_name": {
+                    "type": "string",
+                    "description": "Name of the presentation to render",
+                },
+                "format": {
+                    "type": "string",
+                    "enum": ["png", "pdf"],
+                    "description": "png (default) returns a thumbnail per slide, pdf writes a PDF file",
+                },
+                "slides": {
+                    "type": "array",
+                    "items": {"type": "integer", "minimum": 1},
+                    "description": "1-based numbers of the slides to render as PNG (optional, default all)",
+                },
+                "width": {
+                    "type": "integer",
+                    "minimum": 64,
+                    "maximum": 1920,
+                    "description": "Width of the PNG thumbnails in pixels (optional, default 640)",
+                },
+                "output_path": {
+                    "type": "string",
+                    "description": "Path of the PDF in the folder path (optional, default <presentation_name>.pdf)",
+                },
+            },
+            "required": ["presentation_name"],
+        },
+    )
+    async def render_presentation(arguments: Dict[str, Any]) -> ToolResult:
+        presentation_name = arguments.get("presentation_name")
+        output_format = arguments.get("format", "png")
+        slide_numbers = arguments.get("slides")
+        width = int(arguments.get("width", 640))
+        output_path = arguments.get("output_path")
+
+        if presentation_name not in presentation_manager.presentations:
+            raise ValueError(f"Presentation not found: {presentation_name}")
+        if output_format == "pdf":
+            try:
+                pdf_path = sanitize_path(folder_path, output_path or f"{presentation_name}.pdf")
+            except ValueError as e:
+                raise ValueError(f"Invalid file path: {str(e)}")
 
-            file_path = os.path.join(path, output_path)
-            # Save the presentation
+        def snapshot():
+            # Hash every slide, and save the deck for the renderer only if a render is missing
+            prs = presentation_manager.get_presentation(presentation_name)
+            keys = render_manager.slide_keys(prs, f"{output_format}:{width}")
+            if not keys:
+                # Before anything is written, there would be no render to clean up after
+                raise ValueError(f"Presentation {presentation_name} has no slides to render")
+            if slide_numbers:
+                for number in slide_numbers:
+                    if not isinstance(number, int) or not 1 <= number <= len(keys):
+                        raise ValueError(f"Slide {number} does not exist, the presentation has {len(keys)} slides")
+                indexes = list(dict.fromkeys(number - 1 for number in slide_numbers))
+            else:
+                indexes = list(range(len(keys)))
+            needed = [render_manager.pdf_key(keys)] if output_format == "pdf" else [keys[i] for i in indexes]
+            if not render_manager.needs_render(needed):
+                return keys, indexes, None
+            fd, deck_path = tempfile.mkstemp(suffix=".pptx", prefix="pptx-render-")
             try:
-                prs.save(file_path)
-            except Exception as e:
-                raise ValueError(
-                    f"Unable to save the {presentation_name}. Error: {e}")
-
-            url = f"{owui_url}/api/v1/files/"
-            headers = {
-                "Authorization": f"Bearer {owui_token}",
-            }
-            with open(file_path, "rb") as file:
-                files = {
-                    "file":
-                    (os.path.basename(file_path), file,
-                     "application/vnd.openxmlformats-officedocument.presentationml.presentation"
-                     )
-                }
-                response = requests.post(url, headers=headers, files=files)
-            os.remove(file_path)  # Clean up the local file after upload
-            if response.status_code == 200:
-                file_url = f"{url.strip('/')}/{response.json().get('id', 'unknown')}/content"
+                with os.fdopen(fd, "wb") as f:
+                    save_manager.writer.write(prs, f)
+            except BaseException:
+                os.remove(deck_path)
+                raise
+            return keys, indexes, deck_path
+
+        async with presentation_manager.lock(presentation_name):
+            with stage("snapshot"):
+                keys, indexes, deck_path = await executor_manager.run_io(snapshot)
+
+        try:
+            if output_format == "pdf":
+                with stage("render"):
+                    pdf = await render_manager.render_pdf(deck_path, keys)
+
+                def write_pdf():
+                    with open(pdf_path, "wb") as f:
+                        f.write(pdf)
+
+                await executor_manager.run_io(write_pdf)
                 return [
                     types.TextContent(
                         type="text",
-                        text=f"Saved Open-WebUI with URL {file_url}")
+                        text=f"Rendered {len(keys)} slides of {presentation_name} to {os.path.basename(pdf_path)}")
                 ]
-            else:
-                raise ValueError(
-                    f"Failed to upload file to server. Status code: {response.status_code}, Response: {response.text}"
-                )
+            with stage("render"):
+                images = await render_manager.render_slides(deck_path, keys, indexes, width)
+        finally:
+            if deck_path:
+                os.remove(deck_path)
+
+        contents = []
+        for index, image in zip(indexes, images):
+            contents.append(types.TextContent(type="text", text=f"Slide {index + 1}"))
+            contents.append(types.ImageContent(type="image", data=base64.b64encode(image).decode("ascii"),
+                                               mimeType="image/png"))
+        return contents
+
+    @tools.tool(
+        name="get-server-stats",
+        description=
+        "Returns runtime statistics for the server as JSON: worker pool sizes and queue depths, and "
+        "lock contention and wait times per presentation, template cache counters, and memory and "
+        "eviction counters for open presentations, save and upload counters, image generation and cache "
+        "counters, bytes saved by image preprocessing per presentation, shared media store "
+        "hits and misses, chart profile memo counters, slides rendered or taken from the render cache, "
+        "tool calls running, waiting and turned away as busy, and the transport's connections. "
+        "Use this tool when the user asks about server load or performance.",
+        input_schema={
+            "type": "object",
+            "properties": {},
+        },
+    )
+    async def get_server_stats(arguments: Dict[str, Any]) -> ToolResult:
+        stats = {
+            "executor": executor_manager.stats(),
+            "presentation_locks": presentation_manager.lock_stats(),
+            "templates": template_manager.stats(),
+            "sessions": presentation_store.stats(),
+            "saves": save_manager.stats(),
+            "uploads": upload_manager.stats(),
+            "images": vision_manager.stats(),
+            "image_processing": image_processor.stats(),
+            "media": media_store.stats(),
+            "charts": chart_manager.stats(),
+            "renders": render_manager.stats(),
+            "metrics": metrics.stats(),
+            "admission": admission.stats(),
+        }
+        stats.update((name, source()) for name, source in stats_sources.items())
+        return [types.TextContent(type="text", text=json.dumps(stats))]
+
+    tools.install(server)
 
+    @server.call_tool()
+    async def handle_call_tool(
+        name: str, arguments: dict | None
+    ) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
+        """Handle PowerPoint tool execution requests, timing each call and its stages."""
+        # Unknown names share a label, so clients can't grow the metrics without bound
+        with metrics.span(name if name in tools else "unknown"):
+            async with admission.admit():
+                result = await tools.call(name, arguments)
+        # Pass on what happened to the deck since the last call, e.g. that it was spilled
+        target = (arguments or {}).get("presentation_name") or (arguments or {}).get("name")
+        if isinstance(target, str):
+            result = result + [types.TextContent(type="text", text=notice)
+                               for notice in presentation_manager.pop_notices(target)]
+        return result
+
+    def shutdown():
+        stop_sweeping.set()
+        executor_manager.shutdown(wait=False)
+        upload_manager.close()
+        save_manager.close()
+        render_manager.close()
+        metrics.close()
+
+    return server, shutdown
+
+
+async def main(folder_path, owui_url, owui_token, transport="stdio", host="127.0.0.1", port=8000,
+               max_connections=32, **options):
+    """
+    Run the MCP server until the stdio client disconnects, or until the SSE server is stopped.
+    Over SSE, every client shares the one process with its open presentations and caches.
+
+    Args:
+        folder_path: Folder presentations, images and data files are read from and saved to
+        owui_url: Base URL of the Open-WebUI server decks are uploaded to
+        owui_token: API token for Open-WebUI
+        transport: "stdio" or "sse"
+        host: Address the SSE server listens on
+        port: Port the SSE server listens on
+        max_connections: Clients connected over SSE at once, more are turned away
+        **options: Options passed to create_server
+    """
+    logger.info(f"Starting Powerpoint MCP Server")
+    stats_sources = {"transport": lambda: {"transport": "stdio"}}
+    server, shutdown = create_server(folder_path, owui_url, owui_token,
+                                     stats_sources=stats_sources, **options)
+    initialization_options = InitializationOptions(
+        server_name="powerpoint",
+        server_version="0.1.0",
+        capabilities=server.get_capabilities(
+            notification_options=NotificationOptions(),
+            experimental_capabilities={},
+        ),
+    )
+    try:
+        if transport == "sse":
+            # Only the SSE transport needs the ASGI server
+            from .sse_transport import SseTransport
+            sse = SseTransport(server, initialization_options, max_connections=max_connections)
+            stats_sources["transport"] = sse.stats
+            logger.info(f"Server running with SSE transport on http://{host}:{port}/sse")
+            await sse.serve(host, port)
         else:
-            raise ValueError(f"Unknown tool: {name}")
-
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        logger.info("Server running with stdio transport")
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="powerpoint",
-                server_version="0.1.0",
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
-                ),
-            ),
-        )
+            async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+                logger.info("Server running with stdio transport")
+                await server.run(read_stream, write_stream, initialization_options)
+    finally:
+        shutdown()
 
 
 if __name__ == "__main__":
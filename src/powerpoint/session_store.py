@@ -0,0 +1,242 @@
+import os
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from pptx import Presentation
+from pptx.opc.package import XmlPart
+
+logger = logging.getLogger('mcp_powerpoint_server')
+
+# Rough resident cost of one parsed lxml element, used to estimate deck memory
+XML_ELEMENT_BYTES = 250
+
+
+def estimate_presentation_bytes(prs, part_sizes: Optional[MutableMapping] = None) -> int:
+    """
+    Estimate the memory held by a presentation: binary parts (images, media, workbooks) by
+    their blob size, XML parts by their element count.
+
+    Args:
+        prs: The presentation to measure
+        part_sizes: Per-part estimates from a previous call keyed by part, reused for parts
+            seen before. Pass a WeakKeyDictionary so removed parts drop out of it
+    """
+    if part_sizes is None:
+        part_sizes = {}
+    total = 0
+    for part in prs.part.package.iter_parts():
+        size = part_sizes.get(part)
+        if size is None:
+            if isinstance(part, XmlPart):
+                size = sum(1 for _ in part._element.iter()) * XML_ELEMENT_BYTES
+            else:
+                size = len(part.blob)
+            part_sizes[part] = size
+        total += size
+    return total
+
+
+class _Session:
+    def __init__(self, prs):
+        self.prs = prs
+        # Keyed by the part itself, a freed part's id can be reused by a new one
+        self.part_sizes: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self.size = 0
+        self.last_access = time.monotonic()
+        self.measure()
+
+    def measure(self):
+        # Parts already measured keep their estimate, so this only walks new slides and media
+        self.size = estimate_presentation_bytes(self.prs, self.part_sizes)
+
+
+class PresentationStore(MutableMapping):
+    """
+    Dict-like store of open presentations with a bounded memory footprint.
+
+    Presentations are kept in LRU order. When there are more than max_presentations resident,
+    their estimated size exceeds memory_budget bytes, or one has been idle for longer than
+    idle_ttl seconds, the least recently used ones are spilled to a compressed .pptx checkpoint
+    in spill_dir. A spilled presentation is reloaded transparently the next time it is accessed.
+    The limits are enforced whenever a deck is accessed or stored. Idle decks are also spilled
+    by sweep(), which the owner calls every sweep_interval seconds so they leave memory on an
+    idle server too.
+
+    Presentations for which is_pinned(name) returns True are never spilled, so a deck that is
+    being edited under its lock stays in memory. on_spill(name, prs) is called after a deck
+    was spilled, to release state kept alongside it that the checkpoint can't hold.
+    cached_bytes(prs) returns the memory such state holds, e.g. the compressed parts kept for
+    an incremental save, which counts against memory_budget with the deck itself.
+    """
+
+    def __init__(self, spill_dir: Optional[str] = None, max_presentations: int = 32,
+                 memory_budget: int = 512 * 1024 * 1024, idle_ttl: float = 1800,
+                 is_pinned: Optional[Callable[[str], bool]] = None,
+                 on_spill: Optional[Callable[[str, Any], None]] = None,
+                 cached_bytes: Optional[Callable[[Any], int]] = None):
+        self.spill_dir = spill_dir or tempfile.mkdtemp(prefix="powerpoint-sessions-")
+        os.makedirs(self.spill_dir, exist_ok=True)
+        self.max_presentations = max_presentations
+        self.memory_budget = memory_budget
+        self.idle_ttl = idle_ttl
+        self.is_pinned = is_pinned or (lambda name: False)
+        self.on_spill = on_spill
+        self.cached_bytes = cached_bytes
+
+        self._resident: OrderedDict[str, _Session] = OrderedDict()
+        self._spilled: Dict[str, str] = {}
+        self._lock = threading.RLock()
+        self._last_sweep = time.monotonic()
+
+        self.evictions = {"total": 0, "lru": 0, "memory": 0, "ttl": 0}
+        self.reloads = 0
+        self.spilled_bytes = 0
+
+    def _spill_path(self, name: str) -> str:
+        digest = hashlib.sha256(name.encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.spill_dir, f"{digest}.pptx")
+
+    def __getitem__(self, name: str):
+        with self._lock:
+            session = self._resident.get(name)
+            if session is None:
+                if name not in self._spilled:
+                    raise KeyError(name)
+                session = self._reload(name)
+            else:
+                self._resident.move_to_end(name)
+                session.measure()
+            session.last_access = time.monotonic()
+            self._enforce_limits(keep=name)
+            return session.prs
+
+    def __setitem__(self, name: str, prs):
+        with self._lock:
+            self._discard_spilled(name)
+            self._resident[name] = _Session(prs)
+            self._resident.move_to_end(name)
+            self._enforce_limits(keep=name)
+
+    def __delitem__(self, name: str):
+        with self._lock:
+            if name not in self._resident and name not in self._spilled:
+                raise KeyError(name)
+            self._resident.pop(name, None)
+            self._discard_spilled(name)
+
+    def __contains__(self, name) -> bool:
+        # Membership must not reload a spilled deck
+        with self._lock:
+            return name in self._resident or name in self._spilled
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._resident) + list(self._spilled))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._resident) + len(self._spilled)
+
+    def _reload(self, name: str) -> _Session:
+        path = self._spilled.pop(name)
+        logger.info(f"Reloading spilled presentation: {name}")
+        prs = Presentation(path)
+        os.remove(path)
+        self.reloads += 1
+        session = _Session(prs)
+        self._resident[name] = session
+        return session
+
+    def _discard_spilled(self, name: str):
+        path = self._spilled.pop(name, None)
+        if path and os.path.exists(path):
+            os.remove(path)
+
+    def _spill(self, name: str, reason: str):
+        session = self._resident.pop(name)
+        path = self._spill_path(name)
+        try:
+            session.prs.save(path)
+        except Exception as e:
+            # Keep the deck in memory rather than lose it
+            logger.warning(f"Unable to spill presentation {name}: {e}")
+            self._resident[name] = session
+            self._resident.move_to_end(name, last=False)
+            return False
+        self._spilled[name] = path
+        self.spilled_bytes += os.path.getsize(path)
+        self.evictions["total"] += 1
+        self.evictions[reason] += 1
+        logger.info(f"Spilled presentation {name} to disk ({reason})")
+        if self.on_spill is not None:
+            try:
+                self.on_spill(name, session.prs)
+            except Exception as e:
+                logger.warning(f"Unable to release state of spilled presentation {name}: {e}")
+        return True
+
+    def _candidates(self, keep: str):
+        return [name for name in self._resident if name != keep and not self.is_pinned(name)]
+
+    @property
+    def sweep_interval(self) -> float:
+        """Seconds between sweeps for idle presentations, 0 when they never expire."""
+        return min(self.idle_ttl, 60) if self.idle_ttl else 0
+
+    def sweep(self, keep: Optional[str] = None) -> int:
+        """
+        Spill presentations that have been idle for longer than idle_ttl and return how many
+        were spilled.
+
+        Args:
+            keep: A presentation to keep resident regardless, e.g. the one being accessed
+        """
+        with self._lock:
+            if not self.idle_ttl:
+                return 0
+            now = time.monotonic()
+            self._last_sweep = now
+            return sum(self._spill(name, "ttl") for name in self._candidates(keep)
+                       if now - self._resident[name].last_access > self.idle_ttl)
+
+    def _enforce_limits(self, keep: str):
+        if self.idle_ttl and time.monotonic() - self._last_sweep >= self.sweep_interval:
+            self.sweep(keep)
+
+        for name in self._candidates(keep):
+            over_count = len(self._resident) > self.max_presentations
+            over_memory = self.resident_bytes() > self.memory_budget
+            if not (over_count or over_memory):
+                break
+            self._spill(name, "lru" if over_count else "memory")
+
+    def resident_bytes(self) -> int:
+        """Return the estimated memory held by resident presentations and their cached state."""
+        with self._lock:
+            total = sum(session.size for session in self._resident.values())
+            if self.cached_bytes is not None:
+                # Looked up each time, it changes when a deck is saved rather than accessed
+                total += sum(self.cached_bytes(session.prs) for session in self._resident.values())
+            return total
+
+    def stats(self) -> Dict[str, Any]:
+        """Return residency, memory and eviction counters."""
+        with self._lock:
+            return {
+                "resident": len(self._resident),
+                "spilled": len(self._spilled),
+                "resident_bytes_estimate": self.resident_bytes(),
+                "memory_budget": self.memory_budget,
+                "max_presentations": self.max_presentations,
+                "idle_ttl": self.idle_ttl,
+                "evictions": dict(self.evictions),
+                "reloads": self.reloads,
+                "spilled_bytes_written": self.spilled_bytes,
+            }
@@ -0,0 +1,183 @@
+import logging
+from typing import Any, Dict
+from urllib.parse import quote
+from uuid import UUID, uuid4
+
+import anyio
+import mcp.types as types
+import uvicorn
+from anyio.streams.memory import MemoryObjectSendStream
+from mcp.server import Server
+from mcp.server.models import InitializationOptions
+from pydantic import ValidationError
+from sse_starlette import EventSourceResponse
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Mount, Route
+from starlette.types import Receive, Scope, Send
+
+logger = logging.getLogger('mcp_powerpoint_server')
+
+# Seconds open SSE streams get to finish when the server is stopped
+GRACEFUL_SHUTDOWN_TIMEOUT = 5
+
+
+class _Endpoint:
+    """Lets a Starlette route call a raw ASGI coroutine, which streams its own response."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        await self.app(scope, receive, send)
+
+
+class SseTransport:
+    """
+    Serves one MCP server to many clients over HTTP with server-sent events. A client opens
+    a stream with GET /sse and posts its messages to the endpoint the stream announces. All
+    clients share the server's open presentations, caches and worker pools.
+
+    At most max_connections streams are open at once, further clients are answered with
+    503 and a Retry-After header. How many tool calls run at once is bounded by the server's
+    call admission, not per connection.
+
+    Each stream is a session: the first event announces the endpoint URL with the session's
+    id, and posted messages are routed to the session by that id. A session is forgotten as
+    soon as its stream closes, so later posts to it are answered with 404.
+    """
+
+    def __init__(self, server: Server, initialization_options: InitializationOptions,
+                 max_connections: int = 32, endpoint: str = "/messages/"):
+        if max_connections < 1:
+            raise ValueError("max_connections must be at least 1")
+        self.server = server
+        self.initialization_options = initialization_options
+        self.max_connections = max_connections
+        self.endpoint = endpoint
+        self._sessions: Dict[UUID, MemoryObjectSendStream] = {}
+        self.connections = 0
+        self.max_seen = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.messages = 0
+        self.unknown_sessions = 0
+
+    async def _connect(self, scope: Scope, receive: Receive, send: Send):
+        if self.connections >= self.max_connections:
+            self.rejected += 1
+            response = Response("Too many connections", status_code=503, headers={"Retry-After": "1"})
+            await response(scope, receive, send)
+            return
+
+        self.connections += 1
+        self.accepted += 1
+        self.max_seen = max(self.max_seen, self.connections)
+
+        # Client messages are posted to the endpoint, server messages go out as events
+        read_stream_writer, read_stream = anyio.create_memory_object_stream(0)
+        write_stream, write_stream_reader = anyio.create_memory_object_stream(0)
+        event_writer, event_reader = anyio.create_memory_object_stream(0)
+        session_id = uuid4()
+        self._sessions[session_id] = read_stream_writer
+
+        async def send_events():
+            async with event_writer, write_stream_reader:
+                await event_writer.send({"event": "endpoint",
+                                         "data": f"{quote(self.endpoint)}?session_id={session_id.hex}"})
+                async for message in write_stream_reader:
+                    await event_writer.send({"event": "message",
+                                             "data": message.model_dump_json(by_alias=True, exclude_none=True)})
+
+        try:
+            # The session would otherwise outlive its client, waiting for messages forever
+            async with anyio.create_task_group() as task_group:
+                async def stream_events():
+                    # Returns once the client disconnected
+                    response = EventSourceResponse(content=event_reader, data_sender_callable=send_events)
+                    await response(scope, receive, send)
+                    task_group.cancel_scope.cancel()
+
+                async def run_session():
+                    await self.server.run(read_stream, write_stream, self.initialization_options)
+                    task_group.cancel_scope.cancel()
+
+                task_group.start_soon(stream_events)
+                task_group.start_soon(run_session)
+        finally:
+            del self._sessions[session_id]
+            read_stream_writer.close()
+            read_stream.close()
+            write_stream.close()
+            self.connections -= 1
+
+    async def _post_message(self, scope: Scope, receive: Receive, send: Send):
+        self.messages += 1
+        request = Request(scope, receive)
+        try:
+            session_id = UUID(hex=request.query_params.get("session_id", ""))
+        except ValueError:
+            response = Response("A valid session_id is required", status_code=400)
+            await response(scope, receive, send)
+            return
+
+        writer = self._sessions.get(session_id)
+        if writer is None:
+            self.unknown_sessions += 1
+            response = Response("Could not find session", status_code=404)
+            await response(scope, receive, send)
+            return
+
+        try:
+            message = types.JSONRPCMessage.model_validate(await request.json())
+        except (ValidationError, ValueError) as e:
+            logger.warning(f"Unable to parse a message posted to session {session_id.hex}: {e}")
+            response = Response("Could not parse message", status_code=400)
+            await response(scope, receive, send)
+            return
+
+        response = Response("Accepted", status_code=202)
+        await response(scope, receive, send)
+        try:
+            await writer.send(message)
+        except (anyio.ClosedResourceError, anyio.BrokenResourceError):
+            # The stream closed while the message was on its way
+            pass
+
+    async def _health(self, request: Request) -> Response:
+        return JSONResponse(self.stats())
+
+    def app(self) -> Starlette:
+        """Return the ASGI application: GET /sse, POST to the message endpoint, GET /health."""
+        return Starlette(routes=[
+            Route("/sse", endpoint=_Endpoint(self._connect)),
+            Mount(self.endpoint, app=self._post_message),
+            Route("/health", endpoint=self._health),
+        ])
+
+    async def serve(self, host: str, port: int):
+        """
+        Serve until the process is interrupted.
+
+        Args:
+            host: Address to listen on
+            port: Port to listen on
+        """
+        config = uvicorn.Config(self.app(), host=host, port=port, log_level="warning",
+                                timeout_graceful_shutdown=GRACEFUL_SHUTDOWN_TIMEOUT)
+        await uvicorn.Server(config).serve()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return open connections and sessions, and how many were accepted and turned away."""
+        return {
+            "transport": "sse",
+            "connections": self.connections,
+            "sessions": len(self._sessions),
+            "max_connections": self.max_connections,
+            "max_seen": self.max_seen,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "messages": self.messages,
+            "unknown_sessions": self.unknown_sessions,
+        }
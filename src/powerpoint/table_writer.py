@@ -0,0 +1,161 @@
+import re
+from numbers import Number
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls
+
+# Characters XML 1.0 can't carry. PowerPoint expects them escaped as _xHHHH_
+_INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+# Style python-pptx gives new tables ("Medium Style 2 - Accent 1")
+DEFAULT_TABLE_STYLE_ID = "{5C22544A-7EE6-4342-B048-85BDC9FD1C3A}"
+
+
+def normalize_table_data(headers: Optional[Sequence[Any]], rows: Any) -> Tuple[List[Any], List[Sequence[Any]]]:
+    """
+    Accept table rows in any of the supported shapes and return (headers, rows) as lists.
+
+    rows may be:
+        - a list of row lists
+        - a column-oriented dict of {header: [values]}, headers default to the dict keys
+        - a NumPy-style 2D array (anything with tolist())
+        - a pandas-style DataFrame (anything with columns and to_numpy()), headers default
+          to the column names
+
+    Args:
+        headers: The header row, optional when it can be taken from rows
+        rows: The table body
+    """
+    if isinstance(rows, dict):
+        columns = list(rows.values())
+        if not headers:
+            headers = list(rows.keys())
+        lengths = {len(column) for column in columns}
+        if len(lengths) > 1:
+            raise ValueError("All columns must have the same number of values")
+        rows = list(zip(*columns))
+    elif hasattr(rows, "columns") and hasattr(rows, "to_numpy"):
+        if not headers:
+            headers = [str(column) for column in rows.columns]
+        rows = rows.to_numpy().tolist()
+    elif hasattr(rows, "tolist"):
+        rows = rows.tolist()
+
+    headers = list(headers or [])
+    rows = list(rows or [])
+    if not headers:
+        raise ValueError("Table headers are required")
+    if not rows:
+        raise ValueError("Table rows are required")
+    width = len(headers)
+    # Measure every row in one pass in C, rows are only walked to report a bad one
+    if set(map(len, rows)) != {width}:
+        row_index, row = next((index, row) for index, row in enumerate(rows) if len(row) != width)
+        raise ValueError(
+            f"All rows must have the same number of columns as headers (row {row_index} has {len(row)})")
+    return headers, rows
+
+
+def format_cell(value: Any, number_format: Optional[str] = None) -> str:
+    """
+    Return the display text for a cell value.
+
+    Args:
+        value: The cell value
+        number_format: Format spec applied to numbers, e.g. ",.2f" or ".1%"
+    """
+    if value is None:
+        return ""
+    if number_format and isinstance(value, Number) and not isinstance(value, bool):
+        try:
+            return format(value, number_format)
+        except (TypeError, ValueError):
+            pass
+    return str(value)
+
+
+def _escape(text: str) -> str:
+    text = escape(text)
+    return _INVALID_XML_CHARS.sub(lambda m: f"_x{ord(m.group()):04X}_", text)
+
+
+def _cell_xml(text: str, run_props: str) -> str:
+    paragraphs = []
+    for line in text.split("\n"):
+        run = f"<a:r><a:t>{_escape(line)}</a:t></a:r>" if line else ""
+        paragraphs.append(f"<a:p><a:pPr>{run_props}</a:pPr>{run}</a:p>")
+    return ("<a:tc><a:txBody><a:bodyPr/><a:lstStyle/>" + "".join(paragraphs) +
+            "</a:txBody><a:tcPr/></a:tc>")
+
+
+def build_table_xml(headers: Sequence[Any], rows: Sequence[Sequence[Any]], col_width: int,
+                    row_height: int, header_font_size: int = 1100, body_font_size: int = 1000,
+                    header_bold: bool = True, number_format: Optional[str] = None,
+                    style_id: str = DEFAULT_TABLE_STYLE_ID) -> str:
+    """
+    Generate the complete a:tbl element for a table in one pass.
+
+    Args:
+        headers: The header row
+        rows: The table body, every row as long as headers
+        col_width: Width of each column in EMU
+        row_height: Height of each row in EMU
+        header_font_size: Header font size in hundredths of a point
+        body_font_size: Body font size in hundredths of a point
+        header_bold: Whether header text is bold
+        number_format: Format spec applied to numeric body cells
+        style_id: The table style to apply
+    """
+    bold = ' b="1"' if header_bold else ''
+    header_props = f'<a:defRPr{bold} sz="{header_font_size}"/>'
+    body_props = f'<a:defRPr sz="{body_font_size}"/>'
+    row_open = f'<a:tr h="{row_height}">'
+
+    parts = [
+        f'<a:tbl {nsdecls("a")}>',
+        f'<a:tblPr firstRow="1" bandRow="1"><a:tableStyleId>{style_id}</a:tableStyleId></a:tblPr>',
+        "<a:tblGrid>", f'<a:gridCol w="{col_width}"/>' * len(headers), "</a:tblGrid>",
+        row_open,
+    ]
+    parts.extend(_cell_xml(str(header), header_props) for header in headers)
+    parts.append("</a:tr>")
+    for row in rows:
+        parts.append(row_open)
+        parts.extend(_cell_xml(format_cell(value, number_format), body_props) for value in row)
+        parts.append("</a:tr>")
+    parts.append("</a:tbl>")
+    return "".join(parts)
+
+
+def write_table(graphic_frame, headers: Sequence[Any], rows: Sequence[Sequence[Any]],
+                col_width: int, row_height: int, **kwargs: Any) -> None:
+    """
+    Replace the table inside a table graphic frame with one generated from headers and rows.
+    The frame can be created with a single placeholder row, it is discarded.
+
+    Args:
+        graphic_frame: A table shape returned by shapes.add_table
+        headers: The header row
+        rows: The table body
+        col_width: Width of each column in EMU
+        row_height: Height of each row in EMU
+        **kwargs: Styling options passed to build_table_xml
+    """
+    old_tbl = graphic_frame._element.graphic.graphicData.tbl
+    new_tbl = parse_xml(build_table_xml(headers, rows, col_width, row_height, **kwargs))
+    old_tbl.getparent().replace(old_tbl, new_tbl)
+
+
+def table_data_from_json(table_data: Dict[str, Any]) -> Tuple[List[Any], List[Sequence[Any]]]:
+    """
+    Read headers and rows from a tool's table data, which holds either "headers" and "rows"
+    or a column-oriented "columns" object.
+
+    Args:
+        table_data: The "data" argument of a table tool
+    """
+    if table_data.get("columns"):
+        return normalize_table_data(table_data.get("headers"), table_data["columns"])
+    return normalize_table_data(table_data.get("headers"), table_data.get("rows"))
@@ -0,0 +1,140 @@
+import os
+import copy
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from typing import Any, Dict, Optional
+
+from pptx import Presentation
+from pptx.api import _default_pptx_path
+
+logger = logging.getLogger('mcp_powerpoint_server')
+
+
+class _CachedTemplate:
+    """A parsed, never-modified presentation and the file state it was parsed from."""
+
+    def __init__(self, path: str, mtime_ns: int, size: int, digest: str, pristine):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.digest = digest
+        self.pristine = pristine
+        # Cloning reads the whole pristine tree, keep it away from concurrent clones
+        self.lock = threading.Lock()
+
+
+class TemplateManager:
+    """
+    Parses each template (or opened deck) once and hands out deep copies of the pristine
+    in-memory presentation, so creating a deck no longer re-reads and re-parses the package.
+
+    A cached entry is checked against the file's mtime and size on every use. When those change
+    the file is re-hashed, and only re-parsed if its SHA-256 actually differs.
+    """
+
+    def __init__(self, template_dir: Optional[str] = None, max_templates: int = 16):
+        self.template_dir = template_dir
+        self.max_templates = max_templates
+        self._templates: OrderedDict[str, _CachedTemplate] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def template_path(self, template: Optional[str] = None) -> str:
+        """
+        Resolve a template name to a file path. No name means the bundled python-pptx default.
+
+        Args:
+            template: File name of a template in the template directory, with or without .pptx
+        """
+        if not template:
+            return _default_pptx_path()
+        if not self.template_dir:
+            raise ValueError("No template directory configured")
+        if not template.endswith(".pptx"):
+            template = f"{template}.pptx"
+        base_path = os.path.normpath(self.template_dir)
+        template_path = os.path.normpath(os.path.join(base_path, template))
+        if not template_path.startswith(base_path + os.sep):
+            raise ValueError("Invalid template path. Attempted to access location outside template directory.")
+        if not os.path.exists(template_path):
+            raise ValueError(f"Template not found: {template}")
+        return template_path
+
+    def new_presentation(self, template: Optional[str] = None):
+        """
+        Return a new presentation based on a template from the template directory,
+        or on the bundled default template.
+
+        Args:
+            template: File name of a template in the template directory, with or without .pptx
+        """
+        return self.load(self.template_path(template))
+
+    def load(self, path: str):
+        """
+        Return a private copy of the presentation at path, parsing the file only when it is
+        not cached or has changed on disk.
+
+        Args:
+            path: The .pptx file to load
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+
+        with self._lock:
+            cached = self._templates.get(path)
+            if cached is not None:
+                self._templates.move_to_end(path)
+
+        if cached is not None and (cached.mtime_ns, cached.size) != (stat.st_mtime_ns, stat.st_size):
+            with open(path, "rb") as f:
+                blob = f.read()
+            digest = hashlib.sha256(blob).hexdigest()
+            if digest == cached.digest:
+                # Touched but not modified, keep the parsed copy
+                cached.mtime_ns, cached.size = stat.st_mtime_ns, stat.st_size
+            else:
+                logger.info(f"Template changed on disk, reloading: {path}")
+                cached = self._parse(path, stat, blob, digest)
+                with self._lock:
+                    self.reloads += 1
+        elif cached is None:
+            with open(path, "rb") as f:
+                blob = f.read()
+            cached = self._parse(path, stat, blob)
+            with self._lock:
+                self.misses += 1
+        else:
+            with self._lock:
+                self.hits += 1
+
+        with cached.lock:
+            return copy.deepcopy(cached.pristine)
+
+    def _parse(self, path: str, stat: os.stat_result, blob: bytes,
+               digest: Optional[str] = None) -> _CachedTemplate:
+        pristine = Presentation(BytesIO(blob))
+        cached = _CachedTemplate(path, stat.st_mtime_ns, stat.st_size,
+                                 digest or hashlib.sha256(blob).hexdigest(), pristine)
+        with self._lock:
+            self._templates[path] = cached
+            self._templates.move_to_end(path)
+            while len(self._templates) > self.max_templates:
+                self._templates.popitem(last=False)
+        return cached
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and hit, miss and reload counters."""
+        with self._lock:
+            return {
+                "cached": len(self._templates),
+                "max_templates": self.max_templates,
+                "hits": self.hits,
+                "misses": self.misses,
+                "reloads": self.reloads,
+            }
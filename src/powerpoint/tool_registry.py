@@ -0,0 +1,99 @@
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+import mcp.types as types
+from mcp.server import Server
+
+from .schema_validator import compile_validator
+
+logger = logging.getLogger('mcp_powerpoint_server')
+
+ToolResult = List[Union[types.TextContent, types.ImageContent, types.EmbeddedResource]]
+ToolHandler = Callable[[Dict[str, Any]], Awaitable[ToolResult]]
+ArgumentValidator = Callable[[Dict[str, Any]], None]
+
+
+class RegisteredTool:
+    """A tool's metadata, its argument check and the coroutine that handles its calls."""
+
+    __slots__ = ("name", "tool", "handler", "validate")
+
+    def __init__(self, tool: types.Tool, handler: ToolHandler, validate: ArgumentValidator):
+        self.name = tool.name
+        self.tool = tool
+        self.handler = handler
+        self.validate = validate
+
+
+class ToolRegistry:
+    """
+    The server's tools, registered with the tool() decorator. Calls are dispatched by name
+    with a dict lookup, and each tool's arguments are checked against its input schema by a
+    validator compiled once, before the handler can touch a presentation. Once installed on
+    a server the registry is frozen: the tool list is built once and every list_tools
+    request is answered with the same result.
+    """
+
+    def __init__(self):
+        self._tools: Dict[str, RegisteredTool] = {}
+        self._listing: Optional[types.ServerResult] = None
+
+    def tool(self, name: str, description: str, input_schema: Dict[str, Any]) -> Callable[[ToolHandler], ToolHandler]:
+        """
+        Register the decorated coroutine as the handler of a tool. It is called with the
+        tool's arguments once they passed validation.
+
+        Args:
+            name: Name of the tool
+            description: Description shown to the model
+            input_schema: JSON schema of the tool's arguments
+        """
+        if self._listing is not None:
+            raise ValueError(f"Can't register {name}, the tool list is frozen")
+        if name in self._tools:
+            raise ValueError(f"Tool already registered: {name}")
+
+        def decorator(handler: ToolHandler) -> ToolHandler:
+            tool = types.Tool(name=name, description=description, inputSchema=input_schema)
+            self._tools[name] = RegisteredTool(tool, handler, compile_validator(input_schema))
+            return handler
+
+        return decorator
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools
+
+    @property
+    def tools(self) -> Tuple[types.Tool, ...]:
+        return tuple(registered.tool for registered in self._tools.values())
+
+    async def call(self, name: str, arguments: Optional[Dict[str, Any]]) -> ToolResult:
+        """
+        Validate the arguments of a tool call and run its handler.
+
+        Args:
+            name: Name of the tool
+            arguments: The call's arguments
+        """
+        registered = self._tools.get(name)
+        if registered is None:
+            raise ValueError(f"Unknown tool: {name}")
+        arguments = arguments or {}
+        registered.validate(arguments)
+        return await registered.handler(arguments)
+
+    def install(self, server: Server):
+        """
+        Freeze the registry and answer the server's list_tools requests from it.
+
+        Args:
+            server: The MCP server
+        """
+        self._listing = types.ServerResult(types.ListToolsResult(tools=list(self.tools)))
+        listing = self._listing
+
+        async def handle_list_tools(_: types.ListToolsRequest) -> types.ServerResult:
+            return listing
+
+        server.request_handlers[types.ListToolsRequest] = handle_list_tools
+        logger.debug(f"Registered {len(self._tools)} tools")
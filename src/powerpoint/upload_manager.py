@@ -0,0 +1,166 @@
+import time
+import uuid
+import random
+import logging
+import threading
+from typing import Any, Dict, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger('mcp_powerpoint_server')
+
+PPTX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+
+# Status codes worth retrying: rate limiting and transient server errors
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class _MultipartBody:
+    """
+    A multipart body read in chunks from its header, the file's data and its closing boundary.
+    Its length is known up front, so requests sends it with a Content-Length header and no
+    chunked framing.
+    """
+
+    def __init__(self, head: bytes, data: memoryview, tail: bytes):
+        self._parts = [memoryview(head), data, memoryview(tail)]
+        self._length = len(head) + len(data) + len(tail)
+        self._index = 0
+        self._offset = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        """Return up to size bytes, continuing into the next part, or b"" at the end."""
+        chunks = []
+        while self._index < len(self._parts) and size != 0:
+            part = self._parts[self._index]
+            end = len(part) if size < 0 else min(len(part), self._offset + size)
+            chunk = part[self._offset:end]
+            chunks.append(bytes(chunk))
+            if size > 0:
+                size -= len(chunk)
+            if end == len(part):
+                self._index += 1
+                self._offset = 0
+            else:
+                self._offset = end
+        return b"".join(chunks)
+
+
+class UploadManager:
+    """
+    Uploads files to Open-WebUI over a pooled HTTP session.
+
+    The multipart body is read in chunks straight from the in-memory buffer, so a deck never
+    has to be written to disk or copied into one request body to be uploaded. Connection errors, timeouts and transient status
+    codes are retried with exponential backoff, and at most max_concurrent uploads run at once.
+    An upload waiting to retry does not hold its slot.
+    """
+
+    def __init__(self, owui_url: Optional[str], owui_token: Optional[str],
+                 connect_timeout: float = 5, read_timeout: float = 60, retries: int = 3,
+                 backoff: float = 0.5, max_concurrent: int = 4):
+        self.owui_url = owui_url
+        self.owui_token = owui_token
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrent)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+
+        self._stats_lock = threading.Lock()
+        self.uploads = 0
+        self.failures = 0
+        self.attempts = 0
+        self.bytes_sent = 0
+
+    @property
+    def files_url(self) -> str:
+        return f"{self.owui_url}/api/v1/files/"
+
+    def _multipart(self, file_name: str, data: memoryview, content_type: str,
+                   boundary: str) -> _MultipartBody:
+        quoted_name = file_name.replace('"', '%22').replace('\r', '').replace('\n', '')
+        head = (f"--{boundary}\r\n"
+                f'Content-Disposition: form-data; name="file"; filename="{quoted_name}"\r\n'
+                f"Content-Type: {content_type}\r\n\r\n").encode("utf-8")
+        tail = f"\r\n--{boundary}--\r\n".encode("utf-8")
+        return _MultipartBody(head, data, tail)
+
+    def upload(self, file_name: str, data: Union[bytes, bytearray, memoryview],
+               content_type: str = PPTX_CONTENT_TYPE) -> str:
+        """
+        Upload data to Open-WebUI as file_name and return the URL of the uploaded content.
+        Blocking, run it through the ExecutorManager.
+
+        Args:
+            file_name: File name to upload the data as
+            data: The file contents
+            content_type: MIME type of the file
+        """
+        if not self.owui_url:
+            raise ValueError("No Open-WebUI URL configured")
+
+        if not isinstance(data, memoryview):
+            data = memoryview(data)
+        headers = {"Authorization": f"Bearer {self.owui_token}"}
+        for attempt in range(self.retries + 1):
+            boundary = uuid.uuid4().hex
+            body = self._multipart(file_name, data, content_type, boundary)
+            headers["Content-Type"] = f"multipart/form-data; boundary={boundary}"
+            with self._stats_lock:
+                self.attempts += 1
+
+            # A slot is only held while posting, not while backing off
+            with self._slots:
+                try:
+                    response = self._session.post(self.files_url, headers=headers,
+                                                  data=body, timeout=self.timeout)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    response = None
+                    error = f"{type(e).__name__}: {e}"
+
+            if response is not None:
+                if response.status_code == 200:
+                    with self._stats_lock:
+                        self.uploads += 1
+                        self.bytes_sent += len(body)
+                    file_id = response.json().get('id', 'unknown')
+                    return f"{self.files_url.strip('/')}/{file_id}/content"
+                if response.status_code not in RETRY_STATUS_CODES:
+                    with self._stats_lock:
+                        self.failures += 1
+                    raise ValueError(
+                        f"Failed to upload file to server. Status code: {response.status_code}, Response: {response.text}"
+                    )
+                error = f"Status code: {response.status_code}, Response: {response.text}"
+
+            if attempt < self.retries:
+                delay = self.backoff * (2 ** attempt) * (1 + random.random() / 2)
+                logger.warning(f"Upload of {file_name} failed ({error}), retrying in {delay:.2f}s")
+                time.sleep(delay)
+
+        with self._stats_lock:
+            self.failures += 1
+        raise ValueError(f"Failed to upload file to server after {self.retries + 1} attempts. {error}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return upload, retry and byte counters."""
+        with self._stats_lock:
+            return {
+                "uploads": self.uploads,
+                "failures": self.failures,
+                "attempts": self.attempts,
+                "bytes_sent": self.bytes_sent,
+            }
+
+    def close(self):
+        """Close the pooled connections."""
+        self._session.close()
@@ -1,51 +1,291 @@
 import os
+import json
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
 from google import genai
 from google.genai import types
-from PIL import Image
+from PIL import Image, ImageDraw
 from io import BytesIO
+from typing import Any, Dict, Optional, Tuple
 
+logger = logging.getLogger('mcp_powerpoint_server')
 
-class VisionManager:
+GEMINI_IMAGE_MODEL = "gemini-2.0-flash-preview-image-generation"
 
-    async def generate_and_save_image(self, prompt: str,
-                                      output_path: str) -> str:
-        """Generate an image using Gemini Model and save it to the specified path."""
+# File extensions PIL writes for each image MIME type the generators return
+MIME_EXTENSIONS = {
+    "image/png": (".png",),
+    "image/jpeg": (".jpg", ".jpeg"),
+    "image/webp": (".webp",),
+    "image/gif": (".gif",),
+}
+
+
+class GeminiImageGenerator:
+    """Generates images with a Gemini model, reusing one client for every request."""
 
-        api_key = os.environ.get('GEMINI_API_KEY')
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY environment variable not set.")
+    def __init__(self, model: str = GEMINI_IMAGE_MODEL):
+        self.model = model
+        self.config = types.GenerateContentConfig(response_modalities=['TEXT', 'IMAGE'])
+        self._client = None
+        self._client_lock = threading.Lock()
 
-        client = genai.Client(api_key=api_key)
+    @property
+    def config_key(self) -> str:
+        return self.config.model_dump_json(exclude_none=True)
 
+    def _get_client(self):
+        with self._client_lock:
+            if self._client is None:
+                api_key = os.environ.get('GEMINI_API_KEY')
+                if not api_key:
+                    raise ValueError("GEMINI_API_KEY environment variable not set.")
+                self._client = genai.Client(api_key=api_key)
+            return self._client
+
+    def generate(self, prompt: str) -> Tuple[bytes, str]:
+        """Generate an image for prompt and return (image bytes, MIME type). Blocking."""
+        client = self._get_client()
         try:
             # Generate the image
             response = client.models.generate_content(
-                model="gemini-2.0-flash-preview-image-generation",
+                model=self.model,
                 contents=(prompt),
-                config=types.GenerateContentConfig(
-                    response_modalities=['TEXT', 'IMAGE']))
-
+                config=self.config)
         except Exception as e:
             raise ValueError(f"Failed to generate image: {str(e)}")
 
-        # Save the image
         try:
-            img_data = [
+            inline_data = [
                 part.inline_data
                 for part in response.candidates[0].content.parts
                 if part.inline_data is not None
-            ][0].data
-            image = Image.open(BytesIO((img_data)))
+            ][0]
+        except (IndexError, AttributeError, TypeError) as e:
+            raise ValueError(f"Failed to generate image: no image in response ({str(e)})")
+        return inline_data.data, inline_data.mime_type or "image/png"
+
+
+class FakeImageGenerator:
+    """
+    Stands in for Gemini in tests and benchmarks: returns a PNG whose colour is derived from
+    the prompt, without any network access.
+    """
+
+    model = "fake"
+    config_key = "{}"
+
+    def __init__(self, size: Tuple[int, int] = (1024, 768)):
+        self.size = size
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate(self, prompt: str) -> Tuple[bytes, str]:
+        with self._lock:
+            self.calls += 1
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        image = Image.new("RGB", self.size, tuple(digest[:3]))
+        ImageDraw.Draw(image).text((10, 10), prompt[:80], fill=(255, 255, 255))
+        buffer = BytesIO()
+        image.save(buffer, format="PNG")
+        return buffer.getvalue(), "image/png"
+
+
+class ImageCache:
+    """
+    Content-addressed, disk-backed store of generated images keyed by (model, prompt, config).
+    Least recently used images are evicted once the store grows past max_bytes.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, Tuple[str, int]] = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # Pick up images cached by previous runs, oldest access first
+        files = []
+        for file_name in os.listdir(cache_dir):
+            path = os.path.join(cache_dir, file_name)
+            key, _, mime_suffix = file_name.partition(".")
+            if os.path.isfile(path) and mime_suffix and not file_name.endswith(".tmp"):
+                files.append((os.path.getmtime(path), key, path))
+        for _, key, path in sorted(files):
+            size = os.path.getsize(path)
+            self._entries[key] = (path, size)
+            self.total_bytes += size
+
+    @staticmethod
+    def key(model: str, prompt: str, config_key: str) -> str:
+        payload = json.dumps([model, prompt, config_key], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _mime_suffix(mime_type: str) -> str:
+        return mime_type.replace("/", "_")
+
+    def contains(self, key: str) -> bool:
+        """Return True when key is cached, without counting a hit or a miss."""
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        """Return (image bytes, MIME type) for a cached key, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        path = entry[0]
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._drop(key)
+            return None
+        mime_type = os.path.basename(path).partition(".")[2].replace("_", "/", 1)
+        return data, mime_type
+
+    def put(self, key: str, data: bytes, mime_type: str):
+        """Store image bytes under key, evicting the least recently used images if needed."""
+        path = os.path.join(self.cache_dir, f"{key}.{self._mime_suffix(mime_type)}")
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (path, len(data))
+            self.total_bytes += len(data)
+            while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+                oldest = next(iter(self._entries))
+                self._drop(oldest, remove=True)
+                self.evictions += 1
+
+    def _drop(self, key: str, remove: bool = False):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.total_bytes -= entry[1]
+        if remove and os.path.exists(entry[0]):
+            os.remove(entry[0])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "images": len(self._entries),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class VisionManager:
+    """
+    Generates images for slides. Results are cached by (model, prompt, config), so repeated
+    prompts are neither regenerated nor re-billed, and at most max_concurrent generations run
+    at once. Calls for a prompt that is already being generated wait for that generation
+    instead of starting their own.
+    """
+
+    def __init__(self, executor_manager=None, generator=None, cache_dir: Optional[str] = None,
+                 cache_max_bytes: int = 256 * 1024 * 1024, max_concurrent: int = 4):
+        self.executor_manager = executor_manager
+        self.generator = generator or GeminiImageGenerator()
+        self.cache = ImageCache(cache_dir, cache_max_bytes) if cache_dir else None
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.generated = 0
+        self.deduplicated = 0
+
+    async def _run(self, func, *args):
+        if self.executor_manager is None:
+            return func(*args)
+        # The Gemini client and PIL are synchronous, keep them off the event loop
+        return await self.executor_manager.run_io(func, *args)
+
+    async def generate_and_save_image(self, prompt: str,
+                                      output_path: str) -> str:
+        """Generate an image using Gemini Model and save it to the specified path."""
+        key = ImageCache.key(self.generator.model, prompt, self.generator.config_key)
+        pending = self._in_flight.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._fetch_image(key, prompt))
+            self._in_flight[key] = pending
+            pending.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.deduplicated += 1
+        # A cancelled caller leaves the shared generation running for the others
+        img_data, mime_type = await asyncio.shield(pending)
+        return await self._run(self._save_image, img_data, mime_type, output_path)
+
+    async def _fetch_image(self, key: str, prompt: str) -> Tuple[bytes, str]:
+        async with self._slots:
+            return await self._run(self._cached_or_generated, key, prompt)
+
+    def _cached_or_generated(self, key: str, prompt: str) -> Tuple[bytes, str]:
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        img_data, mime_type = self.generator.generate(prompt)
+        with self._lock:
+            self.generated += 1
+        if self.cache is not None:
+            try:
+                self.cache.put(key, img_data, mime_type)
+            except OSError as e:
+                logger.warning(f"Unable to cache generated image: {str(e)}")
+        return img_data, mime_type
+
+    @staticmethod
+    def _save_image(img_data: bytes, mime_type: str, output_path: str) -> str:
+        try:
             # Ensure the save directory exists
             try:
                 os.makedirs(os.path.dirname(output_path), exist_ok=True)
             except OSError as e:
                 raise ValueError(
                     f"Failed to create a directory for image: str({e})")
-            # Save the image
-            image.save(output_path)
+
+            extension = os.path.splitext(output_path)[1].lower()
+            if extension in MIME_EXTENSIONS.get(mime_type, ()):
+                # Already in the requested format, write the bytes as they are
+                with open(output_path, "wb") as f:
+                    f.write(img_data)
+            else:
+                image = Image.open(BytesIO((img_data)))
+                image.save(output_path)
         except (IOError, OSError) as e:
             raise ValueError(
                 f"Failed to save image to {output_path}: {str(e)}")
 
         return output_path
+
+    def stats(self) -> Dict[str, Any]:
+        """Return generation, deduplication and cache counters."""
+        with self._lock:
+            generated = self.generated
+        return {
+            "generator": self.generator.model,
+            "generated": generated,
+            "deduplicated": self.deduplicated,
+            "in_flight": len(self._in_flight),
+            "cache": self.cache.stats() if self.cache is not None else None,
+        }
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from powerpoint.admission import CallAdmission, ServerBusyError
+
+
+async def hold(admission: CallAdmission, release: asyncio.Event, started: list):
+    async with admission.admit():
+        started.append(True)
+        await release.wait()
+
+
+async def settle():
+    # Let the started calls run up to their wait
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_calls_over_the_limit_wait_their_turn():
+    async def run():
+        admission = CallAdmission(max_concurrent=2, max_queued=4)
+        release, started = asyncio.Event(), []
+        calls = [asyncio.create_task(hold(admission, release, started)) for _ in range(3)]
+        await settle()
+        during = admission.stats()
+        release.set()
+        await asyncio.gather(*calls)
+        return during, admission.stats(), len(started)
+
+    during, after, started = asyncio.run(run())
+
+    assert (during["running"], during["waiting"]) == (2, 1)
+    assert started == 3
+    assert (after["running"], after["waiting"], after["admitted"], after["rejected"]) == (0, 0, 3, 0)
+    assert after["max_waiting"] == 1
+
+
+def test_calls_over_the_queue_limit_are_rejected():
+    async def run():
+        admission = CallAdmission(max_concurrent=1, max_queued=1)
+        release, started = asyncio.Event(), []
+        calls = [asyncio.create_task(hold(admission, release, started)) for _ in range(2)]
+        await settle()
+        with pytest.raises(ServerBusyError, match="Server busy: 1 calls running and 1 waiting"):
+            async with admission.admit():
+                pass
+        during = admission.stats()
+        release.set()
+        await asyncio.gather(*calls)
+        # With the queue drained, calls are admitted again
+        async with admission.admit():
+            pass
+        return during, admission.stats()
+
+    during, after = asyncio.run(run())
+
+    assert (during["running"], during["waiting"], during["rejected"]) == (1, 1, 1)
+    assert (after["admitted"], after["rejected"], after["max_waiting"]) == (3, 1, 1)
+
+
+def test_without_a_queue_only_running_calls_are_admitted():
+    async def run():
+        admission = CallAdmission(max_concurrent=2, max_queued=0)
+        release, started = asyncio.Event(), []
+        calls = [asyncio.create_task(hold(admission, release, started)) for _ in range(2)]
+        await settle()
+        with pytest.raises(ServerBusyError):
+            async with admission.admit():
+                pass
+        release.set()
+        await asyncio.gather(*calls)
+        return admission.stats()
+
+    stats = asyncio.run(run())
+
+    assert (stats["admitted"], stats["rejected"]) == (2, 1)
+
+
+def test_unlimited_admission_never_rejects():
+    async def run():
+        admission = CallAdmission(max_concurrent=0, max_queued=0)
+        release, started = asyncio.Event(), []
+        calls = [asyncio.create_task(hold(admission, release, started)) for _ in range(10)]
+        await settle()
+        running = admission.stats()["running"]
+        release.set()
+        await asyncio.gather(*calls)
+        return running, admission.stats()
+
+    running, stats = asyncio.run(run())
+
+    assert running == 10
+    assert (stats["admitted"], stats["rejected"], stats["waiting"]) == (10, 0, 0)
+
+
+@pytest.mark.parametrize("options", [{"max_concurrent": -1}, {"max_queued": -1}])
+def test_negative_limits_are_rejected(options):
+    with pytest.raises(ValueError, match="must not be negative"):
+        CallAdmission(**options)
@@ -0,0 +1,69 @@
+import pytest
+from pptx import Presentation
+from pptx.enum.chart import XL_CHART_TYPE
+
+from powerpoint.chart_manager import ChartManager
+from powerpoint.deck_builder import DeckBuilder
+from powerpoint.presentation_manager import PresentationManager
+
+VALUES = [float(index % 17) for index in range(50)]
+
+
+def test_single_series_is_a_column_chart_by_default():
+    data = {"categories": [f"Item {index}" for index in range(50)],
+            "series": [{"name": "Values", "values": VALUES}]}
+
+    assert ChartManager().determine_chart_type(data) == (XL_CHART_TYPE.COLUMN_CLUSTERED, "category")
+
+
+def test_histogram_is_opt_in():
+    manager = ChartManager()
+    data = {"series": [{"name": "Latency", "values": VALUES}]}
+
+    assert manager.determine_chart_type(data)[1] == "category"
+    assert manager.data_errors(data, "category") == ["categories: is required"]
+    assert manager.determine_chart_type(dict(data, histogram=True)) == \
+        (XL_CHART_TYPE.COLUMN_CLUSTERED, "histogram")
+
+
+def test_histogram_needs_one_numeric_series():
+    data = {"histogram": True, "series": [{"name": "A", "values": VALUES},
+                                          {"name": "B", "values": VALUES}]}
+
+    with pytest.raises(ValueError, match="one series"):
+        ChartManager().determine_chart_type(data)
+
+
+def test_histogram_is_binned_on_the_slide():
+    manager = ChartManager()
+    data = {"histogram": True, "series": [{"name": "Latency", "values": VALUES}]}
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[5])
+
+    chart_type, chart_format = manager.determine_chart_type(data)
+    chart = manager.add_chart_to_slide(slide, chart_type, data, chart_format)
+
+    counts = chart.plots[0].series[0].values
+    assert sum(counts) == len(VALUES)
+    assert len(counts) < len(VALUES)
+
+
+def test_validate_checks_categories_and_series_lengths():
+    builder = DeckBuilder(PresentationManager(), ChartManager())
+    slides = [
+        {"type": "chart", "title": "No categories",
+         "data": {"series": [{"name": "A", "values": [1, 2, 3]}]}},
+        {"type": "chart", "title": "Short series",
+         "data": {"categories": ["x", "y", "z"], "series": [{"name": "A", "values": [1, 2, 3]},
+                                                            {"name": "B", "values": [1, 2]}]}},
+        {"type": "chart", "title": "Histogram",
+         "data": {"histogram": True, "series": [{"name": "A", "values": VALUES}]}},
+    ]
+
+    with pytest.raises(ValueError) as error:
+        builder.validate(slides, lambda name: name)
+
+    assert str(error.value).splitlines()[1:] == [
+        "slides[0].data.categories: is required",
+        "slides[1].data.series[1].values: has 2 values for 3 categories",
+    ]
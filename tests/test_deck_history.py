@@ -0,0 +1,109 @@
+import zipfile
+from io import BytesIO
+
+import pytest
+from pptx import Presentation
+
+from powerpoint.chart_manager import ChartManager
+from powerpoint.deck_builder import DeckBuilder
+from powerpoint.presentation_manager import PresentationManager
+from powerpoint.save_manager import SaveManager
+
+
+@pytest.fixture(params=[True, False], ids=["incremental", "full"])
+def save_manager(request):
+    manager = SaveManager("memory", incremental=request.param, compress_workers=1)
+    yield manager
+    manager.close()
+
+
+@pytest.fixture
+def manager():
+    manager = PresentationManager()
+    manager.set_presentation("deck", Presentation())
+    return manager
+
+
+def reopen(manager: PresentationManager, save_manager: SaveManager):
+    """Save the deck, check the archive and return it opened again."""
+    with save_manager.serialize(manager.get_presentation("deck"), "deck.pptx") as deck:
+        data = bytes(deck.data)
+    with zipfile.ZipFile(BytesIO(data)) as archive:
+        assert archive.testzip() is None
+        slide_parts = sorted(name for name in archive.namelist()
+                             if name.startswith("ppt/slides/slide") and name.endswith(".xml"))
+    prs = Presentation(BytesIO(data))
+    assert len(slide_parts) == len(prs.slides)
+    return prs
+
+
+def titles(prs):
+    return [slide.shapes.title.text for slide in prs.slides]
+
+
+def test_undo_and_redo_survive_save(manager, save_manager):
+    for title in ("One", "Two", "Three"):
+        manager.add_title_only_slide("deck", title)
+    assert titles(reopen(manager, save_manager)) == ["One", "Two", "Three"]
+
+    assert manager.undo("deck", 2) == ["Add title only slide 'Three'", "Add title only slide 'Two'"]
+    assert titles(reopen(manager, save_manager)) == ["One"]
+
+    assert manager.redo("deck") == ["Add title only slide 'Two'"]
+    assert titles(reopen(manager, save_manager)) == ["One", "Two"]
+    assert manager.history("deck") == (["Add title only slide 'Two'", "Add title only slide 'One'"],
+                                       ["Add title only slide 'Three'"])
+
+
+def test_new_slide_after_undo_clears_redo(manager, save_manager):
+    manager.add_title_only_slide("deck", "One")
+    manager.add_title_only_slide("deck", "Two")
+    manager.undo("deck")
+    manager.add_title_only_slide("deck", "Replacement")
+
+    assert manager.redo("deck") == []
+    assert titles(reopen(manager, save_manager)) == ["One", "Replacement"]
+
+
+def test_failed_edit_is_rolled_back(manager, save_manager):
+    manager.add_title_only_slide("deck", "Kept")
+
+    with pytest.raises(RuntimeError):
+        with manager.transaction("deck", "Half built"):
+            manager.add_title_only_slide("deck", "Orphan")
+            raise RuntimeError("chart failed")
+
+    assert manager.history("deck") == (["Add title only slide 'Kept'"], [])
+    assert titles(reopen(manager, save_manager)) == ["Kept"]
+
+
+def test_build_rolls_back_failed_slides_and_undoes_as_one(manager, save_manager, tmp_path):
+    image = tmp_path / "broken.png"
+    image.write_bytes(b"not an image")
+    builder = DeckBuilder(manager, ChartManager())
+    slides = builder.validate([
+        {"type": "title", "title": "Cover"},
+        {"type": "picture-with-caption", "title": "Broken", "caption": "x", "image_path": "broken.png"},
+        {"type": "title-content", "title": "Agenda", "content": "One\nTwo"},
+    ], lambda name: str(tmp_path / name))
+
+    results = builder.build("deck", slides)
+
+    assert [result["status"] for result in results] == ["ok", "error", "ok"]
+    assert titles(reopen(manager, save_manager)) == ["Cover", "Agenda"]
+
+    assert manager.undo("deck") == ["Build 3 slides"]
+    assert titles(reopen(manager, save_manager)) == []
+    manager.redo("deck")
+    assert titles(reopen(manager, save_manager)) == ["Cover", "Agenda"]
+
+
+def test_undo_refuses_a_deck_changed_behind_its_history(manager):
+    manager.add_title_only_slide("deck", "One")
+    prs = manager.get_presentation("deck")
+    # An edit outside a transaction, e.g. a slide removed directly
+    prs.slides._sldIdLst.remove(prs.slides._sldIdLst[-1])
+
+    with pytest.raises(ValueError, match="history was cleared"):
+        manager.undo("deck")
+    assert manager.history("deck") == ([], [])
@@ -0,0 +1,62 @@
+import random
+
+import pytest
+from pptx.enum.chart import XL_CHART_TYPE
+
+from powerpoint import downsample
+from powerpoint.chart_manager import ChartManager
+from powerpoint.downsample import min_max_fill
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        if numpy is None:
+            pytest.skip("numpy is not installed")
+    else:
+        monkeypatch.setattr(downsample, "numpy", None)
+    return request.param
+
+
+def random_columns(series: int, points: int):
+    rng = random.Random(series * 7919 + points)
+    return [[rng.gauss(0, 1) for _ in range(points)] for _ in range(series)]
+
+
+@pytest.mark.parametrize("series", [1, 2, 4])
+@pytest.mark.parametrize("points", [500, 5000])
+def test_min_max_fill_uses_its_budget(backend, series, points):
+    columns = random_columns(series, points)
+
+    indices = min_max_fill(columns, 100)
+
+    assert 90 <= len(indices) <= 100
+    assert indices == sorted(set(indices))
+    assert indices[0] == 0 and indices[-1] == points - 1
+    # Every series keeps its extremes
+    for column in columns:
+        assert column.index(min(column)) in indices
+        assert column.index(max(column)) in indices
+
+
+def test_min_max_fill_keeps_short_data(backend):
+    assert min_max_fill([[1, 2, 3]], 10) == [0, 1, 2]
+
+
+def test_category_chart_is_reduced_to_its_budget(backend):
+    columns = random_columns(2, 2000)
+    data = {"categories": [f"Day {index}" for index in range(2000)],
+            "series": [{"name": f"Series {index}", "values": values}
+                       for index, values in enumerate(columns)],
+            "max_points": 200}
+
+    reduced, summary = ChartManager().downsample(data, XL_CHART_TYPE.COLUMN_CLUSTERED)
+
+    assert summary["method"] == "min-max"
+    assert 180 <= summary["points"] <= 200
+    assert len(reduced["categories"]) == summary["points"] // 2
@@ -0,0 +1,207 @@
+import asyncio
+import os
+import random
+from io import BytesIO
+
+import pytest
+from PIL import Image, ImageFile
+
+from powerpoint import image_processor
+from powerpoint.image_processor import ImageProcessor, prepare_image
+from powerpoint.pagination import EMU_PER_INCH
+
+# A 2 x 1.5 inch box holds 300 x 225 pixels at the default 150 dpi
+BOX = (2 * EMU_PER_INCH, int(1.5 * EMU_PER_INCH))
+ORIENTATION = 0x0112
+IMAGE_DESCRIPTION = 0x010E
+
+
+def noise(size, mode="RGB", seed=1) -> Image.Image:
+    """A photo-like image: far more distinct colours than a chart or a logo."""
+    rng = random.Random(seed)
+    return Image.frombytes(mode, size, rng.randbytes(size[0] * size[1] * len(mode)))
+
+
+def flat(size, mode="RGB") -> Image.Image:
+    image = Image.new(mode, size, (30, 90, 200) if mode == "RGB" else (30, 90, 200, 128))
+    image.paste((250, 250, 250) if mode == "RGB" else (250, 250, 250, 255), (0, 0, size[0] // 2, size[1]))
+    return image
+
+
+def write(tmp_path, image: Image.Image, name: str, **options) -> str:
+    path = str(tmp_path / name)
+    image.save(path, **options)
+    return path
+
+
+def opened(prepared) -> Image.Image:
+    return Image.open(BytesIO(prepared.data))
+
+
+def test_large_photo_is_downscaled_to_the_box_as_jpeg(tmp_path):
+    path = write(tmp_path, noise((1200, 900)), "photo.png")
+
+    prepared = prepare_image(path, *BOX)
+
+    assert prepared.resized
+    assert prepared.format == "JPEG"
+    assert opened(prepared).format == "JPEG"
+    assert prepared.size == opened(prepared).size == (300, 225)
+    assert prepared.original_bytes == os.path.getsize(path)
+    assert prepared.bytes_saved == prepared.original_bytes - len(prepared.data) > 0
+
+
+def test_dpi_sets_the_pixel_size(tmp_path):
+    path = write(tmp_path, noise((1200, 900)), "photo.png")
+
+    assert prepare_image(path, *BOX, dpi=75).size == (149, 112)
+    assert prepare_image(path, *BOX, dpi=600).size == (1200, 900)
+
+
+@pytest.mark.parametrize("image, name", [(flat((1200, 900)), "chart.png"),
+                                         (flat((1200, 900), "RGBA"), "logo.png")])
+def test_flat_and_transparent_images_stay_png(tmp_path, image, name):
+    path = write(tmp_path, image, name)
+
+    prepared = prepare_image(path, *BOX)
+
+    assert prepared.format == "PNG"
+    assert opened(prepared).mode == image.mode
+    assert prepared.size == (300, 225)
+
+
+def test_photo_saved_as_png_is_converted_to_jpeg_at_its_size(tmp_path):
+    path = write(tmp_path, noise((200, 150)), "small-photo.png")
+
+    prepared = prepare_image(path, *BOX)
+
+    assert not prepared.resized
+    assert prepared.format == "JPEG"
+    assert prepared.bytes_saved > 0
+
+
+def test_exif_is_stripped_and_orientation_applied(tmp_path):
+    exif = Image.Exif()
+    exif[ORIENTATION] = 6
+    path = write(tmp_path, noise((1200, 900)), "rotated.jpg", exif=exif.tobytes())
+
+    prepared = prepare_image(path, *BOX)
+
+    # Rotated a quarter turn, then fitted to the box
+    assert prepared.size == (169, 225)
+    assert not opened(prepared).getexif()
+
+
+def test_small_image_with_exif_is_reencoded_without_it(tmp_path):
+    exif = Image.Exif()
+    exif[IMAGE_DESCRIPTION] = "x" * 30000
+    path = write(tmp_path, noise((100, 80)), "tagged.jpg", exif=exif.tobytes())
+
+    prepared = prepare_image(path, *BOX)
+
+    assert not prepared.resized
+    assert not opened(prepared).getexif()
+    assert prepared.bytes_saved > 30000
+
+
+@pytest.mark.parametrize("image, name", [(noise((200, 150)), "fits.jpg"),
+                                         (flat((200, 150), "RGBA"), "fits.png"),
+                                         (flat((200, 150)).convert("P"), "fits.gif")])
+def test_image_that_fits_is_embedded_without_decoding(tmp_path, monkeypatch, image, name):
+    path = write(tmp_path, image, name)
+
+    def load(self):
+        raise AssertionError("the image was decoded")
+
+    monkeypatch.setattr(ImageFile.ImageFile, "load", load)
+    prepared = prepare_image(path, *BOX)
+
+    with open(path, "rb") as f:
+        assert prepared.data == f.read()
+    assert not prepared.resized
+    assert prepared.bytes_saved == 0
+
+
+def test_animation_is_kept(tmp_path):
+    frames = [flat((600, 450)).convert("P"), noise((600, 450)).convert("P")]
+    path = str(tmp_path / "animated.gif")
+    frames[0].save(path, save_all=True, append_images=frames[1:])
+
+    prepared = prepare_image(path, *BOX)
+
+    assert prepared.format == "GIF"
+    assert prepared.bytes_saved == 0
+    assert opened(prepared).n_frames == 2
+
+
+def test_invalid_image_is_rejected(tmp_path):
+    path = tmp_path / "broken.png"
+    path.write_bytes(b"not an image")
+
+    with pytest.raises(ValueError, match="broken.png is not a valid image"):
+        prepare_image(str(path), *BOX)
+
+
+def test_bytes_saved_are_counted_per_presentation(tmp_path):
+    processor = ImageProcessor()
+    photo = asyncio.run(processor.prepare(write(tmp_path, noise((1200, 900)), "photo.png"), BOX))
+    logo = asyncio.run(processor.prepare(write(tmp_path, flat((200, 150), "RGBA"), "logo.png"), BOX))
+
+    processor.record("a", photo)
+    processor.record("a", logo)
+    processor.record("b", photo)
+
+    stats = processor.stats()
+    assert stats["presentations"]["a"] == {
+        "images": 2,
+        "original_bytes": photo.original_bytes + logo.original_bytes,
+        "bytes": photo.bytes + logo.bytes,
+        "bytes_saved": photo.bytes_saved,
+    }
+    assert stats["presentations"]["b"]["bytes_saved"] == photo.bytes_saved
+    assert stats["bytes_saved"] == 2 * photo.bytes_saved
+
+
+def test_disabled_processor_prepares_nothing(tmp_path):
+    processor = ImageProcessor(dpi=0)
+    path = write(tmp_path, noise((1200, 900)), "photo.png")
+
+    assert asyncio.run(processor.prepare(path, BOX)) is None
+
+
+def test_prepared_images_are_reused_while_the_file_is_unchanged(tmp_path, monkeypatch):
+    calls = []
+
+    def counting_prepare(*args):
+        calls.append(args)
+        return prepare_image(*args)
+
+    monkeypatch.setattr(image_processor, "prepare_image", counting_prepare)
+    processor = ImageProcessor()
+    path = write(tmp_path, noise((1200, 900)), "photo.png")
+
+    first = asyncio.run(processor.prepare(path, BOX))
+    assert asyncio.run(processor.prepare(path, BOX)) is first
+    assert len(calls) == 1
+
+    # Another box, or a changed file, is prepared again
+    asyncio.run(processor.prepare(path, (BOX[0] // 2, BOX[1] // 2)))
+    noise((1200, 900), seed=2).save(path)
+    os.utime(path, ns=(0, 1))
+    changed = asyncio.run(processor.prepare(path, BOX))
+
+    assert len(calls) == 3
+    assert changed is not first and changed.key != first.key
+    stats = processor.stats()
+    assert (stats["hits"], stats["misses"], stats["cached_images"]) == (1, 3, 3)
+    assert stats["cached_bytes"] == sum(image.bytes for image in processor._prepared.values())
+
+
+def test_cache_is_bounded(tmp_path):
+    processor = ImageProcessor(cache_max_bytes=1)
+    path = write(tmp_path, noise((1200, 900)), "photo.png")
+
+    asyncio.run(processor.prepare(path, BOX))
+
+    assert processor.stats()["cached_images"] == 0
+    assert processor.stats()["cached_bytes"] == 0
@@ -0,0 +1,138 @@
+import asyncio
+import builtins
+import hashlib
+import json
+import random
+import types as pytypes
+
+import mcp.types as types
+import pytest
+from PIL import Image
+from pptx import Presentation
+
+from powerpoint import media_store
+from powerpoint.image_processor import ImageProcessor
+from powerpoint.media_store import MediaStore
+from powerpoint.pagination import EMU_PER_INCH
+from powerpoint.presentation_manager import PresentationManager
+from powerpoint.server import create_server
+
+BOX = (2 * EMU_PER_INCH, int(1.5 * EMU_PER_INCH))
+
+
+def write_photo(path, size=(1200, 900)):
+    rng = random.Random(3)
+    Image.frombytes("RGB", size, rng.randbytes(size[0] * size[1] * 3)).save(path)
+    return str(path)
+
+
+@pytest.fixture
+def opened_paths(monkeypatch):
+    """Record the path of every file opened for reading through open(), in any thread."""
+    paths = []
+    real_open = builtins.open
+
+    def recording_open(file, mode="r", *args, **kwargs):
+        if "r" in mode and "+" not in mode:
+            paths.append(str(file))
+        return real_open(file, mode, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "open", recording_open)
+    return paths
+
+
+@pytest.fixture
+def hashed(monkeypatch):
+    """Count the images the store hashes."""
+    blobs = []
+
+    def sha256(blob):
+        blobs.append(blob)
+        return hashlib.sha256(blob)
+
+    monkeypatch.setattr(media_store, "hashlib", pytypes.SimpleNamespace(sha256=sha256))
+    return blobs
+
+
+def test_unchanged_file_is_not_read_again(tmp_path, opened_paths):
+    store = MediaStore()
+    path = write_photo(tmp_path / "logo.png")
+
+    first = store.image(path)
+    assert store.image(path) is first
+
+    assert opened_paths.count(path) == 1
+    assert (store.stats()["misses"], store.stats()["hits"]) == (1, 1)
+
+
+def test_prepared_image_is_not_hashed_again(tmp_path, hashed):
+    store = MediaStore()
+    processor = ImageProcessor()
+    path = write_photo(tmp_path / "logo.png")
+
+    prepared = asyncio.run(processor.prepare(path, BOX))
+    first = store.image(prepared)
+    assert store.image(asyncio.run(processor.prepare(path, BOX))) is first
+
+    assert len(hashed) == 1
+    assert first.blob is prepared.data
+    assert (store.stats()["misses"], store.stats()["hits"]) == (1, 1)
+
+
+def test_prepared_images_of_different_files_share_identical_bytes(tmp_path, hashed):
+    store = MediaStore()
+    processor = ImageProcessor()
+    one = write_photo(tmp_path / "one.png")
+    two = write_photo(tmp_path / "two.png")
+
+    first = store.image(asyncio.run(processor.prepare(one, BOX)))
+    second = store.image(asyncio.run(processor.prepare(two, BOX)))
+
+    # Other keys, so the bytes are hashed, and found to be the same image
+    assert len(hashed) == 2
+    assert second is first
+
+
+def test_second_insert_of_a_prepared_file_reads_nothing(tmp_path, opened_paths):
+    manager = PresentationManager()
+    manager.set_presentation("deck", Presentation())
+    processor = ImageProcessor()
+    path = write_photo(tmp_path / "photo.png")
+    box = manager.picture_placeholder_size("deck")
+
+    for title in ("One", "Two"):
+        image = asyncio.run(processor.prepare(path, box))
+        manager.add_picture_with_caption_slide("deck", title, image, "Caption")
+
+    assert opened_paths.count(path) == 1
+    assert processor.stats()["hits"] == 1
+    assert manager.media_store.stats()["hits"] == 1
+    # Both slides show the one image part
+    prs = manager.get_presentation("deck")
+    assert len({part.partname for part in prs.part.package.iter_parts()
+                if part.partname.startswith("/ppt/media/")}) == 1
+
+
+def test_build_prepares_a_repeated_image_once(tmp_path, opened_paths):
+    server, shutdown = create_server(str(tmp_path), "http://127.0.0.1:1", "token", image_generator="fake")
+    call_tool = server.request_handlers[types.CallToolRequest]
+    path = write_photo(tmp_path / "logo.png")
+
+    async def call(name, arguments):
+        request = types.CallToolRequest(method="tools/call",
+                                        params=types.CallToolRequestParams(name=name, arguments=arguments))
+        return (await call_tool(request)).root
+
+    slides = [{"type": "picture-with-caption", "title": f"Slide {index}", "caption": "Logo",
+               "image_path": "logo.png"} for index in range(3)]
+    try:
+        result = asyncio.run(call("build-presentation", {"name": "deck", "slides": slides}))
+        stats = json.loads(asyncio.run(call("get-server-stats", {})).content[0].text)
+    finally:
+        shutdown()
+
+    assert not result.isError
+    assert opened_paths.count(path) == 1
+    assert stats["image_processing"]["misses"] == 1
+    assert stats["image_processing"]["presentations"]["deck"]["images"] == 3
+    assert (stats["media"]["misses"], stats["media"]["hits"]) == (1, 2)
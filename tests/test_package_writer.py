@@ -0,0 +1,147 @@
+import zipfile
+from io import BytesIO
+
+import pytest
+from PIL import Image
+from pptx import Presentation
+from pptx.chart.data import CategoryChartData
+from pptx.enum.chart import XL_CHART_TYPE
+from pptx.util import Inches
+
+from powerpoint import package_writer
+from powerpoint.package_writer import PptxPackageWriter
+from powerpoint.save_manager import SaveManager
+from powerpoint.session_store import PresentationStore
+
+
+def png_bytes(colour) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (320, 240), colour).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def add_slides(prs, start: int, count: int):
+    for index in range(start, start + count):
+        slide = prs.slides.add_slide(prs.slide_layouts[5])
+        slide.shapes.title.text = f"Slide {index}"
+        if index % 3 == 1:
+            slide.shapes.add_picture(BytesIO(png_bytes((index * 40 % 256, 80, 160))),
+                                     Inches(1), Inches(2))
+        elif index % 3 == 2:
+            data = CategoryChartData()
+            data.categories = ["North", "South", "East"]
+            data.add_series("Sales", (index, index * 2, index * 3))
+            slide.shapes.add_chart(XL_CHART_TYPE.COLUMN_CLUSTERED, Inches(1), Inches(2),
+                                   Inches(6), Inches(4), data)
+
+
+def reference_names(prs) -> set:
+    buffer = BytesIO()
+    prs.save(buffer)
+    with zipfile.ZipFile(buffer) as archive:
+        return set(archive.namelist())
+
+
+def check_round_trip(prs, data: bytes):
+    """The archive is valid, holds what python-pptx would write and reopens with the same slides."""
+    with zipfile.ZipFile(BytesIO(data)) as archive:
+        assert archive.testzip() is None
+        assert set(archive.namelist()) == reference_names(prs)
+    reopened = Presentation(BytesIO(data))
+    assert [slide.shapes.title.text for slide in reopened.slides] == \
+        [slide.shapes.title.text for slide in prs.slides]
+
+
+def save(writer: PptxPackageWriter, prs) -> bytes:
+    buffer = BytesIO()
+    writer.write(prs, buffer)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("incremental", [False, True])
+@pytest.mark.parametrize("workers", [1, 4])
+def test_saves_round_trip(incremental, workers):
+    writer = PptxPackageWriter(incremental=incremental, workers=workers)
+    prs = Presentation()
+    add_slides(prs, 0, 6)
+    try:
+        check_round_trip(prs, save(writer, prs))
+
+        # Edit the deck and save it again, reusing the unchanged parts when incremental
+        add_slides(prs, 6, 3)
+        prs.slides[0].shapes.title.text = "Renamed"
+        check_round_trip(prs, save(writer, prs))
+        check_round_trip(prs, save(writer, prs))
+    finally:
+        writer.close()
+
+    stats = writer.stats()
+    assert stats["saves"] == 3
+    if incremental:
+        assert stats["parts_reused"] > 0
+    else:
+        assert stats["parts_reused"] == 0
+
+
+def test_incremental_save_writes_changed_parts_again():
+    writer = PptxPackageWriter(workers=1)
+    prs = Presentation()
+    add_slides(prs, 0, 3)
+    save(writer, prs)
+    written = writer.stats()["parts_written"]
+
+    prs.slides[1].shapes.title.text = "Changed"
+    data = save(writer, prs)
+
+    check_round_trip(prs, data)
+    assert Presentation(BytesIO(data)).slides[1].shapes.title.text == "Changed"
+    assert writer.stats()["parts_written"] < 2 * written
+
+
+def test_large_deck_is_saved_with_zip64(monkeypatch):
+    writer = PptxPackageWriter(workers=1)
+    prs = Presentation()
+    add_slides(prs, 0, 3)
+    save(writer, prs)
+    assert writer.cached_bytes(prs) > 0
+
+    monkeypatch.setattr(package_writer, "_ZIP_LIMIT", 1024)
+    data = save(writer, prs)
+
+    check_round_trip(prs, data)
+    assert writer.stats()["zip64_saves"] == 1
+    assert writer.cached_bytes(prs) == 0
+
+
+@pytest.mark.parametrize("mode", ["memory", "mmap", "disk"])
+def test_save_modes_round_trip(mode, tmp_path):
+    save_manager = SaveManager(mode, spool_dir=str(tmp_path), compress_workers=1)
+    prs = Presentation()
+    add_slides(prs, 0, 4)
+    path = str(tmp_path / "deck.pptx")
+    try:
+        for _ in range(2):
+            with save_manager.serialize(prs, path) as deck:
+                check_round_trip(prs, bytes(deck.data))
+        if mode == "disk":
+            check_round_trip(prs, (tmp_path / "deck.pptx").read_bytes())
+    finally:
+        save_manager.close()
+
+
+def test_store_counts_incremental_save_cache(tmp_path):
+    save_manager = SaveManager("memory", compress_workers=1)
+    store = PresentationStore(spill_dir=str(tmp_path), cached_bytes=save_manager.cached_bytes)
+    prs = Presentation()
+    add_slides(prs, 0, 4)
+    store["deck"] = prs
+    before = store.resident_bytes()
+
+    with save_manager.serialize(prs, "deck.pptx"):
+        pass
+    cached = save_manager.cached_bytes(prs)
+    assert cached > 0
+    assert store.resident_bytes() == before + cached
+
+    assert save_manager.forget(prs)
+    assert store.resident_bytes() == before
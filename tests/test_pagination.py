@@ -0,0 +1,181 @@
+import pytest
+from pptx import Presentation
+from pptx.util import Inches
+
+from powerpoint.pagination import (AVERAGE_CHAR_WIDTH, EMU_PER_INCH, EMU_PER_POINT, content_bottom,
+                                   estimate_row_height, estimate_text_lines, line_height,
+                                   paginate_lines, paginate_rows)
+from powerpoint.presentation_manager import PresentationManager
+
+FONT_SIZE = 10
+# A width that fits exactly 20 characters at FONT_SIZE
+WIDTH_20_CHARS = int(20 * FONT_SIZE * AVERAGE_CHAR_WIDTH * EMU_PER_POINT)
+
+
+@pytest.fixture
+def manager():
+    manager = PresentationManager()
+    manager.set_presentation("deck", Presentation())
+    return manager
+
+
+def table_cells(slide):
+    table = next(shape for shape in slide.shapes if shape.has_table).table
+    return [[cell.text for cell in row.cells] for row in table.rows]
+
+
+def test_text_wraps_at_the_character_budget():
+    assert estimate_text_lines("x" * 20, WIDTH_20_CHARS, FONT_SIZE) == 1
+    assert estimate_text_lines("x" * 21, WIDTH_20_CHARS, FONT_SIZE) == 2
+    assert estimate_text_lines("", WIDTH_20_CHARS, FONT_SIZE) == 1
+    # Explicit breaks start new lines, empty ones included
+    assert estimate_text_lines("a\n\n" + "x" * 41, WIDTH_20_CHARS, FONT_SIZE) == 5
+    # A box narrower than one character still fits one per line
+    assert estimate_text_lines("abc", 1, FONT_SIZE) == 3
+
+
+def test_row_height_grows_with_wrapped_cells():
+    min_height = Inches(0.4)
+    col_width = WIDTH_20_CHARS + 2 * int(0.1 * EMU_PER_INCH)
+
+    assert estimate_row_height(["short", 1.5], col_width, FONT_SIZE, min_height) == min_height
+    tall = estimate_row_height(["short", "x" * 200], col_width, FONT_SIZE, min_height)
+    assert tall == 10 * line_height(FONT_SIZE) + 2 * int(0.05 * EMU_PER_INCH)
+
+
+def test_rows_fill_the_budget_exactly():
+    rows = [[index] for index in range(10)]
+
+    # The header takes 100 of 1100, leaving room for exactly ten rows of 100
+    assert paginate_rows(rows, 100, 1100, lambda row: 100) == [(0, 10)]
+    assert paginate_rows(rows, 100, 1099, lambda row: 100) == [(0, 9), (9, 10)]
+    assert paginate_rows(rows, 100, 400, lambda row: 100) == [(0, 3), (3, 6), (6, 9), (9, 10)]
+
+
+def test_every_page_leaves_room_for_the_header():
+    rows = [[index] for index in range(6)]
+
+    assert paginate_rows(rows, 0, 300, lambda row: 100) == [(0, 3), (3, 6)]
+    assert paginate_rows(rows, 100, 300, lambda row: 100) == [(0, 2), (2, 4), (4, 6)]
+
+
+def test_row_taller_than_the_page_gets_a_page_of_its_own():
+    heights = [100, 5000, 100, 100]
+    rows = [[index] for index in range(len(heights))]
+
+    pages = paginate_rows(rows, 100, 1000, lambda row: heights[row[0]])
+
+    assert pages == [(0, 1), (1, 2), (2, 4)]
+
+
+def test_no_rows_is_one_empty_page():
+    assert paginate_rows([], 100, 1000, lambda row: 100) == [(0, 0)]
+    # A header taller than the slide still leaves every row a page
+    assert paginate_rows([[1], [2]], 5000, 1000, lambda row: 100) == [(0, 1), (1, 2)]
+
+
+def test_lines_fill_the_budget_exactly():
+    one_bullet = int(line_height(FONT_SIZE) * 1.2)
+    items = [(0, f"Bullet {index}") for index in range(6)]
+
+    pages = paginate_lines(items, WIDTH_20_CHARS, 3 * one_bullet, [FONT_SIZE], [0])
+    assert pages == [items[:3], items[3:]]
+    pages = paginate_lines(items, WIDTH_20_CHARS, 3 * one_bullet - 1, [FONT_SIZE], [0])
+    assert pages == [items[:2], items[2:4], items[4:]]
+    # Without spacing between paragraphs, the same height holds more bullets
+    pages = paginate_lines(items, WIDTH_20_CHARS, 3 * one_bullet, [FONT_SIZE], [0], paragraph_spacing=0)
+    assert pages == [items[:3], items[3:]]
+    pages = paginate_lines(items, WIDTH_20_CHARS, 3 * line_height(FONT_SIZE), [FONT_SIZE], [0],
+                           paragraph_spacing=0)
+    assert pages == [items[:3], items[3:]]
+
+
+def test_long_line_gets_a_page_of_its_own():
+    one_bullet = int(line_height(FONT_SIZE) * 1.2)
+    items = [(0, "Short"), (0, "x" * 2000), (0, "Short again")]
+
+    pages = paginate_lines(items, WIDTH_20_CHARS, 4 * one_bullet, [FONT_SIZE], [0])
+
+    assert pages == [[items[0]], [items[1]], [items[2]]]
+
+
+def test_deep_levels_use_the_last_level_style():
+    items = [(0, "Top"), (5, "x" * 30)]
+    # The second level's indent leaves room for ten characters, so the deep bullet takes three lines
+    indent = WIDTH_20_CHARS // 2
+    height = int(line_height(FONT_SIZE) * 1.2) + int(line_height(FONT_SIZE) * 3.2)
+
+    assert paginate_lines(items, WIDTH_20_CHARS, height, [FONT_SIZE, FONT_SIZE], [0, indent]) == [items]
+    assert paginate_lines(items, WIDTH_20_CHARS, height - 1, [FONT_SIZE, FONT_SIZE], [0, indent]) == \
+        [items[:1], items[1:]]
+
+
+def test_table_continues_with_repeated_headers(manager):
+    rows = [[f"Row {index}", index] for index in range(40)]
+
+    slides = manager.add_table_slide("deck", "Sales", ["Region", "Total"], rows)
+
+    assert len(slides) > 1
+    assert [slide.shapes.title.text for slide in slides] == ["Sales"] + ["Sales (cont.)"] * (len(slides) - 1)
+    body = []
+    for slide in slides:
+        cells = table_cells(slide)
+        assert cells[0] == ["Region", "Total"]
+        body.extend(cells[1:])
+    assert body == [[f"Row {index}", str(index)] for index in range(40)]
+
+
+def test_tables_stay_above_the_footer(manager):
+    prs = manager.get_presentation("deck")
+    rows = [[f"Row {index}", "x" * (index % 5 * 40)] for index in range(30)]
+
+    slides = manager.add_table_slide("deck", "Notes", ["Name", "Text"], rows)
+
+    bottom = content_bottom(prs.slide_layouts[manager.SLIDE_LAYOUT_TITLE_ONLY], prs.slide_height)
+    for slide in slides:
+        table = next(shape for shape in slide.shapes if shape.has_table)
+        header_height = estimate_row_height(["Name", "Text"], Inches(4), 11, Inches(0.4))
+        rows_height = sum(estimate_row_height([cell.text for cell in row.cells], Inches(4), 10, Inches(0.4))
+                          for row in list(table.table.rows)[1:])
+        # Only a page holding a single row may run over
+        assert table.top + header_height + rows_height <= bottom or len(table.table.rows) == 2
+
+
+def test_table_with_a_very_long_row(manager):
+    rows = [["Short", "a"], ["Long", "word " * 2000], ["Short again", "b"]]
+
+    slides = manager.add_table_slide("deck", "Notes", ["Name", "Text"], rows)
+
+    assert [table_cells(slide)[1:] for slide in slides] == \
+        [[["Short", "a"]], [["Long", "word " * 2000]], [["Short again", "b"]]]
+
+
+def test_unpaginated_table_stays_on_one_slide(manager):
+    rows = [[f"Row {index}", index] for index in range(40)]
+
+    slides = manager.add_table_slide("deck", "Sales", ["Region", "Total"], rows, paginate=False)
+
+    assert len(slides) == 1
+    assert len(table_cells(slides[0])) == 41
+
+
+def test_content_continues_on_further_slides(manager):
+    content = "\n".join(f"Point {index}" + ("\n\tDetail" if index % 2 else "") for index in range(30))
+
+    slides = manager.add_title_with_content_slide("deck", "Agenda", content)
+
+    assert len(slides) > 1
+    assert [slide.shapes.title.text for slide in slides] == ["Agenda"] + ["Agenda (cont.)"] * (len(slides) - 1)
+    paragraphs = [(paragraph.level, paragraph.text) for slide in slides
+                  for paragraph in slide.placeholders[1].text_frame.paragraphs]
+    assert [text for _, text in paragraphs] == content.replace("\t", "").split("\n")
+    assert [level for level, text in paragraphs if text == "Detail"] == [1] * 15
+
+
+def test_very_long_bullet_gets_a_slide_of_its_own(manager):
+    content = "First\n" + "word " * 500 + "\nLast"
+
+    slides = manager.add_title_with_content_slide("deck", "Notes", content)
+
+    assert [[paragraph.text for paragraph in slide.placeholders[1].text_frame.paragraphs]
+            for slide in slides] == [["First"], ["word " * 499 + "word"], ["Last"]]
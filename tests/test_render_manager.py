@@ -0,0 +1,193 @@
+import asyncio
+import os
+import stat
+import sys
+import tempfile
+from io import BytesIO
+
+import mcp.types as types
+import pytest
+from PIL import Image
+from pptx import Presentation
+from pptx.util import Inches
+
+from powerpoint.executor_manager import ExecutorManager
+from powerpoint.render_manager import RenderManager
+from powerpoint.server import create_server
+
+# Stands in for LibreOffice: writes a PNG of the right name, or a PDF, and logs each conversion
+FAKE_SOFFICE = """#!{python}
+import os, sys
+from PIL import Image
+args = sys.argv[1:]
+target = args[args.index("--convert-to") + 1]
+out_dir = args[args.index("--outdir") + 1]
+source = args[-1]
+with open({log!r}, "a") as log:
+    log.write(target + "\\n")
+output = os.path.join(out_dir, os.path.splitext(os.path.basename(source))[0] + "." + target)
+if target == "png":
+    Image.new("RGB", (1280, 720), "white").save(output)
+else:
+    with open(output, "wb") as f:
+        f.write(b"%PDF-1.4 fake")
+"""
+
+
+@pytest.fixture
+def soffice(tmp_path):
+    log = tmp_path / "soffice.log"
+    path = tmp_path / "soffice"
+    path.write_text(FAKE_SOFFICE.format(python=sys.executable, log=str(log)))
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+
+    def conversions():
+        return log.read_text().split() if log.exists() else []
+
+    return str(path), conversions
+
+
+@pytest.fixture
+def executor_manager():
+    manager = ExecutorManager(io_workers=2)
+    yield manager
+    manager.shutdown(wait=False)
+
+
+def deck(*titles: str):
+    prs = Presentation()
+    for title in titles:
+        prs.slides.add_slide(prs.slide_layouts[5]).shapes.title.text = title
+    return prs
+
+
+def save(prs, path) -> str:
+    prs.save(str(path))
+    return str(path)
+
+
+def png_bytes() -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (64, 48), (200, 40, 40)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def changed(before, after):
+    return [index for index, (old, new) in enumerate(zip(before, after)) if old != new]
+
+
+def test_editing_one_slide_changes_only_its_key():
+    prs = deck("One", "Two", "Three")
+    before = RenderManager.slide_keys(prs, "png:640")
+
+    prs.slides[1].shapes.title.text = "Two, edited"
+    after = RenderManager.slide_keys(prs, "png:640")
+
+    assert len(set(before)) == 3
+    assert changed(before, after) == [1]
+
+
+def test_adding_a_picture_or_slide_keeps_the_other_keys():
+    prs = deck("One", "Two")
+    before = RenderManager.slide_keys(prs, "png:640")
+
+    prs.slides[0].shapes.add_picture(BytesIO(png_bytes()), Inches(1), Inches(2))
+    prs.slides.add_slide(prs.slide_layouts[5]).shapes.title.text = "Three"
+    after = RenderManager.slide_keys(prs, "png:640")
+
+    assert len(after) == 3
+    assert changed(before, after[:2]) == [0]
+
+
+def test_render_settings_change_every_key():
+    prs = deck("One", "Two")
+
+    assert not set(RenderManager.slide_keys(prs, "png:640")) & set(RenderManager.slide_keys(prs, "png:320"))
+
+
+def test_keys_survive_a_save_and_reload(tmp_path):
+    prs = deck("One", "Two")
+    path = save(prs, tmp_path / "deck.pptx")
+
+    assert RenderManager.slide_keys(Presentation(path), "png:640") == RenderManager.slide_keys(prs, "png:640")
+
+
+def test_only_changed_slides_are_rendered_again(tmp_path, soffice, executor_manager):
+    soffice_path, conversions = soffice
+    renderer = RenderManager(str(tmp_path / "cache"), executor_manager=executor_manager,
+                             soffice=soffice_path, workers=1)
+    prs = deck("One", "Two", "Three")
+    try:
+        keys = renderer.slide_keys(prs, "png:320")
+        first = asyncio.run(renderer.render_slides(save(prs, tmp_path / "v1.pptx"), keys, [0, 1, 2], 320))
+        assert len(conversions()) == 3
+        assert all(Image.open(BytesIO(image)).width == 320 for image in first)
+
+        prs.slides[2].shapes.title.text = "Three, edited"
+        keys = renderer.slide_keys(prs, "png:320")
+        assert renderer.needs_render(keys)
+        asyncio.run(renderer.render_slides(save(prs, tmp_path / "v2.pptx"), keys, [0, 1, 2], 320))
+        assert len(conversions()) == 4
+        assert not renderer.needs_render(keys)
+    finally:
+        renderer.close()
+
+    stats = renderer.stats()
+    assert (stats["renders"], stats["slides_rendered"], stats["slides_cached"]) == (2, 4, 2)
+    # The cache was read and written through the executor's I/O pool
+    assert executor_manager.stats()["io"]["completed"] == 4
+
+
+def test_unchanged_deck_reuses_its_pdf(tmp_path, soffice, executor_manager):
+    soffice_path, conversions = soffice
+    renderer = RenderManager(str(tmp_path / "cache"), executor_manager=executor_manager,
+                             soffice=soffice_path, workers=1)
+    prs = deck("One", "Two")
+    path = save(prs, tmp_path / "deck.pptx")
+    try:
+        keys = renderer.slide_keys(prs, "pdf:640")
+        assert asyncio.run(renderer.render_pdf(path, keys)).startswith(b"%PDF")
+        assert not renderer.needs_render([renderer.pdf_key(keys)])
+        asyncio.run(renderer.render_pdf(path, keys))
+    finally:
+        renderer.close()
+
+    assert conversions() == ["pdf"]
+    assert renderer.stats()["slides_cached"] == 2
+
+
+def test_rendering_without_libreoffice_is_an_error(tmp_path):
+    renderer = RenderManager(str(tmp_path / "cache"), soffice=None)
+    renderer.soffice = None
+    prs = deck("One")
+
+    with pytest.raises(ValueError, match="Rendering needs LibreOffice"):
+        asyncio.run(renderer.render_slides(save(prs, tmp_path / "deck.pptx"),
+                                           renderer.slide_keys(prs, "png:640"), [0], 640))
+
+
+def test_empty_deck_leaves_no_snapshot_behind(tmp_path, soffice, monkeypatch):
+    temp_dir = tmp_path / "tmp"
+    temp_dir.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(temp_dir))
+    server, shutdown = create_server(str(tmp_path), "http://127.0.0.1:1", "token", image_generator="fake",
+                                     soffice_path=soffice[0], render_cache_dir=str(tmp_path / "cache"))
+    call_tool = server.request_handlers[types.CallToolRequest]
+
+    async def call(name, arguments):
+        request = types.CallToolRequest(method="tools/call",
+                                        params=types.CallToolRequestParams(name=name, arguments=arguments))
+        return (await call_tool(request)).root
+
+    try:
+        asyncio.run(call("create-presentation", {"name": "empty"}))
+        results = [asyncio.run(call("render-presentation", {"presentation_name": "empty", "format": output_format}))
+                   for output_format in ("pdf", "png")]
+    finally:
+        shutdown()
+
+    for result in results:
+        assert result.isError
+        assert "has no slides to render" in result.content[0].text
+    assert [name for name in os.listdir(temp_dir) if name.startswith("pptx-render-")] == []
+    assert soffice[1]() == []
@@ -0,0 +1,146 @@
+import asyncio
+import random
+
+import jsonschema
+import mcp.types as types
+import pytest
+
+from powerpoint.schema_validator import SchemaError, compile_schema, compile_validator
+from powerpoint.server import create_server
+
+# Payloads generated per tool, half of them mutated into likely invalid ones
+PAYLOADS_PER_TOOL = 300
+
+JSON_SCALARS = [None, True, False, 0, -3, 2.5, 1.0, 10 ** 12, "", "text", "1"]
+
+
+def tool_schemas(tmp_path_factory):
+    server, shutdown = create_server(str(tmp_path_factory.mktemp("decks")), "http://127.0.0.1:1",
+                                     "token", image_generator="fake")
+    try:
+        handler = server.request_handlers[types.ListToolsRequest]
+        listing = asyncio.run(handler(types.ListToolsRequest(method="tools/list")))
+        return {tool.name: tool.inputSchema for tool in listing.root.tools}
+    finally:
+        shutdown()
+
+
+@pytest.fixture(scope="module")
+def schemas(tmp_path_factory):
+    return tool_schemas(tmp_path_factory)
+
+
+def random_json(rng: random.Random, depth: int = 0):
+    kind = rng.randrange(4 if depth < 2 else 2)
+    if kind == 0 or kind == 1:
+        return rng.choice(JSON_SCALARS)
+    if kind == 2:
+        return [random_json(rng, depth + 1) for _ in range(rng.randrange(4))]
+    return {rng.choice(["a", "name", "values", "x"]): random_json(rng, depth + 1)
+            for _ in range(rng.randrange(3))}
+
+
+def instance(schema, rng: random.Random, depth: int = 0):
+    """Build a value that mostly satisfies the schema, occasionally leaving out optional parts."""
+    if not isinstance(schema, dict):
+        return random_json(rng, depth)
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    for keyword in ("oneOf", "anyOf"):
+        if keyword in schema:
+            return instance(rng.choice(schema[keyword]), rng, depth)
+    names = schema.get("type", "object")
+    name = rng.choice(names) if isinstance(names, list) else names
+    if name == "object":
+        properties = schema.get("properties", {})
+        required = set(schema.get("required", ()))
+        return {key: instance(sub_schema, rng, depth + 1) for key, sub_schema in properties.items()
+                if key in required or (depth < 4 and rng.random() < 0.5)}
+    if name == "array":
+        low = schema.get("minItems", 0)
+        high = schema.get("maxItems", low + 4)
+        return [instance(schema.get("items"), rng, depth + 1) for _ in range(rng.randint(low, high))]
+    if name in ("integer", "number"):
+        low = schema.get("minimum", -5)
+        value = rng.randint(low, low + 20)
+        return value if name == "integer" or rng.random() < 0.5 else value + 0.25
+    if name == "string":
+        return rng.choice(["deck", "Title", "a.png", "x" * rng.randrange(1, 5)])
+    if name == "boolean":
+        return rng.random() < 0.5
+    return None
+
+
+def mutate(value, rng: random.Random):
+    """Replace, drop or add one node somewhere in the value."""
+    if isinstance(value, dict) and value and rng.random() < 0.7:
+        key = rng.choice(list(value))
+        choice = rng.randrange(3)
+        if choice == 0:
+            return {k: v for k, v in value.items() if k != key}
+        if choice == 1:
+            return dict(value, unexpected=random_json(rng))
+        return dict(value, **{key: mutate(value[key], rng)})
+    if isinstance(value, list) and value and rng.random() < 0.7:
+        index = rng.randrange(len(value))
+        return value[:index] + [mutate(value[index], rng)] + value[index + 1:]
+    return random_json(rng)
+
+
+def test_schemas_are_valid_draft7(schemas):
+    for schema in schemas.values():
+        jsonschema.Draft7Validator.check_schema(schema)
+
+
+def test_compiled_checks_agree_with_jsonschema(schemas):
+    rng = random.Random(20240611)
+    disagreements = []
+    for name, schema in schemas.items():
+        check = compile_schema(schema)
+        reference = jsonschema.Draft7Validator(schema)
+        for index in range(PAYLOADS_PER_TOOL):
+            payload = instance(schema, rng)
+            if index % 2:
+                payload = mutate(payload, rng)
+            if (check(payload) is None) != reference.is_valid(payload):
+                disagreements.append((name, payload))
+    assert disagreements[:5] == []
+
+
+def test_mutated_payloads_are_mostly_rejected(schemas):
+    # Guards the differential test against only ever generating valid payloads
+    rng = random.Random(7)
+    schema = schemas["add-slide-title-with-chart"]
+    reference = jsonschema.Draft7Validator(schema)
+    payloads = [mutate(instance(schema, rng), rng) for _ in range(200)]
+    assert sum(not reference.is_valid(payload) for payload in payloads) > 50
+
+
+def test_errors_name_the_offending_path(schemas):
+    validate = compile_validator(schemas["add-slide-title-with-chart"])
+    arguments = {"presentation_name": "deck", "title": "Sales",
+                 "data": {"categories": ["a", "b"],
+                          "series": [{"name": "s", "values": [1, "two"]}]}}
+
+    with pytest.raises(SchemaError) as error:
+        validate(arguments)
+
+    assert error.value.errors == [("data.series[0].values[1]", "expected number or null or 2-3 numbers, got string")]
+
+
+def test_required_arguments_must_not_be_empty(schemas):
+    validate = compile_validator(schemas["create-presentation"])
+
+    with pytest.raises(SchemaError) as error:
+        validate({"name": ""})
+
+    assert error.value.errors == [("name", "must not be empty")]
+    validate({"name": "deck"})
+
+
+@pytest.mark.parametrize("value, valid", [
+    (1, True), (1.0, True), (1.5, False), (True, False), ("1", False), (None, False)])
+def test_integers_follow_json_semantics(value, valid):
+    schema = {"type": "integer", "minimum": 0}
+    assert (compile_schema(schema)(value) is None) == valid
+    assert jsonschema.Draft7Validator(schema).is_valid(value) == valid
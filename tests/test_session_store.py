@@ -0,0 +1,209 @@
+import asyncio
+import gc
+import json
+import os
+import time
+
+import mcp.types as types
+import pytest
+from pptx import Presentation
+
+from powerpoint import session_store
+from powerpoint.server import create_server
+from powerpoint.session_store import PresentationStore, estimate_presentation_bytes
+
+
+class Clock:
+    """Stands in for the time module, so idle times don't depend on how fast the tests run."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+def deck(*titles: str):
+    prs = Presentation()
+    for title in titles:
+        prs.slides.add_slide(prs.slide_layouts[5]).shapes.title.text = title
+    return prs
+
+
+def titles(prs):
+    return [slide.shapes.title.text for slide in prs.slides]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(session_store, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def make_store(tmp_path):
+    def make(**options):
+        return PresentationStore(spill_dir=str(tmp_path), **options)
+    return make
+
+
+def test_least_recently_used_deck_is_spilled(make_store):
+    spilled = []
+    store = make_store(max_presentations=2, on_spill=lambda name, prs: spilled.append(name))
+    store["a"] = deck("A")
+    store["b"] = deck("B")
+    store["a"]
+    store["c"] = deck("C")
+
+    assert spilled == ["b"]
+    stats = store.stats()
+    assert (stats["resident"], stats["spilled"]) == (2, 1)
+    assert stats["evictions"] == {"total": 1, "lru": 1, "memory": 0, "ttl": 0}
+    assert stats["spilled_bytes_written"] > 0
+    assert sorted(store) == ["a", "b", "c"]
+    assert "b" in store and len(store) == 3
+
+
+def test_spilled_deck_is_reloaded_transparently(make_store, tmp_path):
+    store = make_store(max_presentations=1)
+    store["a"] = deck("One", "Two")
+    store["b"] = deck("Other")
+    assert len(os.listdir(tmp_path)) == 1
+
+    assert titles(store["a"]) == ["One", "Two"]
+
+    assert store.stats()["reloads"] == 1
+    assert store.stats()["spilled"] == 1
+    # The reloaded deck's checkpoint is gone, the other deck's took its place
+    assert len(os.listdir(tmp_path)) == 1
+    del store["a"]
+    del store["b"]
+    assert os.listdir(tmp_path) == []
+    with pytest.raises(KeyError):
+        store["a"]
+
+
+def test_decks_over_the_memory_budget_are_spilled(make_store):
+    one_deck = estimate_presentation_bytes(deck("A"))
+    store = make_store(memory_budget=int(one_deck * 1.5))
+    store["a"] = deck("A")
+    store["b"] = deck("B")
+
+    assert store.stats()["evictions"] == {"total": 1, "lru": 0, "memory": 1, "ttl": 0}
+    assert store.stats()["resident"] == 1
+    assert store.resident_bytes() <= store.memory_budget
+
+
+def test_cached_bytes_count_against_the_budget(make_store):
+    one_deck = estimate_presentation_bytes(deck("A"))
+    cached = {}
+    store = make_store(memory_budget=int(one_deck * 2.5), cached_bytes=lambda prs: cached.get(id(prs), 0))
+    store["a"] = deck("A")
+    store["b"] = deck("B")
+    assert store.stats()["evictions"]["total"] == 0
+
+    cached[id(store["a"])] = one_deck
+    store["b"]
+
+    assert store.stats()["evictions"] == {"total": 1, "lru": 0, "memory": 1, "ttl": 0}
+    assert store.stats()["spilled"] == 1
+
+
+def test_pinned_deck_is_never_spilled(make_store, clock):
+    store = make_store(max_presentations=1, idle_ttl=100, is_pinned=lambda name: name == "a")
+    store["a"] = deck("A")
+    store["b"] = deck("B")
+    store["c"] = deck("C")
+
+    # The pinned deck stays, over the limit, and b made way for c
+    assert store.stats()["evictions"] == {"total": 1, "lru": 1, "memory": 0, "ttl": 0}
+    clock.now += 200
+    assert store.sweep() == 1
+    assert store.stats()["resident"] == 1
+    assert titles(store["a"]) == ["A"]
+    assert store.stats()["reloads"] == 0
+
+
+def test_idle_decks_are_spilled_by_a_sweep(make_store, clock):
+    store = make_store(idle_ttl=100)
+    store["a"] = deck("A")
+    store["b"] = deck("B")
+    clock.now += 60
+    store["b"]
+    clock.now += 60
+
+    assert store.sweep() == 1
+    assert store.stats()["evictions"] == {"total": 1, "lru": 0, "memory": 0, "ttl": 1}
+    assert store.stats()["resident"] == 1
+    assert titles(store["a"]) == ["A"]
+    assert store.stats()["reloads"] == 1
+
+
+def test_access_sweeps_at_most_every_interval(make_store, clock):
+    store = make_store(idle_ttl=100)
+    assert store.sweep_interval == 60
+    store["a"] = deck("A")
+    store["b"] = deck("B")
+    clock.now += 61
+    store["b"]
+    assert store.stats()["evictions"]["ttl"] == 0
+
+    clock.now += 40
+    # a is idle past the TTL, but the last sweep was less than an interval ago
+    store["b"]
+    assert store.stats()["evictions"]["ttl"] == 0
+    clock.now += 21
+    store["b"]
+    assert store.stats()["evictions"]["ttl"] == 1
+
+
+def test_sweeps_are_off_without_a_ttl(make_store):
+    store = make_store(idle_ttl=0)
+    store["a"] = deck("A")
+
+    assert store.sweep_interval == 0
+    assert store.sweep() == 0
+
+
+def test_removed_parts_drop_their_size_estimate(make_store):
+    store = make_store()
+    store["a"] = deck("One", "Two")
+    prs = store["a"]
+    session = store._resident["a"]
+    parts = len(session.part_sizes)
+
+    # Remove the last slide, its part is freed with it
+    slide_ids = prs.slides._sldIdLst
+    prs.part.drop_rel(slide_ids[-1].rId)
+    slide_ids.remove(slide_ids[-1])
+    gc.collect()
+    store["a"]
+
+    assert len(session.part_sizes) == parts - 1
+    prs.slides.add_slide(prs.slide_layouts[1]).shapes.title.text = "Three"
+    store["a"]
+    assert session.size == estimate_presentation_bytes(prs)
+
+
+def test_server_spills_idle_decks_without_being_called(tmp_path):
+    server, shutdown = create_server(str(tmp_path), "http://127.0.0.1:1", "token", image_generator="fake",
+                                     idle_ttl=0.05, spill_dir=str(tmp_path / "spill"))
+    call_tool = server.request_handlers[types.CallToolRequest]
+
+    async def call(name, arguments):
+        request = types.CallToolRequest(method="tools/call",
+                                        params=types.CallToolRequestParams(name=name, arguments=arguments))
+        return (await call_tool(request)).root
+
+    try:
+        asyncio.run(call("create-presentation", {"name": "deck"}))
+        time.sleep(0.3)
+        # Reading the stats touches no deck, only the background sweep can have spilled it
+        result = asyncio.run(call("get-server-stats", {}))
+    finally:
+        shutdown()
+
+    sessions = json.loads(result.content[0].text)["sessions"]
+    assert sessions["evictions"]["ttl"] == 1
+    assert sessions["resident"] == 0
@@ -0,0 +1,101 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+import uvicorn
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+from mcp.server import NotificationOptions
+from mcp.server.models import InitializationOptions
+
+from powerpoint.server import create_server
+from powerpoint.sse_transport import SseTransport
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return condition()
+
+
+@pytest.fixture
+def sse(tmp_path):
+    """Serve a server over SSE on a free port, with the transport's stats in get-server-stats."""
+    stats_sources = {}
+    server, shutdown = create_server(str(tmp_path), "http://127.0.0.1:1", "token", image_generator="fake",
+                                     stats_sources=stats_sources)
+    initialization_options = InitializationOptions(
+        server_name="powerpoint",
+        server_version="0.1.0",
+        capabilities=server.get_capabilities(notification_options=NotificationOptions(),
+                                             experimental_capabilities={}),
+    )
+    transport = SseTransport(server, initialization_options, max_connections=1)
+    stats_sources["transport"] = transport.stats
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    http = uvicorn.Server(uvicorn.Config(transport.app(), host="127.0.0.1", port=port,
+                                         http="h11", ws="none", log_level="warning",
+                                         timeout_graceful_shutdown=1))
+    thread = threading.Thread(target=http.run, daemon=True)
+    thread.start()
+    assert wait_for(lambda: http.started)
+    yield transport, f"http://127.0.0.1:{port}"
+    http.should_exit = True
+    thread.join(10)
+    shutdown()
+
+
+def status(url: str, data: bytes = None) -> int:
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def test_sessions_are_counted_while_connected(sse):
+    transport, url = sse
+
+    async def connect():
+        async with sse_client(f"{url}/sse") as streams:
+            async with ClientSession(*streams) as session:
+                await session.initialize()
+                result = await session.call_tool("get-server-stats", {})
+                # The only connection is taken, so a second client is turned away
+                turned_away = await asyncio.to_thread(status, f"{url}/sse")
+                return json.loads(result.content[0].text)["transport"], turned_away
+
+    connected, turned_away = asyncio.run(connect())
+
+    assert (connected["transport"], connected["connections"], connected["sessions"]) == ("sse", 1, 1)
+    assert connected["accepted"] == 1
+    assert turned_away == 503
+    # The session is forgotten once its stream closes
+    assert wait_for(lambda: transport.stats()["sessions"] == 0)
+    stats = transport.stats()
+    assert (stats["connections"], stats["accepted"], stats["rejected"], stats["max_seen"]) == (0, 1, 1, 1)
+    assert stats["messages"] >= 3
+
+
+def test_posts_to_unknown_sessions_are_answered_with_404(sse):
+    transport, url = sse
+
+    assert status(f"{url}/messages/?session_id={'0' * 32}", b"{}") == 404
+    assert status(f"{url}/messages/?session_id=not-an-id", b"{}") == 400
+    assert transport.stats()["unknown_sessions"] == 1
+
+
+def test_health_reports_the_transport_stats(sse):
+    transport, url = sse
+
+    with urllib.request.urlopen(f"{url}/health", timeout=5) as response:
+        assert json.loads(response.read()) == transport.stats()
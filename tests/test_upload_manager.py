@@ -0,0 +1,173 @@
+import json
+import socket
+import threading
+import time
+
+import pytest
+import uvicorn
+
+from owui_stub import parse_multipart, start_stub
+from powerpoint import upload_manager
+from powerpoint.upload_manager import UploadManager
+
+DATA = b"PK\x03\x04" + bytes(range(256)) * 64
+
+
+@pytest.fixture
+def stub():
+    url, server = start_stub()
+    yield url, server
+    server.shutdown()
+    server.server_close()
+
+
+def make_manager(url: str, **options) -> UploadManager:
+    options.setdefault("backoff", 0.01)
+    return UploadManager(url, "test-token", **options)
+
+
+def test_upload_returns_content_url(stub):
+    url, server = stub
+    manager = make_manager(url)
+    try:
+        file_url = manager.upload("deck.pptx", DATA)
+    finally:
+        manager.close()
+
+    assert file_url.startswith(f"{url}/api/v1/files/")
+    assert file_url.endswith("/content")
+    assert server.uploads == 1
+    assert server.last_upload == ("deck.pptx", DATA)
+    assert server.malformed == 0
+    assert server.bytes_received > len(DATA)
+    assert manager.stats() == {"uploads": 1, "failures": 0, "attempts": 1,
+                               "bytes_sent": server.bytes_received}
+
+
+def test_transient_errors_are_retried(stub):
+    url, server = stub
+    server.fail_next(2, status=503)
+    manager = make_manager(url, retries=3)
+    try:
+        manager.upload("deck.pptx", DATA)
+    finally:
+        manager.close()
+
+    assert server.requests == 3
+    assert server.uploads == 1
+    assert server.last_upload == ("deck.pptx", DATA)
+    assert manager.stats()["attempts"] == 3
+    assert manager.stats()["failures"] == 0
+
+
+def test_gives_up_after_retries(stub):
+    url, server = stub
+    server.fail_next(10, status=502)
+    manager = make_manager(url, retries=2)
+    try:
+        with pytest.raises(ValueError, match="after 3 attempts"):
+            manager.upload("deck.pptx", DATA)
+    finally:
+        manager.close()
+
+    assert server.requests == 3
+    assert server.uploads == 0
+    assert manager.stats()["failures"] == 1
+
+
+def test_client_errors_are_not_retried(stub):
+    url, server = stub
+    server.fail_next(1, status=400)
+    manager = make_manager(url, retries=3)
+    try:
+        with pytest.raises(ValueError, match="Status code: 400"):
+            manager.upload("deck.pptx", DATA)
+    finally:
+        manager.close()
+
+    assert server.requests == 1
+    assert manager.stats()["attempts"] == 1
+
+
+def test_backoff_does_not_hold_an_upload_slot(stub, monkeypatch):
+    url, server = stub
+    server.fail_next(1)
+    manager = make_manager(url, retries=1, max_concurrent=1)
+    slot_free = []
+
+    def sleep(delay):
+        # Another upload could start while this one waits to retry
+        acquired = manager._slots.acquire(blocking=False)
+        if acquired:
+            manager._slots.release()
+        slot_free.append(acquired)
+
+    monkeypatch.setattr(upload_manager.time, "sleep", sleep)
+    try:
+        manager.upload("deck.pptx", DATA)
+    finally:
+        manager.close()
+
+    assert slot_free == [True]
+    assert server.uploads == 1
+
+
+def test_stub_rejects_ambiguous_framing(stub):
+    url, server = stub
+    host, port = url.removeprefix("http://").split(":")
+    with socket.create_connection((host, int(port))) as sock:
+        sock.sendall(b"POST /api/v1/files/ HTTP/1.1\r\nHost: stub\r\nContent-Length: 5\r\n"
+                     b"Transfer-Encoding: chunked\r\n\r\n5\r\nhello\r\n0\r\n\r\n")
+        response = sock.makefile("rb").readline()
+
+    assert response.startswith(b"HTTP/1.1 400")
+    assert server.malformed == 1
+    assert server.uploads == 0
+
+
+async def files_app(scope, receive, send):
+    """An ASGI upload endpoint, served by uvicorn's h11 parser like Open-WebUI."""
+    if scope["type"] != "http":
+        return
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+    headers = dict(scope["headers"])
+    file_name, content = parse_multipart(headers[b"content-type"].decode("latin-1"), body)["file"]
+    files_app.uploads.append((file_name, content))
+    response = json.dumps({"id": "asgi-file"}).encode("utf-8")
+    await send({"type": "http.response.start", "status": 200,
+                "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": response})
+
+
+@pytest.fixture
+def asgi_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    files_app.uploads = []
+    server = uvicorn.Server(uvicorn.Config(files_app, host="127.0.0.1", port=port,
+                                           http="h11", ws="none", log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started and time.monotonic() < deadline:
+        time.sleep(0.05)
+    yield f"http://127.0.0.1:{port}"
+    server.should_exit = True
+    thread.join(10)
+
+
+def test_upload_to_asgi_server(asgi_url):
+    manager = make_manager(asgi_url, retries=0)
+    try:
+        file_url = manager.upload("quarterly \"final\".pptx", DATA)
+    finally:
+        manager.close()
+
+    assert file_url == f"{asgi_url}/api/v1/files/asgi-file/content"
+    assert files_app.uploads == [("quarterly %22final%22.pptx", DATA)]
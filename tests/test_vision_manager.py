@@ -0,0 +1,84 @@
+import asyncio
+import os
+
+import pytest
+
+from powerpoint.executor_manager import ExecutorManager
+from powerpoint.vision_manager import FakeImageGenerator, VisionManager
+
+
+class FailingGenerator(FakeImageGenerator):
+    def generate(self, prompt):
+        super().generate(prompt)
+        raise ValueError("Failed to generate image: quota exceeded")
+
+
+@pytest.fixture
+def executor():
+    executor_manager = ExecutorManager(io_workers=4)
+    yield executor_manager
+    executor_manager.shutdown()
+
+
+def generate_all(manager: VisionManager, requests):
+    async def run():
+        return await asyncio.gather(
+            *(manager.generate_and_save_image(prompt, path) for prompt, path in requests),
+            return_exceptions=True)
+    return asyncio.run(run())
+
+
+def test_identical_prompts_share_one_generation(executor, tmp_path):
+    generator = FakeImageGenerator(size=(64, 48))
+    manager = VisionManager(executor, generator=generator)
+    paths = [str(tmp_path / f"image{index}.png") for index in range(4)]
+
+    results = generate_all(manager, [("A red square", path) for path in paths])
+
+    assert results == paths
+    assert all(os.path.getsize(path) > 0 for path in paths)
+    assert generator.calls == 1
+    assert manager.stats()["generated"] == 1
+    assert manager.stats()["deduplicated"] == 3
+    assert manager.stats()["in_flight"] == 0
+
+
+def test_distinct_prompts_are_counted(executor, tmp_path):
+    generator = FakeImageGenerator(size=(64, 48))
+    manager = VisionManager(executor, generator=generator, max_concurrent=4)
+
+    generate_all(manager, [(f"Prompt {index}", str(tmp_path / f"image{index}.png"))
+                           for index in range(16)])
+
+    assert generator.calls == 16
+    assert manager.stats()["generated"] == 16
+    assert manager.stats()["deduplicated"] == 0
+
+
+def test_cached_prompt_is_not_regenerated(executor, tmp_path):
+    generator = FakeImageGenerator(size=(64, 48))
+    manager = VisionManager(executor, generator=generator, cache_dir=str(tmp_path / "cache"))
+
+    generate_all(manager, [("A blue circle", str(tmp_path / "first.png"))])
+    generate_all(manager, [("A blue circle", str(tmp_path / "second.jpg"))])
+
+    assert generator.calls == 1
+    assert manager.stats()["cache"]["hits"] == 1
+    with open(tmp_path / "second.jpg", "rb") as f:
+        assert f.read(2) == b"\xff\xd8"
+
+
+def test_failed_generation_is_shared_and_retried(executor, tmp_path):
+    generator = FailingGenerator(size=(64, 48))
+    manager = VisionManager(executor, generator=generator)
+    requests = [("A green star", str(tmp_path / f"image{index}.png")) for index in range(3)]
+
+    results = generate_all(manager, requests)
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert generator.calls == 1
+    assert manager.stats()["in_flight"] == 0
+
+    results = generate_all(manager, requests[:1])
+    assert isinstance(results[0], ValueError)
+    assert generator.calls == 2